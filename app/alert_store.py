@@ -0,0 +1,111 @@
+"""Persistent store for the last alert status of every analysis
+"""
+
+import sqlite3
+import threading
+import time
+
+import structlog
+
+class AlertStore():
+    """Keeps the last status of every analysis keyed by exchange, market pair, analyzer type,
+    analyzer name and configuration index.
+
+    Only the status strings are kept in memory. When a path is given they are also saved to
+    sqlite along with when they last changed, so alerts sent once per status change are not sent
+    again after a restart.
+    """
+
+    def __init__(self, path=None):
+        """Initializes AlertStore class
+
+        Args:
+            path (str, optional): Defaults to None. Path of the sqlite database file to store the
+                statuses in, they are only kept in memory when not set.
+        """
+
+        self.logger = structlog.get_logger()
+        self.lock = threading.Lock()
+        self.statuses = dict()
+        self.connection = None
+
+        if not path:
+            return
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                """CREATE TABLE IF NOT EXISTS alert_states (
+                    exchange TEXT NOT NULL,
+                    market_pair TEXT NOT NULL,
+                    analyzer_type TEXT NOT NULL,
+                    analyzer TEXT NOT NULL,
+                    analyzer_index INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    changed_at INTEGER NOT NULL,
+                    PRIMARY KEY (exchange, market_pair, analyzer_type, analyzer, analyzer_index)
+                )"""
+            )
+
+        rows = self.connection.execute(
+            """SELECT exchange, market_pair, analyzer_type, analyzer, analyzer_index, status
+            FROM alert_states"""
+        ).fetchall()
+        self.statuses = { tuple(row[:5]): row[5] for row in rows }
+
+        self.logger.info('Using alert store at %s with %s statuses', path, len(self.statuses))
+
+
+    def get(self, status_key, default=None):
+        """Get the last status of an analysis.
+
+        Args:
+            status_key (tuple): The exchange, market pair, analyzer type, analyzer name and
+                configuration index of the analysis.
+            default (str, optional): Defaults to None. Returned when there is no status.
+
+        Returns:
+            str: The last status, hot, cold or neutral.
+        """
+
+        with self.lock:
+            return self.statuses.get(status_key, default)
+
+
+    def update(self, changed_statuses, removed_keys):
+        """Save the statuses that changed in a single transaction.
+
+        Args:
+            changed_statuses (dict): The new status keyed by the analysis it belongs to.
+            removed_keys (list): The analyses that have no status anymore.
+        """
+
+        if not changed_statuses and not removed_keys:
+            return
+
+        changed_at = int(time.time())
+        with self.lock:
+            self.statuses.update(changed_statuses)
+            for status_key in removed_keys:
+                self.statuses.pop(status_key, None)
+
+            if not self.connection:
+                return
+
+            with self.connection:
+                self.connection.executemany(
+                    """INSERT OR REPLACE INTO alert_states
+                    (exchange, market_pair, analyzer_type, analyzer, analyzer_index, status,
+                    changed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        status_key + (status, changed_at)
+                        for status_key, status in changed_statuses.items()
+                    ]
+                )
+                self.connection.executemany(
+                    """DELETE FROM alert_states
+                    WHERE exchange = ? AND market_pair = ? AND analyzer_type = ? AND analyzer = ?
+                    AND analyzer_index = ?""",
+                    removed_keys
+                )
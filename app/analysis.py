@@ -1,16 +1,18 @@
 """Executes the trading strategies and analyzes the results.
 """
 
+import copy
 import math
+from collections import deque
 from datetime import datetime
 
+import numpy
 import structlog
 import pandas
-from talib import abstract
 
-from analyzers.indicators import *
-from analyzers.informants import *
-from analyzers import *
+from analyzers import streaming
+from analyzers.utils import IndicatorUtils
+from registry import AnalyzerDispatcher, analyzer_registry
 
 class StrategyAnalyzer():
     """Contains all the methods required for analyzing strategies.
@@ -24,39 +26,25 @@ class StrategyAnalyzer():
     def indicator_dispatcher(self):
         """Returns a dictionary for dynamic anaylsis selector
 
+        The indicators are imported and built once, the first time they are looked up.
+
         Returns:
             dictionary: A dictionary of functions to serve as a dynamic analysis selector.
         """
 
-        dispatcher = {
-            'ichimoku': ichimoku.Ichimoku().analyze,
-            'macd': macd.MACD().analyze,
-            'rsi': rsi.RSI().analyze,
-            'momentum': momentum.Momentum().analyze,
-            'mfi': mfi.MFI().analyze,
-            'stoch_rsi': stoch_rsi.StochasticRSI().analyze,
-            'obv': obv.OBV().analyze
-        }
-
-        return dispatcher
+        return AnalyzerDispatcher(analyzer_registry, 'indicators')
 
 
     def informant_dispatcher(self):
         """Returns a dictionary for dynamic informant selector
 
+        The informants are imported and built once, the first time they are looked up.
+
         Returns:
             dictionary: A dictionary of functions to serve as a dynamic informant selector.
         """
 
-        dispatcher = {
-            'sma': sma.SMA().analyze,
-            'ema': ema.EMA().analyze,
-            'vwap': vwap.VWAP().analyze,
-            'bollinger_bands': bollinger_bands.Bollinger().analyze,
-            'ohlcv': ohlcv.OHLCV().analyze
-        }
-
-        return dispatcher
+        return AnalyzerDispatcher(analyzer_registry, 'informants')
 
 
     def crossover_dispatcher(self):
@@ -66,8 +54,409 @@ class StrategyAnalyzer():
             dictionary: A dictionary of functions to serve as a dynamic crossover selector.
         """
 
-        dispatcher = {
-            'std_crossover': crossover.CrossOver().analyze
-        }
+        return AnalyzerDispatcher(analyzer_registry, 'crossovers')
+
+
+    def crossover_batch_dispatcher(self):
+        """Returns a dictionary for dynamic crossover selector that tests many crossovers at once
+
+        Returns:
+            dictionary: A dictionary of functions taking the arguments of each crossover to test,
+                for the crossovers that support it.
+        """
+
+        return AnalyzerDispatcher(analyzer_registry, 'crossovers', method='analyze_all')
+
+
+def _get_state_args(state_class, analysis_args, window_length):
+    """Get the arguments to create an indicator state with.
+
+    Args:
+        state_class (type): The state class from analyzers.streaming.
+        analysis_args (dict): The arguments the batch analyzer would be called with.
+        window_length (int): The number of candles analyzed.
+
+    Returns:
+        dict: The keyword arguments of the state.
+    """
+
+    state_args = {
+        name: value for name, value in analysis_args.items()
+        if name not in ('historical_data', 'signal', 'hot_thresh', 'cold_thresh')
+    }
+    if getattr(state_class, 'window_bound', False):
+        state_args['window_length'] = window_length
+    return state_args
+
+
+def _get_result_frame(analyzer, state_class, values, dataframe, analysis_args):
+    """Turn the values of an indicator state into the dataframe the analyzer returns.
+
+    Args:
+        analyzer (IndicatorUtils): The indicator or informant.
+        state_class (type): The state class from analyzers.streaming.
+        values (numpy.ndarray): The state values of the last candles, one row per candle.
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        analysis_args (dict): The arguments the batch analyzer would be called with.
+
+    Returns:
+        pandas.DataFrame: A dataframe containing the indicators and hot/cold values.
+    """
+
+    result = pandas.DataFrame(
+        values,
+        index=dataframe.index[-values.shape[0]:],
+        columns=state_class.columns
+    )
+    result.dropna(how=state_class.dropna_how, inplace=True)
+
+    if 'signal' in analysis_args:
+        result = analyzer.get_signals(
+            result,
+            dataframe,
+            analysis_args['signal'],
+            analysis_args['hot_thresh'],
+            analysis_args['cold_thresh']
+        )
+
+    return result
+
+
+class IndicatorStream():
+    """The state of one indicator configuration for a pair and candle period.
+    """
+
+    __slots__ = ('state', 'state_args', 'window_length', 'rows', 'last_time', 'updates')
+
+    def __init__(self, state, state_args, window_length):
+        """Initializes IndicatorStream class
+
+        Args:
+            state (object): The indicator state from analyzers.streaming.
+            state_args (dict): The arguments the state was created with.
+            window_length (int): The number of candles analyzed each cycle.
+        """
+
+        self.state = state
+        self.state_args = state_args
+        self.window_length = window_length
+        self.rows = deque(maxlen=max(window_length - 1, 1))
+        self.last_time = None
+        self.updates = 0
+
+
+class StreamingAnalyzer():
+    """Updates the indicators one candle at a time instead of recomputing the whole window.
+
+    The state of every pair, candle period and indicator configuration is kept between cycles.
+    The last candle may still be open, so it is only applied to a copy of the state until the
+    next candle arrives.
+    """
+
+    def __init__(self, check_interval=100, check_tolerance=0.01):
+        """Initializes StreamingAnalyzer class
+
+        Args:
+            check_interval (int, optional): Defaults to 100. Compare a stream against the batch
+                analysis every this many candles, 0 disables the check.
+            check_tolerance (float, optional): Defaults to 0.01. The largest difference of the
+                latest values allowed, relative to the largest value of the batch analysis.
+        """
+
+        self.logger = structlog.get_logger()
+        self.check_interval = check_interval
+        self.check_tolerance = check_tolerance
+        self.indicator_utils = IndicatorUtils()
+        self.streams = dict()
+
+
+    def can_stream(self, analyzer_name):
+        """Check whether an indicator or informant can be updated one candle at a time.
+
+        Args:
+            analyzer_name (str): The name of the indicator or informant.
+
+        Returns:
+            bool: True when a streaming state exists for it.
+        """
+
+        return (
+            analyzer_name in streaming.STATES
+            and analyzer_registry.find(analyzer_name) is not None
+        )
+
+
+    def analyze(self, stream_key, analyzer_name, analysis_args):
+        """Apply the candles that arrived since the last call and get the analysis results.
+
+        Args:
+            stream_key (tuple): Identifies the pair, candle period and configuration analyzed.
+            analyzer_name (str): The name of the indicator or informant.
+            analysis_args (dict): The arguments the batch analyzer would be called with.
+
+        Returns:
+            pandas.DataFrame: A dataframe containing the indicators and hot/cold values.
+        """
+
+        analyzer = analyzer_registry.find(analyzer_name)
+        dataframe = self.indicator_utils.convert_to_dataframe(analysis_args['historical_data'])
+        if dataframe.empty:
+            return analyzer.analyze(**analysis_args)
+
+        state_class = streaming.STATES[analyzer_name]
+        state_args = _get_state_args(state_class, analysis_args, dataframe.shape[0])
+
+        stream = self.streams.get(stream_key)
+        start_index = self._get_start_index(stream, dataframe, state_args)
+        if start_index is None:
+            stream = IndicatorStream(state_class(**state_args), state_args, dataframe.shape[0])
+            self.streams[stream_key] = stream
+            start_index = 0
+
+        candles = dataframe[['open', 'high', 'low', 'close', 'volume']].values
+        for index in range(start_index, dataframe.shape[0] - 1):
+            stream.rows.append(stream.state.update(candles[index]))
+            stream.last_time = dataframe.index[index]
+            stream.updates += 1
+
+        if start_index == 0:
+            stream.updates = 0
+
+        open_state = copy.deepcopy(stream.state)
+        rows = list(stream.rows) + [open_state.update(candles[-1])]
+        values = _get_result_frame(
+            analyzer,
+            state_class,
+            numpy.array(rows, dtype=float),
+            dataframe,
+            analysis_args
+        )
+
+        if self.check_interval and stream.updates >= self.check_interval:
+            stream.updates = 0
+            values = self._check_stream(stream_key, analyzer_name, analysis_args, values)
+
+        return values
+
+
+    def _get_start_index(self, stream, dataframe, state_args):
+        """Find the first candle the stream has not applied yet.
+
+        Args:
+            stream (IndicatorStream): The stream to continue, None if there is none yet.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            state_args (dict): The arguments the state has to be created with.
+
+        Returns:
+            int: The index of the first new candle, None when the stream has to be rebuilt.
+        """
+
+        if stream is None or stream.last_time is None:
+            return None
+
+        if stream.state_args != state_args or stream.window_length != dataframe.shape[0]:
+            return None
+
+        last_index = dataframe.index.searchsorted(stream.last_time)
+        if last_index >= dataframe.shape[0] - 1 or dataframe.index[last_index] != stream.last_time:
+            return None
+
+        return last_index + 1
+
+
+    def _check_stream(self, stream_key, analyzer_name, analysis_args, values):
+        """Compare the latest streamed values against the batch analysis.
+
+        Averages seeded before the current window keep a fading trace of older candles, so the
+        values are compared within a tolerance. A stream that drifted too far is rebuilt.
+
+        Args:
+            stream_key (tuple): Identifies the pair, candle period and configuration analyzed.
+            analyzer_name (str): The name of the indicator or informant.
+            analysis_args (dict): The arguments of the batch analyzer.
+            values (pandas.DataFrame): The streamed results.
+
+        Returns:
+            pandas.DataFrame: The streamed results, or the batch results when they differ.
+        """
+
+        batch_values = analyzer_registry.find(analyzer_name).analyze(**analysis_args)
+        if batch_values.empty and values.empty:
+            return values
+
+        columns = list(streaming.STATES[analyzer_name].columns)
+        both_exist = not batch_values.empty and not values.empty
+        if both_exist and batch_values.index[-1] == values.index[-1]:
+            expected = batch_values[columns].values.astype(float)
+            actual = values[columns].values[-1].astype(float)
+            difference = numpy.abs(actual - expected[-1])
+            allowed = self.check_tolerance * numpy.nanmax(numpy.abs(expected), axis=0)
+            both_missing = numpy.isnan(actual) & numpy.isnan(expected[-1])
+            if numpy.all((difference <= allowed) | both_missing):
+                return values
+
+        self.logger.debug(
+            'Streamed %s of %s drifted from the batch analysis, rebuilding it',
+            analyzer_name,
+            stream_key[1]
+        )
+        del self.streams[stream_key]
+        return batch_values
+
+
+class BatchAnalyzer():
+    """Runs an indicator for many pairs at once.
+
+    The candles of pairs with the same number of candles are stacked into one array and the
+    indicator states step through them a candle at a time for all pairs together, which avoids
+    the overhead of analyzing every pair on its own.
+    """
+
+    def __init__(self):
+        """Initializes BatchAnalyzer class
+        """
+
+        self.logger = structlog.get_logger()
+        self.indicator_utils = IndicatorUtils()
+
+
+    def can_batch(self, analyzer_name):
+        """Check whether an indicator or informant can be analyzed for many pairs at once.
+
+        Args:
+            analyzer_name (str): The name of the indicator or informant.
+
+        Returns:
+            bool: True when a state exists for it.
+        """
+
+        return (
+            analyzer_name in streaming.STATES
+            and analyzer_registry.find(analyzer_name) is not None
+        )
+
+
+    def analyze(self, analyzer_name, pair_args):
+        """Analyze the candles of several pairs with the same indicator configuration.
+
+        Args:
+            analyzer_name (str): The name of the indicator or informant.
+            pair_args (dict): The arguments the batch analyzer would be called with, keyed by
+                market pair. Only the historical data differs between the pairs.
+
+        Returns:
+            dict: A dataframe containing the indicators and hot/cold values for each market pair.
+        """
+
+        analyzer = analyzer_registry.find(analyzer_name)
+        state_class = streaming.STATES[analyzer_name]
+
+        dataframes = dict()
+        groups = dict()
+        for market_pair, analysis_args in pair_args.items():
+            dataframe = self.indicator_utils.convert_to_dataframe(analysis_args['historical_data'])
+            dataframes[market_pair] = dataframe
+            groups.setdefault(dataframe.shape[0], list()).append(market_pair)
+
+        results = dict()
+        for window_length, market_pairs in groups.items():
+            if not window_length:
+                for market_pair in market_pairs:
+                    results[market_pair] = analyzer.analyze(**pair_args[market_pair])
+                continue
+
+            candles = numpy.stack([
+                dataframes[market_pair][['open', 'high', 'low', 'close', 'volume']].values
+                for market_pair in market_pairs
+            ])
+
+            state = state_class(**_get_state_args(
+                state_class,
+                pair_args[market_pairs[0]],
+                window_length
+            ))
+
+            # Shaped candles, columns, pairs.
+            values = numpy.array(
+                [state.update(candles[:, index]) for index in range(window_length)],
+                dtype=float
+            )
+
+            results.update(self._split_results(
+                analyzer,
+                state_class,
+                values,
+                candles,
+                market_pairs,
+                dataframes,
+                pair_args[market_pairs[0]]
+            ))
+
+        return results
+
+
+    def _split_results(self, analyzer, state_class, values, candles, market_pairs, dataframes,
+                       analysis_args):
+        """Turn the stacked state values into a results dataframe for each pair.
+
+        The hot/cold signals are flagged once for all pairs on a combined dataframe that is
+        indexed by position, as the candle times of the pairs overlap.
+
+        Args:
+            analyzer (IndicatorUtils): The indicator or informant.
+            state_class (type): The state class from analyzers.streaming.
+            values (numpy.ndarray): The state values shaped candles, columns, pairs.
+            candles (numpy.ndarray): The candles shaped pairs, candles, open high low close volume.
+            market_pairs (list): The market pairs in the order they were stacked.
+            dataframes (dict): The historical OHCLV data of each market pair.
+            analysis_args (dict): The arguments of the batch analyzer shared by the pairs.
+
+        Returns:
+            dict: A dataframe containing the indicators and hot/cold values for each market pair.
+        """
+
+        missing = numpy.isnan(values)
+        if state_class.dropna_how == 'any':
+            keep = ~missing.any(axis=1)
+        else:
+            keep = ~missing.all(axis=1)
+
+        combined_values = pandas.DataFrame(
+            numpy.concatenate([
+                values[keep[:, position], :, position]
+                for position in range(len(market_pairs))
+            ]),
+            columns=state_class.columns
+        )
+
+        if 'signal' in analysis_args:
+            combined_candles = pandas.DataFrame(
+                numpy.concatenate([
+                    candles[position][keep[:, position]]
+                    for position in range(len(market_pairs))
+                ]),
+                columns=['open', 'high', 'low', 'close', 'volume']
+            )
+            combined_values = analyzer.get_signals(
+                combined_values,
+                combined_candles,
+                analysis_args['signal'],
+                analysis_args['hot_thresh'],
+                analysis_args['cold_thresh']
+            )
+
+        results = dict()
+        start = 0
+        for position, market_pair in enumerate(market_pairs):
+            end = start + keep[:, position].sum()
+            results[market_pair] = pandas.DataFrame(
+                {
+                    column: combined_values[column].values[start:end]
+                    for column in combined_values.columns
+                },
+                index=dataframes[market_pair].index[keep[:, position]],
+                columns=combined_values.columns
+            )
+            start = end
 
-        return dispatcher
+        return results
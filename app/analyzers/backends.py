@@ -0,0 +1,582 @@
+""" Interchangeable implementations of the technical analysis primitives used by the analyzers
+
+Every primitive returns arrays as long as its input, NaN until enough candles were seen, with the
+values TA-Lib computes. TA-Lib and tulipy are optional, the pure numpy implementations work
+without any C library.
+"""
+
+import threading
+import timeit
+
+import numpy
+import structlog
+
+from analyzers import kernels
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+try:
+    import tulipy
+except ImportError:
+    tulipy = None
+
+PRIMITIVES = ('sma', 'ema', 'rsi', 'bbands', 'macd', 'obv', 'mfi', 'mom')
+
+
+def _float_array(values):
+    """Get values as the contiguous float array the C libraries need.
+
+    Args:
+        values (numpy.ndarray): The values to convert.
+
+    Returns:
+        numpy.ndarray: The values as float64.
+    """
+
+    return numpy.ascontiguousarray(values, dtype=float)
+
+
+def _exponential_average(values, period, start=0):
+    """Get the exponential moving average of values the way TA-Lib computes it.
+
+    The average is seeded with the simple average of the first period values from start.
+
+    Args:
+        values (numpy.ndarray): The values to average.
+        period (int): The number of values the average spans.
+        start (int, optional): Defaults to 0. The index the seed window starts at.
+
+    Returns:
+        numpy.ndarray: The average of each value, NaN before the end of the seed window.
+    """
+
+    result = numpy.full(values.shape[0], numpy.nan)
+    first_index = start + period - 1
+    if first_index >= values.shape[0]:
+        return result
+
+    alpha = 2 / (period + 1)
+    average = values[start:first_index + 1].mean()
+    result[first_index] = average
+    for index in range(first_index + 1, values.shape[0]):
+        average += (values[index] - average) * alpha
+        result[index] = average
+    return result
+
+
+class NumpyBackend():
+    """Pure numpy implementations of the primitives.
+    """
+
+    name = 'numpy'
+
+    def sma(self, close, period):
+        return kernels.rolling_mean(close, period)
+
+
+    def ema(self, close, period):
+        return _exponential_average(_float_array(close), period)
+
+
+    def rsi(self, close, period):
+        close = _float_array(close)
+        result = numpy.full(close.shape[0], numpy.nan)
+        if close.shape[0] <= period:
+            return result
+
+        change = numpy.diff(close)
+        gains = numpy.where(change > 0, change, 0)
+        losses = numpy.where(change < 0, -change, 0)
+
+        # Wilder's smoothing, seeded with the simple average of the first period changes.
+        average_gain = gains[:period].mean()
+        average_loss = losses[:period].mean()
+        for index in range(period, close.shape[0]):
+            if index > period:
+                average_gain = (average_gain * (period - 1) + gains[index - 1]) / period
+                average_loss = (average_loss * (period - 1) + losses[index - 1]) / period
+
+            total = average_gain + average_loss
+            result[index] = 100 * average_gain / total if total else 0
+        return result
+
+
+    def bbands(self, close, period, deviations):
+        close = _float_array(close)
+        middle = kernels.rolling_mean(close, period)
+        deviation = kernels.rolling_std(close, period)
+        return middle + deviations * deviation, middle, middle - deviations * deviation
+
+
+    def macd(self, close, fast_period, slow_period, signal_period):
+        close = _float_array(close)
+        result = numpy.full(close.shape[0], numpy.nan)
+        first_index = slow_period + signal_period - 2
+        if first_index >= close.shape[0]:
+            return result, result.copy(), result.copy()
+
+        # Both averages start at the end of the slow window, as in TA-Lib.
+        slow_average = _exponential_average(close, slow_period)
+        fast_average = _exponential_average(close, fast_period, slow_period - fast_period)
+        macd = fast_average - slow_average
+        signal = _exponential_average(macd, signal_period, slow_period - 1)
+        macd[:first_index] = numpy.nan
+        return macd, signal, macd - signal
+
+
+    def obv(self, close, volume):
+        close = _float_array(close)
+        volume = _float_array(volume)
+        if not close.shape[0]:
+            return close.copy()
+
+        signed_volume = numpy.sign(numpy.diff(close)) * volume[1:]
+        return numpy.concatenate((volume[:1], volume[0] + numpy.cumsum(signed_volume)))
+
+
+    def mfi(self, high, low, close, volume, period):
+        typical_price = (_float_array(high) + _float_array(low) + _float_array(close)) / 3
+        result = numpy.full(typical_price.shape[0], numpy.nan)
+        if typical_price.shape[0] <= period:
+            return result
+
+        money_flow = typical_price[1:] * _float_array(volume)[1:]
+        change = numpy.diff(typical_price)
+        positive_flow = kernels.rolling_sum(numpy.where(change > 0, money_flow, 0), period)
+        negative_flow = kernels.rolling_sum(numpy.where(change < 0, money_flow, 0), period)
+
+        total_flow = positive_flow + negative_flow
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            mfi = numpy.where(total_flow < 1, 0, 100 * positive_flow / total_flow)
+        result[period:] = mfi[period - 1:]
+        return result
+
+
+    def mom(self, close, period):
+        close = _float_array(close)
+        result = numpy.full(close.shape[0], numpy.nan)
+        result[period:] = close[period:] - close[:-period]
+        return result
+
+
+class TALibBackend():
+    """The primitives from the TA-Lib function API, without the abstract API dataframe wrappers.
+    """
+
+    name = 'talib'
+
+    def sma(self, close, period):
+        return talib.SMA(_float_array(close), timeperiod=period)
+
+
+    def ema(self, close, period):
+        return talib.EMA(_float_array(close), timeperiod=period)
+
+
+    def rsi(self, close, period):
+        return talib.RSI(_float_array(close), timeperiod=period)
+
+
+    def bbands(self, close, period, deviations):
+        return talib.BBANDS(
+            _float_array(close),
+            timeperiod=period,
+            nbdevup=deviations,
+            nbdevdn=deviations
+        )
+
+
+    def macd(self, close, fast_period, slow_period, signal_period):
+        return talib.MACD(
+            _float_array(close),
+            fastperiod=fast_period,
+            slowperiod=slow_period,
+            signalperiod=signal_period
+        )
+
+
+    def obv(self, close, volume):
+        return talib.OBV(_float_array(close), _float_array(volume))
+
+
+    def mfi(self, high, low, close, volume, period):
+        return talib.MFI(
+            _float_array(high),
+            _float_array(low),
+            _float_array(close),
+            _float_array(volume),
+            timeperiod=period
+        )
+
+
+    def mom(self, close, period):
+        return talib.MOM(_float_array(close), timeperiod=period)
+
+
+class TulipyBackend():
+    """The primitives from tulipy, padded with NaNs to the length of the input.
+    """
+
+    name = 'tulipy'
+
+    def _call(self, function, inputs, options, outputs=1):
+        """Call a tulipy function and pad its outputs to the length of the input.
+
+        Args:
+            function (callable): The tulipy function.
+            inputs (tuple): The input arrays.
+            options (tuple): The options of the function.
+            outputs (int, optional): Defaults to 1. How many arrays the function returns.
+
+        Returns:
+            numpy.ndarray: The padded output, a tuple of them for several outputs.
+        """
+
+        inputs = [_float_array(values) for values in inputs]
+        length = inputs[0].shape[0]
+        try:
+            results = function(*inputs, *options)
+        except tulipy.InvalidOptionError:
+            results = [numpy.empty(0)] * outputs if outputs > 1 else numpy.empty(0)
+
+        if outputs == 1:
+            results = (results,)
+
+        padded = tuple(
+            numpy.concatenate((numpy.full(length - result.shape[0], numpy.nan), result))
+            for result in results
+        )
+        return padded if outputs > 1 else padded[0]
+
+
+    def sma(self, close, period):
+        return self._call(tulipy.sma, (close,), (period,))
+
+
+    def ema(self, close, period):
+        return self._call(tulipy.ema, (close,), (period,))
+
+
+    def rsi(self, close, period):
+        return self._call(tulipy.rsi, (close,), (period,))
+
+
+    def bbands(self, close, period, deviations):
+        lower, middle, upper = self._call(tulipy.bbands, (close,), (period, deviations), 3)
+        return upper, middle, lower
+
+
+    def macd(self, close, fast_period, slow_period, signal_period):
+        return self._call(
+            tulipy.macd,
+            (close,),
+            (fast_period, slow_period, signal_period),
+            3
+        )
+
+
+    def obv(self, close, volume):
+        return self._call(tulipy.obv, (close, volume), ())
+
+
+    def mfi(self, high, low, close, volume, period):
+        return self._call(tulipy.mfi, (high, low, close, volume), (period,))
+
+
+    def mom(self, close, period):
+        return self._call(tulipy.mom, (close,), (period,))
+
+
+def get_backends():
+    """Get the backends that can be used on this host.
+
+    Returns:
+        dict: The backend instances keyed by name, TA-Lib first when it is installed.
+    """
+
+    backends = dict()
+    if talib is not None:
+        backends['talib'] = TALibBackend()
+    if tulipy is not None:
+        backends['tulipy'] = TulipyBackend()
+    backends['numpy'] = NumpyBackend()
+    return backends
+
+
+def _get_benchmark_calls(candle_count=200, seed=0):
+    """Get the arguments each primitive is benchmarked with.
+
+    Args:
+        candle_count (int, optional): Defaults to 200. The number of random candles.
+        seed (int, optional): Defaults to 0. The random seed.
+
+    Returns:
+        dict: The positional arguments keyed by primitive.
+    """
+
+    # Prices as high as bitcoin's with small moves expose results that lose precision.
+    random_state = numpy.random.RandomState(seed)
+    close = 50000 + numpy.cumsum(random_state.normal(0, 1, candle_count))
+    spread = random_state.uniform(0, 1, candle_count)
+    high = close + spread
+    low = close - spread
+    volume = random_state.uniform(1, 1000, candle_count)
+
+    return {
+        'sma': (close, 15),
+        'ema': (close, 15),
+        'rsi': (close, 14),
+        'bbands': (close, 21, 2),
+        'macd': (close, 12, 26, 9),
+        'obv': (close, volume),
+        'mfi': (high, low, close, volume, 14),
+        'mom': (close, 10)
+    }
+
+
+def _is_close(result, expected):
+    """Check whether a result matches the expected values wherever those are defined.
+
+    Args:
+        result (numpy.ndarray): The values to check, or a tuple of them.
+        expected (numpy.ndarray): The expected values, or a tuple of them.
+
+    Returns:
+        bool: True when they match.
+    """
+
+    if isinstance(expected, tuple):
+        return all(_is_close(*pair) for pair in zip(result, expected))
+
+    defined = ~numpy.isnan(expected)
+    if result.shape != expected.shape or numpy.isnan(result[defined]).any():
+        return False
+
+    scale = numpy.abs(expected[defined]).max() if defined.any() else 1
+    return numpy.allclose(result[defined], expected[defined], rtol=1e-6, atol=scale * 1e-9)
+
+
+def benchmark_backends(backends, repeat=3, number=20):
+    """Time every backend on every primitive and check it against the reference backend.
+
+    TA-Lib is the reference when it is installed as the analyzers always used it, numpy
+    otherwise.
+
+    Args:
+        backends (dict): The backend instances keyed by name.
+        repeat (int, optional): Defaults to 3. How many times to time each primitive.
+        number (int, optional): Defaults to 20. How many calls each timing makes.
+
+    Returns:
+        dict: The seconds per call of each correct backend, keyed by primitive then backend.
+    """
+
+    reference = next(iter(backends.values()))
+    timings = dict()
+    for primitive, args in _get_benchmark_calls().items():
+        expected = getattr(reference, primitive)(*args)
+        timings[primitive] = dict()
+        for name, backend in backends.items():
+            function = getattr(backend, primitive)
+            if not _is_close(function(*args), expected):
+                continue
+
+            timings[primitive][name] = min(timeit.repeat(
+                lambda: function(*args),
+                number=number,
+                repeat=repeat
+            )) / number
+    return timings
+
+
+class BackendSelector():
+    """Routes each primitive to the backend chosen for it.
+    """
+
+    def __init__(self):
+        """Initializes BackendSelector class
+        """
+
+        self.logger = structlog.get_logger()
+        self.lock = threading.Lock()
+        self.selected = None
+
+
+    def select(self, backend_name='auto'):
+        """Choose the backend of every primitive.
+
+        Args:
+            backend_name (str, optional): Defaults to auto. The backend to use, auto picks the
+                fastest one that computes the same values as TA-Lib for each primitive.
+
+        Raises:
+            ValueError: The backend is not available on this host.
+        """
+
+        backends = get_backends()
+        if backend_name != 'auto':
+            if backend_name not in backends:
+                raise ValueError('TA backend {} is not available, choose one of {}'.format(
+                    backend_name,
+                    ', '.join(['auto'] + list(backends))
+                ))
+
+            self.selected = { primitive: backends[backend_name] for primitive in PRIMITIVES }
+            self.logger.info("Using the %s TA backend", backend_name)
+            return
+
+        timings = benchmark_backends(backends)
+        selected = dict()
+        for primitive in PRIMITIVES:
+            # The reference is always correct, so at least one backend is timed.
+            fastest = min(timings[primitive], key=timings[primitive].get)
+            selected[primitive] = backends[fastest]
+
+        self.selected = selected
+        self.logger.info(
+            "Selected TA backends: %s",
+            ', '.join(
+                '{}={}'.format(primitive, selected[primitive].name) for primitive in PRIMITIVES
+            )
+        )
+
+
+    def get(self, primitive):
+        """Get the backend of a primitive, selecting automatically on first use.
+
+        Args:
+            primitive (str): The name of the primitive.
+
+        Returns:
+            object: The backend instance.
+        """
+
+        if self.selected is None:
+            with self.lock:
+                if self.selected is None:
+                    self.select()
+        return self.selected[primitive]
+
+
+backend_selector = BackendSelector()
+
+
+def sma(close, period):
+    """Get the simple moving average.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        period (int): The number of candles averaged.
+
+    Returns:
+        numpy.ndarray: The average of each candle.
+    """
+
+    return backend_selector.get('sma').sma(close, period)
+
+
+def ema(close, period):
+    """Get the exponential moving average.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        period (int): The number of candles averaged.
+
+    Returns:
+        numpy.ndarray: The average of each candle.
+    """
+
+    return backend_selector.get('ema').ema(close, period)
+
+
+def rsi(close, period):
+    """Get the relative strength index.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        period (int): The number of candles smoothed over.
+
+    Returns:
+        numpy.ndarray: The RSI of each candle.
+    """
+
+    return backend_selector.get('rsi').rsi(close, period)
+
+
+def bbands(close, period, deviations):
+    """Get the Bollinger bands.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        period (int): The number of candles averaged.
+        deviations (float): How many standard deviations the outer bands are from the middle.
+
+    Returns:
+        tuple: The upper, middle and lower band of each candle.
+    """
+
+    return backend_selector.get('bbands').bbands(close, period, deviations)
+
+
+def macd(close, fast_period=12, slow_period=26, signal_period=9):
+    """Get the moving average convergence divergence.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        fast_period (int, optional): Defaults to 12. The period of the fast average.
+        slow_period (int, optional): Defaults to 26. The period of the slow average.
+        signal_period (int, optional): Defaults to 9. The period of the signal line average.
+
+    Returns:
+        tuple: The MACD, signal and histogram of each candle.
+    """
+
+    return backend_selector.get('macd').macd(close, fast_period, slow_period, signal_period)
+
+
+def obv(close, volume):
+    """Get the on balance volume.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        volume (numpy.ndarray): The volumes.
+
+    Returns:
+        numpy.ndarray: The OBV of each candle.
+    """
+
+    return backend_selector.get('obv').obv(close, volume)
+
+
+def mfi(high, low, close, volume, period):
+    """Get the money flow index.
+
+    Args:
+        high (numpy.ndarray): The highest prices.
+        low (numpy.ndarray): The lowest prices.
+        close (numpy.ndarray): The closing prices.
+        volume (numpy.ndarray): The volumes.
+        period (int): The number of candles the money flow is summed over.
+
+    Returns:
+        numpy.ndarray: The MFI of each candle.
+    """
+
+    return backend_selector.get('mfi').mfi(high, low, close, volume, period)
+
+
+def mom(close, period):
+    """Get the momentum.
+
+    Args:
+        close (numpy.ndarray): The closing prices.
+        period (int): How many candles back the price is compared with.
+
+    Returns:
+        numpy.ndarray: The momentum of each candle.
+    """
+
+    return backend_selector.get('mom').mom(close, period)
@@ -3,14 +3,50 @@
 
 import numpy
 import pandas
-from talib import abstract
 
 from analyzers.utils import IndicatorUtils
 
 
+def get_cross_events(difference):
+    """Find where the difference between two lines changes sign, for many pairs of lines at once.
+
+    A line that touches the other without going through it does not cross it.
+
+    Args:
+        difference (numpy.ndarray): The key line minus the crossed line without NaNs, one row per
+            pair of lines.
+
+    Returns:
+        tuple: An array that is 1 where the key line crossed above, -1 where it crossed below
+            and 0 elsewhere, and an array of how many candles ago the latest cross happened, NaN
+            until the first cross.
+    """
+
+    sign = numpy.sign(difference)
+    rows = numpy.arange(sign.shape[0])[:, None]
+    positions = numpy.arange(sign.shape[1])
+
+    # Carry the last non zero sign over the candles where the lines touch.
+    last_signed = numpy.where(sign != 0, positions, 0)
+    numpy.maximum.accumulate(last_signed, axis=1, out=last_signed)
+    carried_sign = sign[rows, last_signed]
+
+    cross = numpy.zeros(sign.shape, dtype=int)
+    cross[:, 1:][(sign[:, 1:] > 0) & (carried_sign[:, :-1] < 0)] = 1
+    cross[:, 1:][(sign[:, 1:] < 0) & (carried_sign[:, :-1] > 0)] = -1
+
+    last_cross = numpy.where(cross != 0, positions, -1)
+    numpy.maximum.accumulate(last_cross, axis=1, out=last_cross)
+    bars_since_cross = (positions - last_cross).astype(float)
+    bars_since_cross[last_cross < 0] = numpy.nan
+
+    return cross, bars_since_cross
+
+
 class CrossOver(IndicatorUtils):
     def analyze(self, key_indicator, key_signal, key_indicator_index,
-                crossed_indicator, crossed_signal, crossed_indicator_index):
+                crossed_indicator, crossed_signal, crossed_indicator_index,
+                max_bars_since_cross=None):
         """ Tests for key_indicator crossing over the crossed_indicator.
 
         Args:
@@ -22,27 +58,116 @@ class CrossOver(IndicatorUtils):
                 analysis for the selected indicator to test for a cross.
             crossed_signal (str): The name of the indicator expecting to be crossed.
             crossed_indicator_index (int): The configuration index of the crossed indicator to use.
+            max_bars_since_cross (int, optional): Defaults to None. Only be hot or cold within this
+                many candles after the cross, instead of for as long as the key indicator stays
+                above or below.
+
+        Returns:
+            pandas.DataFrame: A dataframe containing the indicators, the cross events, the number
+                of candles since the latest cross and hot/cold values.
+        """
+
+        return self.analyze_all([{
+            'key_indicator': key_indicator,
+            'key_signal': key_signal,
+            'key_indicator_index': key_indicator_index,
+            'crossed_indicator': crossed_indicator,
+            'crossed_signal': crossed_signal,
+            'crossed_indicator_index': crossed_indicator_index,
+            'max_bars_since_cross': max_bars_since_cross
+        }])[0]
+
+
+    def analyze_all(self, crossover_args):
+        """ Tests many crossovers at once, the crossovers spanning as many candles are computed
+        together.
+
+        Args:
+            crossover_args (list): The keyword arguments of analyze for each crossover.
 
         Returns:
-            pandas.DataFrame: A dataframe containing the indicators and hot/cold values.
+            list: The result dataframe of each crossover, in the same order.
         """
 
-        key_indicator_name = '{}_{}'.format(key_signal, key_indicator_index)
-        new_key_indicator = key_indicator.copy(deep=True)
-        for column in new_key_indicator:
-            column_indexed_name = '{}_{}'.format(column, key_indicator_index)
-            new_key_indicator.rename(columns={column: column_indexed_name}, inplace=True)
+        lines = [self._align_lines(**args) for args in crossover_args]
+
+        lengths = dict()
+        for line_index, (_, key_values, crossed_values) in enumerate(lines):
+            lengths.setdefault(key_values.shape[0], list()).append(line_index)
+
+        events = dict()
+        for line_indexes in lengths.values():
+            difference = numpy.stack([
+                lines[line_index][1] - lines[line_index][2] for line_index in line_indexes
+            ])
+            cross, bars_since_cross = get_cross_events(difference)
+            for row, line_index in enumerate(line_indexes):
+                events[line_index] = (difference[row], cross[row], bars_since_cross[row])
+
+        results = list()
+        for line_index, args in enumerate(crossover_args):
+            index, key_values, crossed_values = lines[line_index]
+            difference, cross, bars_since_cross = events[line_index]
+
+            is_hot = difference > 0
+            is_cold = difference < 0
+            if args.get('max_bars_since_cross') is not None:
+                with numpy.errstate(invalid='ignore'):
+                    recent = bars_since_cross <= args['max_bars_since_cross']
+                is_hot &= recent
+                is_cold &= recent
+
+            key_indicator_name = '{}_{}'.format(args['key_signal'], args['key_indicator_index'])
+            crossed_indicator_name = '{}_{}'.format(
+                args['crossed_signal'],
+                args['crossed_indicator_index']
+            )
+
+            results.append(pandas.DataFrame(
+                {
+                    key_indicator_name: key_values,
+                    crossed_indicator_name: crossed_values,
+                    'cross': cross,
+                    'bars_since_cross': bars_since_cross,
+                    'is_hot': is_hot,
+                    'is_cold': is_cold
+                },
+                index=index,
+                columns=[
+                    key_indicator_name,
+                    crossed_indicator_name,
+                    'cross',
+                    'bars_since_cross',
+                    'is_hot',
+                    'is_cold'
+                ]
+            ))
+
+        return results
+
+
+    def _align_lines(self, key_indicator, key_signal, crossed_indicator, crossed_signal, **kwargs):
+        """ Get the candles both lines have a value for.
+
+        Args:
+            key_indicator (pandas.DataFrame): The results of the key indicator.
+            key_signal (str): The name of the key indicator line.
+            crossed_indicator (pandas.DataFrame): The results of the crossed indicator.
+            crossed_signal (str): The name of the crossed indicator line.
+
+        Returns:
+            tuple: The shared index and the values of the key and crossed lines on it.
+        """
 
-        crossed_indicator_name = '{}_{}'.format(crossed_signal, crossed_indicator_index)
-        new_crossed_indicator = crossed_indicator.copy(deep=True)
-        for column in new_crossed_indicator:
-            column_indexed_name = '{}_{}'.format(column, crossed_indicator_index)
-            new_crossed_indicator.rename(columns={column: column_indexed_name}, inplace=True)
+        key_line = key_indicator[key_signal]
+        crossed_line = crossed_indicator[crossed_signal]
 
-        combined_data = pandas.concat([new_key_indicator, new_crossed_indicator], axis=1)
-        combined_data.dropna(how='any', inplace=True)
+        # Indicators of the same candle period share their index, so no alignment is needed.
+        if not key_line.index.equals(crossed_line.index):
+            key_line, crossed_line = key_line.align(crossed_line, join='inner')
 
-        combined_data['is_hot'] = combined_data[key_indicator_name] > combined_data[crossed_indicator_name]
-        combined_data['is_cold'] = combined_data[key_indicator_name] < combined_data[crossed_indicator_name]
+        key_values = numpy.asarray(key_line.values, dtype=float)
+        crossed_values = numpy.asarray(crossed_line.values, dtype=float)
+        valid = ~(numpy.isnan(key_values) | numpy.isnan(crossed_values))
 
-        return combined_data
+        return key_line.index[valid], key_values[valid], crossed_values[valid]
@@ -1,12 +1,9 @@
 """ Ichimoku Indicator
 """
 
-import math
-
-import numpy
 import pandas
-from talib import abstract
 
+from analyzers import kernels
 from analyzers.utils import IndicatorUtils
 
 
@@ -33,62 +30,65 @@ class Ichimoku(IndicatorUtils):
 
         dataframe = self.convert_to_dataframe(historical_data)
 
-        ichimoku_columns = {
-            'tenkansen': [numpy.nan] * dataframe.index.shape[0],
-            'kijunsen': [numpy.nan] * dataframe.index.shape[0],
-            'leading_span_a': [numpy.nan] * dataframe.index.shape[0],
-            'leading_span_b': [numpy.nan] * dataframe.index.shape[0]
-        }
-
-        ichimoku_values = pandas.DataFrame(
-            ichimoku_columns,
-            index=dataframe.index
-        )
-
-        ichimoku_df_size = ichimoku_values.shape[0]
-
-        for index in range(tenkansen_period, ichimoku_df_size):
-            start_index = index - tenkansen_period
-            last_index = index + 1
-            tankansen_min = dataframe['low'][start_index:last_index].min()
-            tankansen_max = dataframe['high'][start_index:last_index].max()
-            ichimoku_values['tenkansen'][index] = (tankansen_min + tankansen_max) / 2
-
-        for index in range(kijunsen_period, ichimoku_df_size):
-            start_index = index - kijunsen_period
-            last_index = index + 1
-            kijunsen_min = dataframe['low'][start_index:last_index].min()
-            kijunsen_max = dataframe['high'][start_index:last_index].max()
-            ichimoku_values['kijunsen'][index] = (kijunsen_min + kijunsen_max) / 2
-
-        for index in range(leading_span_b_period, ichimoku_df_size):
-            start_index = index - leading_span_b_period
-            last_index = index + 1
-            leading_span_b_min = dataframe['low'][start_index:last_index].min()
-            leading_span_b_max = dataframe['high'][start_index:last_index].max()
-            ichimoku_values['leading_span_b'][index] = (
-                leading_span_b_min + leading_span_b_max
-            ) / 2
-
+        ichimoku_values = pandas.DataFrame(index=dataframe.index)
+        ichimoku_values['tenkansen'] = self._get_midpoint(dataframe, tenkansen_period)
+        ichimoku_values['kijunsen'] = self._get_midpoint(dataframe, kijunsen_period)
         ichimoku_values['leading_span_a'] = (
             ichimoku_values['tenkansen'] + ichimoku_values['kijunsen']
         ) / 2
+        ichimoku_values['leading_span_b'] = self._get_midpoint(dataframe, leading_span_b_period)
 
         ichimoku_values.dropna(how='any', inplace=True)
-        ichimoku_df_size = ichimoku_values.shape[0]
+
+        return self.get_signals(ichimoku_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, ichimoku_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the ichimoku cloud is hot or cold.
+
+        Args:
+            ichimoku_values (pandas.DataFrame): The ichimoku cloud lines.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The ichimoku cloud lines with the hot/cold columns added.
+        """
+
+        close = dataframe['close'].reindex(ichimoku_values.index)
 
         ichimoku_values['is_hot'] = False
         ichimoku_values['is_cold'] = False
 
-        for index in range(0, ichimoku_df_size):
-            span_hot = ichimoku_values['leading_span_a'][index] > ichimoku_values['leading_span_b'][index]
-            close_hot = dataframe['close'][index] > ichimoku_values['leading_span_a'][index]
-            if hot_thresh:
-                ichimoku_values.at[ichimoku_values.index[index], 'is_hot'] = span_hot and close_hot
+        if hot_thresh:
+            ichimoku_values['is_hot'] = (
+                (ichimoku_values['leading_span_a'] > ichimoku_values['leading_span_b'])
+                & (close > ichimoku_values['leading_span_a'])
+            )
 
-            span_cold = ichimoku_values['leading_span_a'][index] < ichimoku_values['leading_span_b'][index]
-            close_cold = dataframe['close'][index] < ichimoku_values['leading_span_a'][index]
-            if cold_thresh:
-                ichimoku_values.at[ichimoku_values.index[index], 'is_cold'] = span_cold and close_cold
+        if cold_thresh:
+            ichimoku_values['is_cold'] = (
+                (ichimoku_values['leading_span_a'] < ichimoku_values['leading_span_b'])
+                & (close < ichimoku_values['leading_span_a'])
+            )
 
         return ichimoku_values
+
+
+    def _get_midpoint(self, dataframe, period):
+        """Get the midpoint between the highest high and lowest low of each window.
+
+        Args:
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            period (int): The number of candles preceding the current one in each window.
+
+        Returns:
+            pandas.Series: The midpoints, NaN until a full window is available.
+        """
+
+        window = period + 1
+        lowest_low = kernels.rolling_min(dataframe['low'].values, window)
+        highest_high = kernels.rolling_max(dataframe['high'].values, window)
+        return pandas.Series((lowest_low + highest_high) / 2, index=dataframe.index)
@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -27,9 +27,31 @@ class MACD(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        macd_values = abstract.MACD(dataframe).iloc[:]
+        macd, macdsignal, macdhist = backends.macd(dataframe['close'].values)
+        macd_values = pandas.DataFrame(
+            {'macd': macd, 'macdsignal': macdsignal, 'macdhist': macdhist},
+            index=dataframe.index,
+            columns=['macd', 'macdsignal', 'macdhist']
+        )
         macd_values.dropna(how='all', inplace=True)
 
+        return self.get_signals(macd_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, macd_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the MACD is hot or cold.
+
+        Args:
+            macd_values (pandas.DataFrame): The MACD values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The MACD values with the hot/cold columns added.
+        """
+
         if macd_values[signal[0]].shape[0]:
             macd_values['is_hot'] = macd_values[signal[0]] > hot_thresh
             macd_values['is_cold'] = macd_values[signal[0]] < cold_thresh
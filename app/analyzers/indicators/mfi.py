@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -30,13 +30,35 @@ class MFI(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        mfi_values = abstract.MFI(dataframe, period_count).to_frame()
+        mfi = backends.mfi(
+            dataframe['high'].values,
+            dataframe['low'].values,
+            dataframe['close'].values,
+            dataframe['volume'].values,
+            period_count
+        )
+        mfi_values = pandas.DataFrame({'mfi': mfi}, index=dataframe.index)
         mfi_values.dropna(how='all', inplace=True)
-        mfi_values.rename(columns={0: 'mfi'}, inplace=True)
+
+        return self.get_signals(mfi_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, mfi_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the MFI is hot or cold.
+
+        Args:
+            mfi_values (pandas.DataFrame): The MFI values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The MFI values with the hot/cold columns added.
+        """
 
         if mfi_values[signal[0]].shape[0]:
             mfi_values['is_hot'] = mfi_values[signal[0]] < hot_thresh
             mfi_values['is_cold'] = mfi_values[signal[0]] > cold_thresh
 
         return mfi_values
-
@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -30,9 +30,28 @@ class Momentum(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        mom_values = abstract.MOM(dataframe, period_count).to_frame()
+        mom_values = pandas.DataFrame(
+            {'momentum': backends.mom(dataframe['close'].values, period_count)},
+            index=dataframe.index
+        )
         mom_values.dropna(how='all', inplace=True)
-        mom_values.rename(columns={mom_values.columns[0]: 'momentum'}, inplace=True)
+
+        return self.get_signals(mom_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, mom_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the momentum is hot or cold.
+
+        Args:
+            mom_values (pandas.DataFrame): The momentum values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The momentum values with the hot/cold columns added.
+        """
 
         if mom_values[signal[0]].shape[0]:
             mom_values['is_hot'] = mom_values[signal[0]] > hot_thresh
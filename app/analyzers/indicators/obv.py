@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -27,10 +27,29 @@ class OBV(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        obv_values = abstract.OBV(dataframe).to_frame()
+        obv_values = pandas.DataFrame(
+            {"obv": backends.obv(dataframe["close"].values, dataframe["volume"].values)},
+            index=dataframe.index
+        )
 
         obv_values.dropna(how="all", inplace=True)
-        obv_values.rename(columns={obv_values.columns[0]: "obv"}, inplace=True)
+
+        return self.get_signals(obv_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, obv_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the OBV is hot or cold.
+
+        Args:
+            obv_values (pandas.DataFrame): The OBV values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The OBV values with the hot/cold columns added.
+        """
 
         if obv_values[signal[0]].shape[0]:
             obv_values["is_hot"] = obv_values[signal[0]] > hot_thresh
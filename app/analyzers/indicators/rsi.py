@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -30,9 +30,28 @@ class RSI(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        rsi_values = abstract.RSI(dataframe, period_count).to_frame()
+        rsi_values = pandas.DataFrame(
+            {'rsi': backends.rsi(dataframe['close'].values, period_count)},
+            index=dataframe.index
+        )
         rsi_values.dropna(how='all', inplace=True)
-        rsi_values.rename(columns={rsi_values.columns[0]: 'rsi'}, inplace=True)
+
+        return self.get_signals(rsi_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, rsi_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the RSI is hot or cold.
+
+        Args:
+            rsi_values (pandas.DataFrame): The RSI values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The RSI values with the hot/cold columns added.
+        """
 
         if rsi_values[signal[0]].shape[0]:
             rsi_values['is_hot'] = rsi_values[signal[0]] < hot_thresh
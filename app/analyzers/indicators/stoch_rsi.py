@@ -1,12 +1,10 @@
 """ Stochastic RSI Indicator
 """
 
-import math
-
 import numpy
 import pandas
-from talib import abstract
 
+from analyzers import backends, kernels
 from analyzers.utils import IndicatorUtils
 
 
@@ -32,23 +30,42 @@ class StochasticRSI(IndicatorUtils):
 
         dataframe = self.convert_to_dataframe(historical_data)
         rsi_period_count = period_count * 2
-        rsi_values = abstract.RSI(dataframe, rsi_period_count).to_frame()
+        rsi_values = pandas.DataFrame(
+            {'rsi': backends.rsi(dataframe['close'].values, rsi_period_count)},
+            index=dataframe.index
+        )
         rsi_values.dropna(how='all', inplace=True)
-        rsi_values.rename(columns={0: 'rsi'}, inplace=True)
-
-        rsi_values = rsi_values.assign(stoch_rsi=numpy.nan)
-        for index in range(period_count, rsi_values.shape[0]):
-            start_index = index - period_count
-            last_index = index + 1
-            rsi_min = rsi_values['rsi'].iloc[start_index:last_index].min()
-            rsi_max = rsi_values['rsi'].iloc[start_index:last_index].max()
-            stoch_rsi = (100 * ((rsi_values['rsi'][index] - rsi_min) / (rsi_max - rsi_min)))
-            rsi_values['stoch_rsi'][index] = stoch_rsi
-
-        rsi_values['slow_k'] = rsi_values['stoch_rsi'].rolling(window=3).mean()
-        rsi_values['slow_d'] = rsi_values['slow_k'].rolling(window=3).mean()
+
+        rsi = rsi_values['rsi'].values
+        window = period_count + 1
+        rsi_min = kernels.rolling_min(rsi, window)
+        rsi_max = kernels.rolling_max(rsi, window)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            stoch_rsi = 100 * ((rsi - rsi_min) / (rsi_max - rsi_min))
+
+        rsi_values['stoch_rsi'] = stoch_rsi
+        rsi_values['slow_k'] = kernels.rolling_mean(stoch_rsi, 3)
+        rsi_values['slow_d'] = kernels.rolling_mean(rsi_values['slow_k'].values, 3)
         rsi_values.dropna(how='any', inplace=True)
 
+        return self.get_signals(rsi_values, dataframe, signal, hot_thresh, cold_thresh)
+
+
+    def get_signals(self, rsi_values, dataframe, signal, hot_thresh, cold_thresh):
+        """Flags the candles where the Stochastic RSI is hot or cold.
+
+        Args:
+            rsi_values (pandas.DataFrame): The Stochastic RSI values.
+            dataframe (pandas.DataFrame): The historical OHCLV data.
+            signal (list): The indicator line to check hot/cold against.
+            hot_thresh (float): The threshold at which this might be good to purchase.
+            cold_thresh (float): The threshold at which this might be good to sell.
+
+        Returns:
+            pandas.DataFrame: The Stochastic RSI values with the hot/cold columns added.
+        """
+
         if rsi_values[signal[0]].shape[0]:
             rsi_values['is_hot'] = rsi_values[signal[0]] < hot_thresh
             rsi_values['is_cold'] = rsi_values[signal[0]] > cold_thresh
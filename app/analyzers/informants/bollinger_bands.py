@@ -3,11 +3,10 @@
 
 import math
 
-import tulipy
 import numpy
 import pandas
-#from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -26,29 +25,26 @@ class Bollinger(IndicatorUtils):
 
         dataframe = self.convert_to_dataframe(historical_data)
 
+        close_data = numpy.array(dataframe['close'], dtype=float)
         bb_columns = {
-            'upperband': [numpy.nan] * dataframe.index.shape[0],
-            'middleband': [numpy.nan] * dataframe.index.shape[0],
-            'lowerband': [numpy.nan] * dataframe.index.shape[0]
+            'upperband': numpy.full(close_data.size, numpy.nan),
+            'middleband': numpy.full(close_data.size, numpy.nan),
+            'lowerband': numpy.full(close_data.size, numpy.nan)
         }
 
+        if close_data.size > period_count:
+            upperband, middleband, lowerband = backends.bbands(close_data, period_count, 2)
+
+            # Each candle gets the bands of the window that ended on the candle before it.
+            bb_columns['upperband'][period_count:] = upperband[period_count - 1:-1]
+            bb_columns['middleband'][period_count:] = middleband[period_count - 1:-1]
+            bb_columns['lowerband'][period_count:] = lowerband[period_count - 1:-1]
+
         bb_values = pandas.DataFrame(
             bb_columns,
             index=dataframe.index
         )
 
-        bb_df_size = bb_values.shape[0]
-        close_data = numpy.array(dataframe['close'])
-
-        if close_data.size > period_count:
-            bb_data = tulipy.bbands(close_data, period_count, 2)
-
-            for index in range(period_count, bb_df_size):
-                data_index = index - period_count
-                bb_values['lowerband'][index] = bb_data[0][data_index]
-                bb_values['middleband'][index] = bb_data[1][data_index]
-                bb_values['upperband'][index] = bb_data[2][data_index]
-
         bb_values.dropna(how='all', inplace=True)
 
         return bb_values
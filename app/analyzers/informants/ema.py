@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -23,8 +23,10 @@ class EMA(IndicatorUtils):
 		"""
 
         dataframe = self.convert_to_dataframe(historical_data)
-        ema_values = abstract.EMA(dataframe, period_count).to_frame()
+        ema_values = pandas.DataFrame(
+            {'ema': backends.ema(dataframe['close'].values, period_count)},
+            index=dataframe.index
+        )
         ema_values.dropna(how='all', inplace=True)
-        ema_values.rename(columns={0: 'ema'}, inplace=True)
 
         return ema_values
@@ -4,8 +4,8 @@
 import math
 
 import pandas
-from talib import abstract
 
+from analyzers import backends
 from analyzers.utils import IndicatorUtils
 
 
@@ -23,8 +23,10 @@ class SMA(IndicatorUtils):
         """
 
         dataframe = self.convert_to_dataframe(historical_data)
-        sma_values = abstract.SMA(dataframe, period_count).to_frame()
+        sma_values = pandas.DataFrame(
+            {'sma': backends.sma(dataframe['close'].values, period_count)},
+            index=dataframe.index
+        )
         sma_values.dropna(how='all', inplace=True)
-        sma_values.rename(columns={0: 'sma'}, inplace=True)
 
         return sma_values
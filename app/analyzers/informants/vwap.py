@@ -1,12 +1,10 @@
 """ VWAP Indicator
 """
 
-import math
-
 import numpy
 import pandas
-from talib import abstract
 
+from analyzers import kernels
 from analyzers.utils import IndicatorUtils
 
 
@@ -25,22 +23,16 @@ class VWAP(IndicatorUtils):
 
         dataframe = self.convert_to_dataframe(historical_data)
 
-        vwap_values = pandas.DataFrame(numpy.nan, index=dataframe.index, columns=['vwap'])
-
-        for index in range(period_count, vwap_values.shape[0]):
-            start_index = index - period_count
-            last_index = index + 1
-
-            total_volume = dataframe['volume'].iloc[start_index:last_index]
-            total_high = dataframe['high'].iloc[start_index:last_index]
-            total_low = dataframe['low'].iloc[start_index:last_index]
+        window = period_count + 1
+        volume = dataframe['volume'].values
+        average_price = (dataframe['high'].values + dataframe['low'].values) / 2
 
-            total_average_price = total_volume * (total_high + total_low) / 2
-
-            vwap = total_average_price.sum() / total_volume.sum()
-            vwap_values['vwap'][index] = vwap
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            vwap = (
+                kernels.rolling_sum(volume * average_price, window)
+                / kernels.rolling_sum(volume, window)
+            )
 
+        vwap_values = pandas.DataFrame({'vwap': vwap}, index=dataframe.index)
         vwap_values.dropna(how='all', inplace=True)
         return vwap_values
-
-
@@ -0,0 +1,172 @@
+""" Rolling window primitives shared by the hand written analyzers
+"""
+
+import numpy
+
+
+def _check_window(window):
+    """Validate a rolling window size.
+
+    Args:
+        window (int): The number of values in each window.
+
+    Raises:
+        ValueError: The window is smaller than one value.
+    """
+
+    if window < 1:
+        raise ValueError('Rolling window must be at least 1, got {}'.format(window))
+
+
+def _rolling_extreme(values, window, ufunc):
+    """Get the minimum or maximum of each window along the last axis in O(n).
+
+    Uses the van Herk/Gil-Werman algorithm, the values are split into blocks of the window size
+    and every window is covered by the suffix of one block and the prefix of the next.
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+        ufunc (numpy.ufunc): numpy.minimum or numpy.maximum.
+
+    Returns:
+        numpy.ndarray: The extreme of the window ending at each value, NaN until the first full
+            window or when the window contains a NaN.
+    """
+
+    _check_window(window)
+    values = numpy.asarray(values, dtype=float)
+    length = values.shape[-1]
+    result = numpy.full(values.shape, numpy.nan)
+
+    if length < window:
+        return result
+
+    padding = numpy.full(values.shape[:-1] + ((-length) % window,), numpy.nan)
+    blocks = numpy.concatenate((values, padding), axis=-1)
+    blocks = blocks.reshape(values.shape[:-1] + (-1, window))
+
+    prefix = ufunc.accumulate(blocks, axis=-1).reshape(values.shape[:-1] + (-1,))
+    suffix = ufunc.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1]
+    suffix = suffix.reshape(values.shape[:-1] + (-1,))
+
+    result[..., window - 1:] = ufunc(
+        suffix[..., :length - window + 1],
+        prefix[..., window - 1:length]
+    )
+    return result
+
+
+def rolling_min(values, window):
+    """Get the minimum of each window along the last axis in O(n).
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+
+    Returns:
+        numpy.ndarray: The minimum of the window ending at each value, NaN until the first full
+            window or when the window contains a NaN.
+    """
+
+    return _rolling_extreme(values, window, numpy.minimum)
+
+
+def rolling_max(values, window):
+    """Get the maximum of each window along the last axis in O(n).
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+
+    Returns:
+        numpy.ndarray: The maximum of the window ending at each value, NaN until the first full
+            window or when the window contains a NaN.
+    """
+
+    return _rolling_extreme(values, window, numpy.maximum)
+
+
+def rolling_sum(values, window):
+    """Get the sum of each window along the last axis in O(n) using cumulative sums.
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+
+    Returns:
+        numpy.ndarray: The sum of the window ending at each value, NaN until the first full
+            window or when the window contains a NaN.
+    """
+
+    _check_window(window)
+    values = numpy.asarray(values, dtype=float)
+    length = values.shape[-1]
+    result = numpy.full(values.shape, numpy.nan)
+
+    if length < window:
+        return result
+
+    # NaNs are summed as zero and counted separately so one NaN does not spoil every later sum.
+    missing = numpy.isnan(values)
+    zeros = numpy.zeros(values.shape[:-1] + (1,))
+    totals = numpy.concatenate(
+        (zeros, numpy.cumsum(numpy.where(missing, 0, values), axis=-1)),
+        axis=-1
+    )
+    missing_totals = numpy.concatenate((zeros, numpy.cumsum(missing, axis=-1)), axis=-1)
+
+    result[..., window - 1:] = totals[..., window:] - totals[..., :-window]
+    window_missing = missing_totals[..., window:] - missing_totals[..., :-window]
+    result[..., window - 1:][window_missing > 0] = numpy.nan
+    return result
+
+
+def rolling_mean(values, window):
+    """Get the mean of each window along the last axis in O(n).
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+
+    Returns:
+        numpy.ndarray: The mean of the window ending at each value, NaN until the first full
+            window or when the window contains a NaN.
+    """
+
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values, window):
+    """Get the population standard deviation of each window along the last axis.
+
+    The deviations are taken from the mean of each window rather than from the mean of the
+    squares, which loses the precision of high prices to cancellation.
+
+    Args:
+        values (numpy.ndarray): The values to roll over.
+        window (int): The number of values in each window.
+
+    Returns:
+        numpy.ndarray: The standard deviation of the window ending at each value, NaN until the
+            first full window or when the window contains a NaN.
+    """
+
+    _check_window(window)
+    values = numpy.ascontiguousarray(values, dtype=float)
+    length = values.shape[-1]
+    result = numpy.full(values.shape, numpy.nan)
+
+    if length < window:
+        return result
+
+    windows = numpy.lib.stride_tricks.as_strided(
+        values,
+        shape=values.shape[:-1] + (length - window + 1, window),
+        strides=values.strides + values.strides[-1:],
+        writeable=False
+    )
+    means = rolling_mean(values, window)[..., window - 1:]
+    deviations = windows - means[..., numpy.newaxis]
+    result[..., window - 1:] = numpy.sqrt((deviations * deviations).mean(axis=-1))
+    return result
@@ -0,0 +1,495 @@
+""" Indicator states that are updated one candle at a time
+
+The states only use elementwise numpy operations, so a candle can be a single array of open,
+high, low, close, volume or a 2D array holding the latest candle of several pairs.
+"""
+
+import numpy
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+
+def _missing(shape):
+    """Get the value returned before an indicator has seen enough candles.
+
+    Args:
+        shape (tuple): The shape of the values.
+
+    Returns:
+        numpy.ndarray: NaN values of the given shape.
+    """
+
+    return numpy.full(shape, numpy.nan)
+
+
+class Window():
+    """Ring buffer holding the last values pushed.
+    """
+
+    def __init__(self, size):
+        """Initializes Window class
+
+        Args:
+            size (int): The number of values to hold.
+        """
+
+        if size < 1:
+            raise ValueError('Window size must be at least 1, got {}'.format(size))
+
+        self.size = size
+        self.values = None
+        self.position = 0
+        self.count = 0
+
+
+    def push(self, value):
+        """Add a value, dropping the oldest one once the window is full.
+
+        Args:
+            value (numpy.ndarray): The value to add.
+
+        Returns:
+            numpy.ndarray: The value dropped from the window, NaN while the window fills up.
+        """
+
+        value = numpy.asarray(value, dtype=float)
+        if self.values is None:
+            self.values = numpy.full(value.shape + (self.size,), numpy.nan)
+
+        dropped = self.values[..., self.position].copy()
+        self.values[..., self.position] = value
+        self.position = (self.position + 1) % self.size
+        self.count += 1
+        return dropped
+
+
+    def is_full(self):
+        return self.count >= self.size
+
+
+    def oldest(self):
+        """Get the oldest value in the window.
+
+        Returns:
+            numpy.ndarray: The oldest value, NaN while the window fills up.
+        """
+
+        return self.values[..., self.position]
+
+
+    def ordered(self):
+        """Get the values in the window from oldest to newest.
+
+        Returns:
+            numpy.ndarray: The values along the last axis.
+        """
+
+        return numpy.roll(self.values, -self.position, axis=-1)
+
+
+class RollingSum():
+    """Running sum of the last values pushed.
+
+    NaNs are summed as zero and counted separately, like kernels.rolling_sum does, so a single
+    NaN only spoils the sums of the windows that hold it.
+    """
+
+    def __init__(self, size):
+        """Initializes RollingSum class
+
+        Args:
+            size (int): The number of values to sum.
+        """
+
+        self.window = Window(size)
+        self.total = 0
+        self.missing = 0
+
+
+    def push(self, value):
+        """Add a value to the sum.
+
+        Args:
+            value (numpy.ndarray): The value to add.
+
+        Returns:
+            numpy.ndarray: The sum of the last values, NaN while the window fills up or when it
+                holds a NaN.
+        """
+
+        dropped = self.window.push(value)
+        if self.window.position == 0:
+            # Summing the window afresh once per lap keeps rounding errors from piling up.
+            self.total = numpy.nansum(self.window.values, axis=-1)
+            self.missing = numpy.isnan(self.window.values).sum(axis=-1)
+        else:
+            missing = numpy.isnan(value)
+            self.total = self.total + numpy.where(missing, 0, value) - numpy.nan_to_num(dropped)
+            self.missing = self.missing + missing
+
+            # Until the window is full the dropped values are the NaNs it started out with.
+            if self.window.count > self.window.size:
+                self.missing = self.missing - numpy.isnan(dropped)
+
+        if not self.window.is_full():
+            return _missing(numpy.shape(value))
+        return numpy.where(self.missing > 0, numpy.nan, self.total)
+
+
+class ExponentialAverage():
+    """Exponential moving average seeded with the simple average of the first values, like
+    TA-Lib does.
+    """
+
+    def __init__(self, period, alpha=None):
+        """Initializes ExponentialAverage class
+
+        Args:
+            period (int): The number of values averaged for the seed.
+            alpha (float, optional): Defaults to 2 / (period + 1). The smoothing factor, Wilder
+                smoothing uses 1 / period.
+        """
+
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2 / (period + 1)
+        self.count = 0
+        self.total = 0
+        self.average = None
+
+
+    def push(self, value):
+        """Add a value to the average.
+
+        Args:
+            value (numpy.ndarray): The value to add.
+
+        Returns:
+            numpy.ndarray: The average, NaN until the seed is complete.
+        """
+
+        self.count += 1
+        if self.count < self.period:
+            self.total = self.total + value
+            return _missing(numpy.shape(value))
+
+        if self.count == self.period:
+            self.average = (self.total + value) / self.period
+        else:
+            self.average = self.average + self.alpha * (value - self.average)
+        return self.average
+
+
+class RSIState():
+    """Relative strength index using Wilder smoothing.
+    """
+
+    columns = ('rsi',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=14):
+        self.gains = ExponentialAverage(period_count, alpha=1 / period_count)
+        self.losses = ExponentialAverage(period_count, alpha=1 / period_count)
+        self.previous_close = None
+
+
+    def update(self, candle):
+        close = candle[..., CLOSE]
+        if self.previous_close is None:
+            self.previous_close = close
+            return (_missing(numpy.shape(close)),)
+
+        change = close - self.previous_close
+        self.previous_close = close
+        gain = self.gains.push(numpy.maximum(change, 0))
+        loss = self.losses.push(numpy.maximum(-change, 0))
+
+        total = gain + loss
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            rsi = numpy.where(numpy.abs(total) > 1e-8, 100 * gain / total, 0)
+        return (numpy.where(numpy.isnan(total), numpy.nan, rsi),)
+
+
+class MACDState():
+    """Moving average convergence divergence with the TA-Lib 12, 26, 9 periods.
+    """
+
+    columns = ('macd', 'macdsignal', 'macdhist')
+    dropna_how = 'all'
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.fast = ExponentialAverage(fast_period)
+        self.slow = ExponentialAverage(slow_period)
+        self.signal = ExponentialAverage(signal_period)
+        self.count = 0
+
+
+    def update(self, candle):
+        close = candle[..., CLOSE]
+        self.count += 1
+
+        # TA-Lib seeds the fast average on the candles leading up to the first slow average.
+        slow = self.slow.push(close)
+        if self.count > self.slow_period - self.fast_period:
+            fast = self.fast.push(close)
+
+        if self.count < self.slow_period:
+            return (_missing(numpy.shape(close)),) * 3
+
+        macd = fast - slow
+        signal = self.signal.push(macd)
+        if self.count < self.slow_period + self.signal_period - 1:
+            return (_missing(numpy.shape(close)),) * 3
+        return (macd, signal, macd - signal)
+
+
+class MFIState():
+    """Money flow index.
+    """
+
+    columns = ('mfi',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=14):
+        self.positive_flow = RollingSum(period_count)
+        self.negative_flow = RollingSum(period_count)
+        self.previous_price = None
+
+
+    def update(self, candle):
+        typical_price = (candle[..., HIGH] + candle[..., LOW] + candle[..., CLOSE]) / 3
+        if self.previous_price is None:
+            self.previous_price = typical_price
+            return (_missing(numpy.shape(typical_price)),)
+
+        money_flow = typical_price * candle[..., VOLUME]
+        positive_flow = self.positive_flow.push(
+            numpy.where(typical_price > self.previous_price, money_flow, 0)
+        )
+        negative_flow = self.negative_flow.push(
+            numpy.where(typical_price < self.previous_price, money_flow, 0)
+        )
+        self.previous_price = typical_price
+
+        total = positive_flow + negative_flow
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            mfi = numpy.where(total < 1, 0, 100 * positive_flow / total)
+        return (numpy.where(numpy.isnan(total), numpy.nan, mfi),)
+
+
+class MomentumState():
+    """Difference between the close and the close a number of candles ago.
+    """
+
+    columns = ('momentum',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=10):
+        self.closes = Window(period_count)
+
+
+    def update(self, candle):
+        close = candle[..., CLOSE]
+        return (close - self.closes.push(close),)
+
+
+class OBVState():
+    """On balance volume counted from the first candle of a window of candles, like TA-Lib
+    does for the candles it is given.
+    """
+
+    columns = ('obv',)
+    dropna_how = 'all'
+    # The value depends on where the window starts, so the state is built for a window length.
+    window_bound = True
+
+    def __init__(self, window_length):
+        self.volumes = Window(window_length)
+        self.signed_volumes = RollingSum(window_length - 1) if window_length > 1 else None
+        self.previous_close = None
+        self.total = None
+
+
+    def update(self, candle):
+        close = candle[..., CLOSE]
+        volume = candle[..., VOLUME]
+        self.volumes.push(volume)
+
+        if self.signed_volumes is None:
+            return (volume,)
+
+        if self.previous_close is None:
+            self.previous_close = close
+            self.total = volume
+            return (volume,)
+
+        signed_volume = numpy.where(
+            close > self.previous_close,
+            volume,
+            numpy.where(close < self.previous_close, -volume, 0)
+        )
+        self.previous_close = close
+
+        signed_total = self.signed_volumes.push(signed_volume)
+        if self.volumes.is_full():
+            return (self.volumes.oldest() + signed_total,)
+
+        self.total = self.total + signed_volume
+        return (self.total,)
+
+
+class StochasticRSIState():
+    """Stochastic oscillator of the RSI with slow K and D lines.
+    """
+
+    columns = ('rsi', 'stoch_rsi', 'slow_k', 'slow_d')
+    dropna_how = 'any'
+
+    def __init__(self, period_count=14):
+        self.rsi = RSIState(period_count * 2)
+        self.rsi_window = Window(period_count + 1)
+        self.slow_k = RollingSum(3)
+        self.slow_d = RollingSum(3)
+
+
+    def update(self, candle):
+        rsi = self.rsi.update(candle)[0]
+        missing = _missing(numpy.shape(rsi))
+        if numpy.isnan(rsi).all():
+            return (rsi, missing, missing, missing)
+
+        self.rsi_window.push(rsi)
+        if not self.rsi_window.is_full():
+            return (rsi, missing, missing, missing)
+
+        rsi_min = self.rsi_window.values.min(axis=-1)
+        rsi_max = self.rsi_window.values.max(axis=-1)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            stoch_rsi = 100 * ((rsi - rsi_min) / (rsi_max - rsi_min))
+
+        slow_k = self.slow_k.push(stoch_rsi) / 3
+        if numpy.isnan(slow_k).all():
+            return (rsi, stoch_rsi, slow_k, missing)
+        return (rsi, stoch_rsi, slow_k, self.slow_d.push(slow_k) / 3)
+
+
+class IchimokuState():
+    """Ichimoku cloud lines.
+    """
+
+    columns = ('tenkansen', 'kijunsen', 'leading_span_a', 'leading_span_b')
+    dropna_how = 'any'
+
+    def __init__(self, tenkansen_period=9, kijunsen_period=26, leading_span_b_period=52):
+        self.lows = [Window(period + 1) for period in (
+            tenkansen_period, kijunsen_period, leading_span_b_period
+        )]
+        self.highs = [Window(period + 1) for period in (
+            tenkansen_period, kijunsen_period, leading_span_b_period
+        )]
+
+
+    def update(self, candle):
+        midpoints = list()
+        for lows, highs in zip(self.lows, self.highs):
+            lows.push(candle[..., LOW])
+            highs.push(candle[..., HIGH])
+            midpoints.append(
+                (lows.values.min(axis=-1) + highs.values.max(axis=-1)) / 2
+                if lows.is_full() else _missing(numpy.shape(candle[..., LOW]))
+            )
+
+        tenkansen, kijunsen, leading_span_b = midpoints
+        return (tenkansen, kijunsen, (tenkansen + kijunsen) / 2, leading_span_b)
+
+
+class SMAState():
+    """Simple moving average of the close.
+    """
+
+    columns = ('sma',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=15):
+        self.period_count = period_count
+        self.closes = RollingSum(period_count)
+
+
+    def update(self, candle):
+        return (self.closes.push(candle[..., CLOSE]) / self.period_count,)
+
+
+class EMAState():
+    """Exponential moving average of the close.
+    """
+
+    columns = ('ema',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=15):
+        self.closes = ExponentialAverage(period_count)
+
+
+    def update(self, candle):
+        return (self.closes.push(candle[..., CLOSE]),)
+
+
+class VWAPState():
+    """Volume weighted average price.
+    """
+
+    columns = ('vwap',)
+    dropna_how = 'all'
+
+    def __init__(self, period_count=15):
+        self.weighted_prices = RollingSum(period_count + 1)
+        self.volumes = RollingSum(period_count + 1)
+
+
+    def update(self, candle):
+        volume = candle[..., VOLUME]
+        average_price = (candle[..., HIGH] + candle[..., LOW]) / 2
+        weighted_price = self.weighted_prices.push(volume * average_price)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return (weighted_price / self.volumes.push(volume),)
+
+
+class BollingerBandsState():
+    """Bollinger bands of the previous closes, matching the one candle lag of the batch
+    analyzer.
+    """
+
+    columns = ('lowerband', 'middleband', 'upperband')
+    dropna_how = 'all'
+
+    def __init__(self, period_count=21):
+        self.closes = Window(period_count + 1)
+
+
+    def update(self, candle):
+        self.closes.push(candle[..., CLOSE])
+        if not self.closes.is_full():
+            missing = _missing(numpy.shape(candle[..., CLOSE]))
+            return (missing, missing, missing)
+
+        previous_closes = self.closes.ordered()[..., :-1]
+        middleband = previous_closes.mean(axis=-1)
+        deviation = 2 * previous_closes.std(axis=-1)
+        return (middleband - deviation, middleband, middleband + deviation)
+
+
+STATES = {
+    'rsi': RSIState,
+    'macd': MACDState,
+    'mfi': MFIState,
+    'momentum': MomentumState,
+    'obv': OBVState,
+    'stoch_rsi': StochasticRSIState,
+    'ichimoku': IchimokuState,
+    'sma': SMAState,
+    'ema': EMAState,
+    'vwap': VWAPState,
+    'bollinger_bands': BollingerBandsState
+}
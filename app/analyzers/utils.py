@@ -1,10 +1,8 @@
 """ Utilities for technical indicators
 """
 
-import math
 import pandas
 import structlog
-from datetime import datetime
 
 
 class IndicatorUtils():
@@ -18,21 +16,27 @@ class IndicatorUtils():
     def convert_to_dataframe(self, historical_data):
         """Converts historical data matrix to a pandas dataframe.
 
+        The dataframe is indexed by the UTC candle open time. A dataframe that was already
+        converted is returned as is, so it can be built once and shared by every analyzer which
+        must treat it as read only.
+
         Args:
-            historical_data (list): A matrix of historical OHCLV data.
+            historical_data (list): A matrix of historical OHCLV data or a dataframe that was
+                already converted.
 
         Returns:
             pandas.DataFrame: Contains the historical data in a pandas dataframe.
         """
 
-        dataframe = pandas.DataFrame(historical_data)
-        dataframe.transpose()
+        if isinstance(historical_data, pandas.DataFrame):
+            return historical_data
 
-        dataframe.columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        dataframe['datetime'] = dataframe.timestamp.apply(
-            lambda x: pandas.to_datetime(datetime.fromtimestamp(x / 1000).strftime('%c'))
+        dataframe = pandas.DataFrame(
+            historical_data,
+            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
         )
 
+        dataframe['datetime'] = pandas.to_datetime(dataframe['timestamp'], unit='ms')
         dataframe.set_index('datetime', inplace=True, drop=True)
         dataframe.drop('timestamp', axis=1, inplace=True)
 
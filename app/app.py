@@ -2,6 +2,8 @@
 """Main app module
 """
 
+import asyncio
+import queue
 import time
 import sys
 
@@ -10,9 +12,13 @@ import conf
 import structlog
 
 from conf import Configuration
+from candle_store import CandleStore
 from exchange import ExchangeInterface
+from ingest import IngestServer
+from market_cache import MarketCache
 from notification import Notifier
 from behaviour import Behaviour
+from scheduler import CandleScheduler
 
 def main():
     """Initializes the application
@@ -26,8 +32,38 @@ def main():
     logger = structlog.get_logger()
 
     # Configure and run configured behaviour.
-    exchange_interface = ExchangeInterface(config.exchanges)
-    notifier = Notifier(config.notifiers)
+    candle_store = None
+    if settings['candle_store_path']:
+        candle_store = CandleStore(settings['candle_store_path'])
+
+    market_cache = None
+    if settings['market_cache_ttl']:
+        market_cache = MarketCache(settings['market_cache_ttl'], settings['market_cache_path'])
+
+    exchange_args = {
+        'candle_store': candle_store,
+        'market_cache': market_cache,
+        'record_path': settings['record_path'],
+        'replay_path': settings['replay_path'],
+        'replay_latency': settings['replay_latency'],
+        'replay_rate_limit': settings['replay_rate_limit'],
+        'page_size': settings['ohlcv_page_size'],
+        'page_workers': settings['ohlcv_page_workers']
+    }
+
+    if settings['exchange_mode'] == 'async':
+        # Only imported when needed as the asynchronous ccxt clients require aiohttp.
+        from async_exchange import AsyncExchangeInterface
+        exchange_interface = AsyncExchangeInterface(config.exchanges, **exchange_args)
+    else:
+        exchange_interface = ExchangeInterface(config.exchanges, **exchange_args)
+    notifier = Notifier(
+        config.notifiers,
+        workers=settings['notification_workers'],
+        queue_size=settings['notification_queue_size'],
+        timeout=settings['notification_timeout'],
+        alert_state_path=settings['alert_state_path']
+    )
 
     behaviour = Behaviour(
         config,
@@ -35,10 +71,86 @@ def main():
         notifier
     )
 
-    while True:
-        behaviour.run(settings['market_pairs'], settings['output_mode'])
-        logger.info("Sleeping for %s seconds", settings['update_interval'])
-        time.sleep(settings['update_interval'])
+    if settings['exchange_mode'] == 'async':
+        loop = asyncio.get_event_loop()
+
+    ingest_server = None
+    if settings['ingest_port']:
+        ingest_server = IngestServer(
+            settings['ingest_host'],
+            settings['ingest_port'],
+            exchange_interface.get_exchange_timeframes()
+        )
+        ingest_server.start()
+
+    def run_pushed(pushed_candles):
+        # A push that cannot be analyzed is skipped rather than stopping the analysis loop.
+        try:
+            if settings['exchange_mode'] == 'async':
+                loop.run_until_complete(
+                    behaviour.run_pushed_async(pushed_candles, settings['output_mode'])
+                )
+            else:
+                behaviour.run_pushed(pushed_candles, settings['output_mode'])
+        except Exception:
+            logger.exception(
+                'Unable to analyze candles pushed for %s %s %s',
+                pushed_candles.exchange,
+                pushed_candles.market_pair,
+                pushed_candles.candle_period
+            )
+
+    def sleep(seconds):
+        # Pushed candles are analyzed as they arrive while waiting for the next cycle.
+        if not ingest_server:
+            time.sleep(seconds)
+            return
+
+        deadline = time.time() + seconds
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+
+            try:
+                pushed_candles = ingest_server.candle_queue.get(timeout=remaining)
+            except queue.Empty:
+                return
+            run_pushed(pushed_candles)
+
+    def run_behaviour(candle_periods=None):
+        if settings['exchange_mode'] == 'async':
+            loop.run_until_complete(behaviour.run_async(
+                settings['market_pairs'],
+                settings['output_mode'],
+                candle_periods=candle_periods
+            ))
+        else:
+            behaviour.run(
+                settings['market_pairs'],
+                settings['output_mode'],
+                candle_periods=candle_periods
+            )
+
+    try:
+        if settings['schedule_mode'] == 'candle_close':
+            scheduler = CandleScheduler(
+                behaviour.candle_periods,
+                close_delay=settings['candle_close_delay'],
+                fallback_interval=settings['update_interval']
+            )
+
+            run_behaviour(candle_periods=set(behaviour.candle_periods))
+            while True:
+                run_behaviour(candle_periods=scheduler.wait_for_next_run(sleep=sleep))
+        else:
+            while True:
+                run_behaviour()
+                logger.info("Sleeping for %s seconds", settings['update_interval'])
+                sleep(settings['update_interval'])
+    finally:
+        if settings['exchange_mode'] == 'async':
+            loop.run_until_complete(exchange_interface.close())
 
 if __name__ == "__main__":
     try:
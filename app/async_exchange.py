@@ -0,0 +1,232 @@
+"""Asynchronous interface for performing queries against exchange API's
+"""
+
+import asyncio
+
+import ccxt
+import ccxt.async_support as ccxt_async
+from tenacity import retry, retry_if_exception_type, stop_after_attempt
+
+from exchange import ExchangeInterface
+from replay import AsyncRecordingExchange, AsyncReplayExchange
+
+class AsyncExchangeInterface(ExchangeInterface):
+    """Interface for performing concurrent queries against exchange API's
+
+    Requests to different exchanges run concurrently while the requests to a single exchange are
+    paced by a token bucket refilled at the exchange rate limit.
+    """
+
+    def __init__(self, exchange_config, **kwargs):
+        """Initializes AsyncExchangeInterface class
+
+        Args:
+            exchange_config (dict): A dictionary containing configuration for the exchanges.
+            **kwargs: The optional arguments of ExchangeInterface.
+        """
+
+        super().__init__(exchange_config, **kwargs)
+        self.market_refresh_tasks = set()
+
+
+    def _load_exchange(self, exchange):
+        """Creates the asynchronous ccxt client for an exchange.
+
+        Rate limiting is done by the token bucket so the ccxt throttle is disabled.
+
+        Args:
+            exchange (str): The ccxt id of the exchange to load.
+
+        Returns:
+            ccxt.async_support.Exchange: The client for the exchange.
+        """
+
+        if self.replay_path:
+            return AsyncReplayExchange(
+                exchange,
+                self.replay_path,
+                latency=self.replay_latency,
+                rate_limit=self.replay_rate_limit
+            )
+
+        new_exchange = getattr(ccxt_async, exchange)({
+            "enableRateLimit": False
+        })
+
+        if self.record_path:
+            return AsyncRecordingExchange(new_exchange, self.record_path)
+        return new_exchange
+
+
+    @retry(retry=retry_if_exception_type(ccxt.NetworkError), stop=stop_after_attempt(3))
+    async def get_historical_data(self, market_pair, exchange, time_unit, start_date=None,
+                                  max_periods=100):
+        """Get historical OHLCV for a symbol pair
+
+        Decorators:
+            retry
+
+        Args:
+            market_pair (str): Contains the symbol pair to operate on i.e. BURST/BTC
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            start_date (int, optional): Timestamp in milliseconds.
+            max_periods (int, optional): Defaults to 100. Maximum number of time periods
+              back to fetch data for.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        self._validate_timeframe(exchange, time_unit)
+        start_date = self._get_start_date(time_unit, start_date, max_periods)
+        fetch_since = self._get_fetch_since(market_pair, exchange, time_unit, start_date)
+        page_starts = self._get_page_starts(time_unit, fetch_since)
+
+        if len(page_starts) > 1:
+            pages = await asyncio.gather(*[
+                self._fetch_page(market_pair, exchange, time_unit, page_start)
+                for page_start in page_starts
+            ])
+            historical_data = self._stitch_pages(pages)
+        else:
+            await self.rate_limiters[exchange].acquire_async()
+            historical_data = await self.exchanges[exchange].fetch_ohlcv(
+                market_pair,
+                timeframe=time_unit,
+                since=fetch_since
+            )
+
+        return self._merge_historical_data(
+            market_pair,
+            exchange,
+            time_unit,
+            start_date,
+            historical_data
+        )
+
+
+    async def _fetch_page(self, market_pair, exchange, time_unit, page_start):
+        """Fetch a page of a long history once a request token is available.
+
+        Args:
+            market_pair (str): Contains the symbol pair to operate on i.e. BURST/BTC
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            page_start (int): Timestamp in milliseconds of the first candle of the page.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        await self.rate_limiters[exchange].acquire_async()
+        return await self.exchanges[exchange].fetch_ohlcv(
+            market_pair,
+            timeframe=time_unit,
+            since=page_start,
+            limit=self.page_size
+        )
+
+
+    @retry(retry=retry_if_exception_type(ccxt.NetworkError), stop=stop_after_attempt(3))
+    async def get_exchange_markets(self, exchanges=[], markets=[]):
+        """Get market data for all symbol pairs listed on all configured exchanges.
+
+        Args:
+            markets (list, optional): A list of markets to get from the exchanges. Default is all
+                markets.
+            exchanges (list, optional): A list of exchanges to collect market data from. Default is
+                all enabled exchanges.
+
+        Decorators:
+            retry
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs.
+        """
+
+        if not exchanges:
+            exchanges = list(self.exchanges)
+
+        exchange_markets = await asyncio.gather(*[
+            self._get_markets(exchange) for exchange in exchanges
+        ])
+
+        return {
+            exchange: self._filter_markets(exchange, exchange_markets[index], markets)
+            for index, exchange in enumerate(exchanges)
+        }
+
+
+    async def _get_markets(self, exchange):
+        """Get the markets of an exchange, served from the market cache when possible.
+
+        Stale markets are still served while a refreshed copy is loaded in the background.
+
+        Args:
+            exchange (str): The exchange to get the markets of.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        if not self.market_cache:
+            await self.rate_limiters[exchange].acquire_async()
+            return await self.exchanges[exchange].load_markets()
+
+        exchange_markets = self.market_cache.get_markets(exchange)
+        if exchange_markets is None:
+            return await self._refresh_markets(exchange)
+
+        # The ccxt client needs the markets to map symbols when it did not load them itself.
+        if not self.exchanges[exchange].markets:
+            self.exchanges[exchange].set_markets(exchange_markets)
+
+        if self.market_cache.is_stale(exchange) and exchange not in self.market_refreshes:
+            self.market_refreshes.add(exchange)
+            refresh_task = asyncio.ensure_future(self._refresh_markets_in_background(exchange))
+            self.market_refresh_tasks.add(refresh_task)
+            refresh_task.add_done_callback(self.market_refresh_tasks.discard)
+
+        return exchange_markets
+
+
+    async def _refresh_markets(self, exchange):
+        """Load the markets of an exchange and store them in the market cache.
+
+        Args:
+            exchange (str): The exchange to load the markets of.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        await self.rate_limiters[exchange].acquire_async()
+        exchange_markets = await self.exchanges[exchange].load_markets(reload=True)
+        self.market_cache.set_markets(exchange, exchange_markets)
+        return exchange_markets
+
+
+    async def _refresh_markets_in_background(self, exchange):
+        """Refresh the cached markets of an exchange, logging rather than raising failures.
+
+        Args:
+            exchange (str): The exchange to refresh the markets of.
+        """
+
+        try:
+            await self._refresh_markets(exchange)
+            self.logger.info('Refreshed cached markets of %s', exchange)
+        except ccxt.BaseError:
+            self.logger.error('Unable to refresh cached markets of %s', exchange)
+        finally:
+            self.market_refreshes.discard(exchange)
+
+
+    async def close(self):
+        """Close the http sessions of all exchange clients.
+        """
+
+        await asyncio.gather(*[
+            self.exchanges[exchange].close() for exchange in self.exchanges
+        ])
@@ -3,16 +3,29 @@
 2. Notify users when a threshold is crossed.
 """
 
+import asyncio
+import hashlib
 import json
+import math
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 import structlog
 from ccxt import ExchangeError
 from tenacity import RetryError
 
-from analysis import StrategyAnalyzer
+from analysis import BatchAnalyzer, StrategyAnalyzer, StreamingAnalyzer
+from analyzers import backends
+from analyzers.utils import IndicatorUtils
 from outputs import Output
+from planner import AnalysisPlan
+from process_analysis import ProcessAnalyzer
+from result_cache import ResultCache
+from result_record import ResultRecord
+from resample import can_resample, merge_candles, resample_candles
+from timeframes import timeframe_to_milliseconds
 
 class Behaviour():
     """Default analyzer which gives users basic trading information.
@@ -33,20 +46,88 @@ class Behaviour():
         self.indicator_conf = config.indicators
         self.informant_conf = config.informants
         self.crossover_conf = config.crossovers
+        self.exchange_workers = config.settings['exchange_workers']
+        self.max_periods = 100
         self.exchange_interface = exchange_interface
+
+        # Forked analysis processes inherit the backends selected here.
+        if backends.backend_selector.selected is None:
+            backends.backend_selector.select(config.settings['ta_backend'])
+
         self.strategy_analyzer = StrategyAnalyzer()
+        self.dispatchers = {
+            'indicators': self.strategy_analyzer.indicator_dispatcher(),
+            'informants': self.strategy_analyzer.informant_dispatcher(),
+            'crossovers': self.strategy_analyzer.crossover_dispatcher()
+        }
+        self.crossover_batch_dispatcher = self.strategy_analyzer.crossover_batch_dispatcher()
+        self.analysis_plan = AnalysisPlan(
+            self.indicator_conf,
+            self.informant_conf,
+            self.crossover_conf,
+            self.dispatchers
+        )
+        self.analysis_executor = None
+        if config.settings['analysis_workers'] > 1:
+            self.analysis_executor = ThreadPoolExecutor(
+                max_workers=config.settings['analysis_workers']
+            )
+        self.indicator_utils = IndicatorUtils()
+        self.process_analyzer = None
+        if config.settings['analysis_processes']:
+            self.process_analyzer = ProcessAnalyzer(
+                config,
+                config.settings['analysis_processes'],
+                config.settings['analysis_process_group_size']
+            )
+        self.process_results = dict()
+        # Worker processes analyze from scratch, so streaming and batching are not used with them.
+        self.streaming_analyzer = None
+        if config.settings['streaming_indicators'] and not self.process_analyzer:
+            self.streaming_analyzer = StreamingAnalyzer(
+                check_interval=config.settings['streaming_check_interval'],
+                check_tolerance=config.settings['streaming_check_tolerance']
+            )
+        # Streaming already avoids recomputing the whole window, so batching is not used with it.
+        self.batch_analyzer = None
+        if (config.settings['batch_analysis'] and not self.streaming_analyzer
+                and not self.process_analyzer):
+            self.batch_analyzer = BatchAnalyzer()
+        self.batch_results = dict()
+        self.result_cache = None
+        if config.settings['result_cache_size'] and not self.process_analyzer:
+            self.result_cache = ResultCache(config.settings['result_cache_size'] * 1024 * 1024)
+        self.result_tail_length = config.settings['result_tail_length']
+        self.keep_result_frames = config.settings['keep_result_frames']
         self.notifier = notifier
+        self.candle_periods = self._get_candle_periods()
+        self.resample_sources = dict()
+        if config.settings['resample_candles']:
+            self.resample_sources = self._get_resample_sources()
+        self.fetch_periods = self._get_fetch_periods()
+        self.due_candle_periods = None
+        self.previous_results = dict()
+        self.last_candle_times = dict()
+        self.pushed_candles = dict()
+        # Guards the state shared by the exchange workers, it lives as long as the instance.
+        self.cache_lock = threading.Lock()
+        self.historical_data_cache = dict()
+        self.dataframe_cache = dict()
+        self._reset_historical_data_cache()
 
         output_interface = Output()
         self.output = output_interface.dispatcher
 
 
-    def run(self, market_pairs, output_mode):
+    def run(self, market_pairs, output_mode, candle_periods=None):
         """The analyzer entrypoint
 
         Args:
             market_pairs (list): List of symbol pairs to operate on, if empty get all pairs.
             output_mode (str): Which console output mode to use.
+            candle_periods (set, optional): Defaults to None. Only recompute the analysis of these
+                candle periods for the pairs that got a new candle, the previous results are
+                reused for the rest. Everything is recomputed when not set.
         """
 
         self.logger.info("Starting default analyzer...")
@@ -60,215 +141,877 @@ class Behaviour():
 
         self.logger.info("Using the following exchange(s): %s", list(market_data.keys()))
 
+        self._reset_historical_data_cache()
+        self.due_candle_periods = candle_periods
         new_result = self._test_strategies(market_data, output_mode)
+        self._log_cache_stats()
 
         self.notifier.notify_all(new_result)
 
 
-    def _test_strategies(self, market_data, output_mode):
-        """Test the strategies and perform notifications as required
+    async def run_async(self, market_pairs, output_mode, candle_periods=None):
+        """The analyzer entrypoint when using an asynchronous exchange interface
+
+        All the candles needed for the cycle are fetched concurrently before the analysis starts.
 
         Args:
-            market_data (dict): A dictionary containing the market data of the symbols to analyze.
+            market_pairs (list): List of symbol pairs to operate on, if empty get all pairs.
             output_mode (str): Which console output mode to use.
+            candle_periods (set, optional): Defaults to None. Only recompute the analysis of these
+                candle periods for the pairs that got a new candle, the previous results are
+                reused for the rest. Everything is recomputed when not set.
         """
 
-        new_result = dict()
-        for exchange in market_data:
-            self.logger.info("Beginning analysis of %s", exchange)
-            if exchange not in new_result:
-                new_result[exchange] = dict()
+        self.logger.info("Starting default analyzer...")
 
-            for market_pair in market_data[exchange]:
-                self.logger.info("Beginning analysis of %s", market_pair)
-                if market_pair not in new_result[exchange]:
-                    new_result[exchange][market_pair] = dict()
+        if market_pairs:
+            self.logger.info("Found configured markets: %s", market_pairs)
+        else:
+            self.logger.info("No configured markets, using all available on exchange.")
 
-                new_result[exchange][market_pair]['indicators'] = self._get_indicator_results(
-                    exchange,
-                    market_pair
-                )
+        market_data = await self.exchange_interface.get_exchange_markets(markets=market_pairs)
 
-                new_result[exchange][market_pair]['informants'] = self._get_informant_results(
-                    exchange,
-                    market_pair
+        self.logger.info("Using the following exchange(s): %s", list(market_data.keys()))
+
+        self._reset_historical_data_cache()
+        self.due_candle_periods = candle_periods
+        await self._prefetch_candle_periods({
+            (exchange, market_pair): {
+                candle_period for candle_period in self.candle_periods
+                if self._is_due(candle_period)
+            }
+            for exchange in market_data
+            for market_pair in market_data[exchange]
+        })
+
+        # Pairs without previous results to reuse also read the candle periods that are not due.
+        await self._prefetch_candle_periods({
+            (exchange, market_pair): self._get_read_candle_periods(
+                exchange,
+                market_pair,
+                whole_pair=bool(self.process_analyzer)
+            )
+            for exchange in market_data
+            for market_pair in market_data[exchange]
+        })
+
+        new_result = self._test_strategies(market_data, output_mode)
+        self._log_cache_stats()
+
+        self.notifier.notify_all(new_result)
+
+
+    def run_pushed(self, pushed_candles, output_mode):
+        """The analyzer entrypoint for candles pushed to the ingestion endpoint
+
+        Only the pushed pair and candle period are recomputed, the history is fetched from the
+        exchange once when the pushed candles are not enough to analyze.
+
+        Args:
+            pushed_candles (PushedCandles): The candles pushed for a pair and candle period.
+            output_mode (str): Which console output mode to use.
+        """
+
+        self._reset_historical_data_cache()
+        if self._merge_pushed_candles(pushed_candles):
+            self._merge_pushed_candles(pushed_candles, self._fetch_historical_data(
+                pushed_candles.market_pair,
+                pushed_candles.exchange,
+                pushed_candles.candle_period
+            ))
+
+        self._analyze_pushed_candles(pushed_candles, output_mode)
+
+
+    async def run_pushed_async(self, pushed_candles, output_mode):
+        """The analyzer entrypoint for pushed candles when using an asynchronous exchange interface
+
+        Args:
+            pushed_candles (PushedCandles): The candles pushed for a pair and candle period.
+            output_mode (str): Which console output mode to use.
+        """
+
+        exchange = pushed_candles.exchange
+        market_pair = pushed_candles.market_pair
+
+        self._reset_historical_data_cache()
+        if self._merge_pushed_candles(pushed_candles):
+            await self._prefetch_historical_data(
+                market_pair,
+                exchange,
+                pushed_candles.candle_period
+            )
+            self._merge_pushed_candles(pushed_candles, self.historical_data_cache[(
+                exchange,
+                market_pair,
+                pushed_candles.candle_period
+            )])
+
+        # Pairs that were never analyzed also need the candles of the other candle periods.
+        buffer_key = (exchange, market_pair, pushed_candles.candle_period)
+        self.historical_data_cache[buffer_key] = self.pushed_candles[buffer_key]
+        self.due_candle_periods = { pushed_candles.candle_period }
+        await self._prefetch_candle_periods({
+            (exchange, market_pair): self._get_read_candle_periods(exchange, market_pair)
+        })
+
+        self._analyze_pushed_candles(pushed_candles, output_mode)
+
+
+    def _merge_pushed_candles(self, pushed_candles, candles=None):
+        """Merge candles into the buffer of pushed candles of a pair and candle period.
+
+        Args:
+            pushed_candles (PushedCandles): The candles pushed for a pair and candle period.
+            candles (list, optional): Defaults to None. Candles fetched from the exchange to seed
+                the buffer with, the pushed candles are merged when not set.
+
+        Returns:
+            bool: True when the buffer does not hold enough candles to analyze.
+        """
+
+        buffer_key = (
+            pushed_candles.exchange,
+            pushed_candles.market_pair,
+            pushed_candles.candle_period
+        )
+        buffered_candles = self.pushed_candles.get(buffer_key, list())
+
+        if candles is None:
+            buffered_candles = merge_candles(
+                buffered_candles,
+                pushed_candles.candles,
+                aggregate=pushed_candles.aggregate
+            )
+        else:
+            # Pushed candles are more recent than the fetched ones so they are merged on top.
+            buffered_candles = merge_candles(candles, buffered_candles)
+
+        max_periods = self.fetch_periods.get(pushed_candles.candle_period, self.max_periods)
+        self.pushed_candles[buffer_key] = buffered_candles[-(max_periods + 1):]
+
+        candle_store = getattr(self.exchange_interface, 'candle_store', None)
+        if candle_store and candles is None:
+            pushed_times = { candle[0] for candle in pushed_candles.candles }
+            candle_store.merge_candles(*buffer_key, [
+                candle for candle in self.pushed_candles[buffer_key]
+                if candle[0] in pushed_times
+            ])
+
+        return len(self.pushed_candles[buffer_key]) < self.max_periods
+
+
+    def _analyze_pushed_candles(self, pushed_candles, output_mode):
+        """Recompute the analysis of the pair and candle period that candles were pushed for.
+
+        Args:
+            pushed_candles (PushedCandles): The candles pushed for a pair and candle period.
+            output_mode (str): Which console output mode to use.
+        """
+
+        exchange = pushed_candles.exchange
+        market_pair = pushed_candles.market_pair
+        buffer_key = (exchange, market_pair, pushed_candles.candle_period)
+
+        # Every push is recomputed, even when it only updated the latest candle.
+        self.last_candle_times.pop(buffer_key, None)
+        self.historical_data_cache[buffer_key] = self.pushed_candles[buffer_key]
+        self.due_candle_periods = { pushed_candles.candle_period }
+
+        new_result = {
+            exchange: {
+                market_pair: self._test_market_pair_strategies(exchange, market_pair, output_mode)
+            }
+        }
+
+        self._reset_historical_data_cache()
+        self.notifier.notify_all(new_result, full_cycle=False)
+
+
+    def _get_candle_periods(self):
+        """Get the candle periods used by the planned indicators and informants.
+
+        Disabled indicators and informants are still analyzed when an enabled crossover uses them.
+
+        Returns:
+            set: The configured candle periods.
+        """
+
+        return self.analysis_plan.get_candle_periods()
+
+
+    def _get_resample_sources(self):
+        """Get which configured candle period each coarser candle period can be resampled from.
+
+        A candle period is only resampled when the longer history of the finer candle period costs
+        no extra requests, either because the candles are kept in the candle store or because the
+        longer history still fits in as many pages as the finer candle period needs anyway.
+
+        Returns:
+            dict: The finest configured candle period that evenly divides each candle period that
+                is derived locally.
+        """
+
+        page_size = self.exchange_interface.page_size
+        resample_sources = dict()
+        for candle_period in self.candle_periods:
+            source_periods = [
+                source_period for source_period in self.candle_periods
+                if can_resample(source_period, candle_period)
+            ]
+
+            if not source_periods:
+                continue
+
+            source_period = min(source_periods, key=timeframe_to_milliseconds)
+            source_candles = self._get_resample_source_length(candle_period, source_period)
+            source_pages = math.ceil(source_candles / page_size)
+            if self.exchange_interface.candle_store or source_pages <= math.ceil(
+                    self.max_periods / page_size):
+                resample_sources[candle_period] = source_period
+            else:
+                self.logger.info(
+                    'Fetching %s candles directly, resampling them would need %s %s candles',
+                    candle_period,
+                    source_candles,
+                    source_period
                 )
+        return resample_sources
+
 
-                new_result[exchange][market_pair]['crossovers'] = self._get_crossover_results(
-                    new_result[exchange][market_pair]
+    def _get_resample_source_length(self, candle_period, source_period):
+        """Get how many candles of a finer candle period are needed to resample a candle period.
+
+        Args:
+            candle_period (str): The candle period to resample.
+            source_period (str): The finer candle period to resample from.
+
+        Returns:
+            int: The number of finer candles to fetch.
+        """
+
+        ratio = timeframe_to_milliseconds(candle_period) // timeframe_to_milliseconds(source_period)
+
+        # One extra period as the leading resampled candle may be incomplete.
+        return (self.max_periods + 1) * ratio
+
+
+    def _get_fetch_periods(self):
+        """Get how many candles to fetch for each candle period fetched from the exchanges.
+
+        Candle periods that are resampled from can need a longer history than the default.
+
+        Returns:
+            dict: The number of periods to fetch keyed by candle period.
+        """
+
+        fetch_periods = {
+            candle_period: self.max_periods for candle_period in self.candle_periods
+            if candle_period not in self.resample_sources
+        }
+
+        for candle_period, source_period in self.resample_sources.items():
+            fetch_periods[source_period] = max(
+                fetch_periods[source_period],
+                self._get_resample_source_length(candle_period, source_period)
+            )
+        return fetch_periods
+
+
+    def _test_strategies(self, market_data, output_mode):
+        """Test the strategies and perform notifications as required
+
+        Each exchange is analyzed by its own worker so a slow exchange does not hold up the others.
+
+        Args:
+            market_data (dict): A dictionary containing the market data of the symbols to analyze.
+            output_mode (str): Which console output mode to use.
+        """
+
+        new_result = dict()
+        with ThreadPoolExecutor(max_workers=self.exchange_workers) as executor:
+            exchange_results = {
+                exchange: executor.submit(
+                    self._test_exchange_strategies,
+                    exchange,
+                    market_data[exchange],
+                    output_mode
                 )
+                for exchange in market_data
+            }
 
-                if output_mode in self.output:
-                    output_data = deepcopy(new_result[exchange][market_pair])
-                    print(
-                        self.output[output_mode](output_data, market_pair),
-                        end=''
-                    )
-                else:
-                    self.logger.warn()
+            for exchange in exchange_results:
+                new_result[exchange] = exchange_results[exchange].result()
 
         # Print an empty line when complete
         print()
         return new_result
 
 
-    def _get_indicator_results(self, exchange, market_pair):
-        """Execute the indicator analysis on a particular exchange and pair.
+    def _test_exchange_strategies(self, exchange, markets, output_mode):
+        """Test the strategies for every market pair of an exchange.
+
+        Args:
+            exchange (str): The exchange to analyze.
+            markets (dict): A dictionary containing the market data of the symbols to analyze.
+            output_mode (str): Which console output mode to use.
+
+        Returns:
+            dict: The analysis results of each market pair.
+        """
+
+        self.logger.info("Beginning analysis of %s", exchange)
+
+        if self.batch_analyzer:
+            self.batch_results[exchange] = self._get_batch_results(exchange, markets)
+
+        if self.process_analyzer:
+            self.process_results[exchange] = self._get_process_results(exchange, markets)
+
+        exchange_result = dict()
+        for market_pair in markets:
+            exchange_result[market_pair] = self._test_market_pair_strategies(
+                exchange,
+                market_pair,
+                output_mode
+            )
+
+        self.batch_results.pop(exchange, None)
+        self.process_results.pop(exchange, None)
+        return exchange_result
+
+
+    def _test_market_pair_strategies(self, exchange, market_pair, output_mode):
+        """Test the strategies for a single market pair.
 
         Args:
-            exchange (str): The exchange to get the indicator results for.
-            market_pair (str): The pair to get the market pair results for.
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
+            output_mode (str): Which console output mode to use.
 
         Returns:
-            list: A list of dictinaries containing the results of the analysis.
+            dict: The indicator, informant and crossover results of the market pair.
         """
 
-        indicator_dispatcher = self.strategy_analyzer.indicator_dispatcher()
-        results = { indicator: list() for indicator in self.indicator_conf.keys() }
-        historical_data_cache = dict()
+        self.logger.info("Beginning analysis of %s", market_pair)
 
-        for indicator in self.indicator_conf:
-            if indicator not in indicator_dispatcher:
-                self.logger.warn("No such indicator %s, skipping.", indicator)
+        process_results = self.process_results.get(exchange, dict())
+        if market_pair in process_results:
+            market_pair_result = process_results[market_pair]
+        else:
+            node_results = self._run_analysis_plan(exchange, market_pair)
+            market_pair_result = self._get_market_pair_result(node_results)
+
+        if self.due_candle_periods is not None:
+            self._save_last_candle_times(exchange, market_pair)
+
+        if output_mode in self.output:
+            output_data = deepcopy(market_pair_result)
+            print(
+                self.output[output_mode](output_data, market_pair),
+                end=''
+            )
+        else:
+            self.logger.warn()
+
+        return market_pair_result
+
+
+    def analyze_candles(self, exchange, market_pair, period_candles):
+        """Analyze a market pair from the given candles, used by the worker processes.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
+            period_candles (dict): The OHLCV data as a numpy array keyed by candle period.
+
+        Returns:
+            dict: The indicator, informant and crossover results of the market pair.
+        """
+
+        self._reset_historical_data_cache()
+        for candle_period, candles in period_candles.items():
+            cache_key = (exchange, market_pair, candle_period)
+            historical_data = candles.tolist()
+            self.historical_data_cache[cache_key] = historical_data
+            if historical_data:
+                self.dataframe_cache[cache_key] = (
+                    historical_data,
+                    self.indicator_utils.convert_to_dataframe(candles)
+                )
+
+        node_results = self._run_analysis_plan(exchange, market_pair)
+        return self._get_market_pair_result(node_results)
+
+
+    def _get_process_results(self, exchange, markets):
+        """Analyze the market pairs of an exchange on the worker processes.
+
+        A market pair is analyzed again as a whole when any of its candle periods got a new candle.
+
+        Args:
+            exchange (str): The exchange to analyze.
+            markets (dict): A dictionary containing the market data of the symbols to analyze.
+
+        Returns:
+            dict: The indicator, informant and crossover results keyed by market pair.
+        """
+
+        process_results = dict()
+        pair_candles = dict()
+        for market_pair in markets:
+            result_key = (exchange, market_pair)
+            if result_key in self.previous_results and all(
+                    self._is_up_to_date(exchange, market_pair, candle_period)
+                    for candle_period in self.candle_periods):
+                process_results[market_pair] = self.previous_results[result_key]
                 continue
 
-            for indicator_conf in self.indicator_conf[indicator]:
-                if indicator_conf['enabled']:
-                    candle_period = indicator_conf['candle_period']
-                else:
-                    self.logger.debug("%s is disabled, skipping.", indicator)
-                    continue
+            pair_candles[market_pair] = {
+                candle_period: self._get_historical_data(market_pair, exchange, candle_period)
+                for candle_period in self.candle_periods
+            }
 
-                if candle_period not in historical_data_cache:
-                    historical_data_cache[candle_period] = self._get_historical_data(
-                        market_pair,
-                        exchange,
-                        candle_period
-                    )
+        for market_pair, market_pair_result in self.process_analyzer.analyze(
+                exchange,
+                pair_candles).items():
+            process_results[market_pair] = market_pair_result
+            if self.due_candle_periods is not None:
+                with self.cache_lock:
+                    self.previous_results[(exchange, market_pair)] = market_pair_result
+
+        return process_results
+
+
+    def _run_analysis_plan(self, exchange, market_pair):
+        """Compute the planned analyses of a market pair level by level.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
 
-                if historical_data_cache[candle_period]:
-                    analysis_args = {
-                        'historical_data': historical_data_cache[candle_period],
-                        'signal': indicator_conf['signal'],
-                        'hot_thresh': indicator_conf['hot'],
-                        'cold_thresh': indicator_conf['cold']
-                    }
-
-                    if 'period_count' in indicator_conf:
-                        analysis_args['period_count'] = indicator_conf['period_count']
-
-                    results[indicator].append({
-                        'result': self._get_analysis_result(
-                            indicator_dispatcher,
-                            indicator,
-                            analysis_args,
-                            market_pair
-                        ),
-                        'config': indicator_conf
+        Returns:
+            dict: The result of each analysis that could be computed, keyed by node key.
+        """
+
+        if self.analysis_executor:
+            # Fetch the candles up front so parallel analyses do not fetch the same ones twice.
+            for candle_period in self.candle_periods:
+                if self._is_due(candle_period):
+                    self._get_historical_data(market_pair, exchange, candle_period)
+
+        node_results = dict()
+        for level in self.analysis_plan.levels:
+            crossover_keys = [
+                node_key for node_key in level
+                if self.analysis_plan.nodes[node_key].node_type == 'crossovers'
+            ]
+            analyzer_keys = [node_key for node_key in level if node_key not in crossover_keys]
+
+            if self.analysis_executor and len(analyzer_keys) > 1:
+                analyzer_results = list(self.analysis_executor.map(
+                    lambda node_key: self._get_node_result(exchange, market_pair, node_key),
+                    analyzer_keys
+                ))
+            else:
+                analyzer_results = [
+                    self._get_node_result(exchange, market_pair, node_key)
+                    for node_key in analyzer_keys
+                ]
+
+            for node_key, result in zip(analyzer_keys, analyzer_results):
+                if result is not None:
+                    node_results[node_key] = result
+
+            if crossover_keys:
+                node_results.update(self._get_crossover_results(crossover_keys, node_results))
+        return node_results
+
+
+    def _get_node_result(self, exchange, market_pair, node_key):
+        """Compute one planned indicator or informant of a market pair.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
+            node_key (tuple): The key of the analysis in the plan.
+
+        Returns:
+            pandas.DataFrame: The result of the analysis, None when it could not be computed.
+        """
+
+        node = self.analysis_plan.nodes[node_key]
+        candle_period = node.config['candle_period']
+        result_key = (exchange, market_pair, node.node_type, node.name, node.conf_index)
+        if result_key in self.previous_results and self._is_up_to_date(
+                exchange,
+                market_pair,
+                candle_period):
+            return self.previous_results[result_key]
+
+        if not self._get_historical_data(market_pair, exchange, candle_period):
+            return None
+
+        analysis_args = self._get_analysis_args(
+            node.node_type,
+            node.config,
+            exchange,
+            market_pair
+        )
+
+        result = self._get_analysis_result(
+            self.dispatchers[node.node_type],
+            node.name,
+            analysis_args,
+            market_pair,
+            result_key
+        )
+        # Previous results are only reused when some candle periods are not due.
+        if self.due_candle_periods is not None:
+            with self.cache_lock:
+                self.previous_results[result_key] = result
+        return result
+
+
+    def _get_market_pair_result(self, node_results):
+        """Arrange the analysis results of a market pair by enabled configuration.
+
+        The outputs and notifiers get a compact record of each result instead of the dataframe.
+
+        Args:
+            node_results (dict): The result of each analysis keyed by node key.
+
+        Returns:
+            dict: The indicator, informant and crossover results of the market pair.
+        """
+
+        records = dict()
+        market_pair_result = dict()
+        for analyzer_type, analyzer_confs in (
+                ('indicators', self.indicator_conf),
+                ('informants', self.informant_conf),
+                ('crossovers', self.crossover_conf)):
+            results = { analyzer_name: list() for analyzer_name in analyzer_confs.keys() }
+
+            for analyzer_name in analyzer_confs:
+                for conf_index, analyzer_conf in enumerate(analyzer_confs[analyzer_name]):
+                    node_key = self.analysis_plan.outputs.get(
+                        (analyzer_type, analyzer_name, conf_index)
+                    )
+                    if node_key not in node_results:
+                        continue
+
+                    if node_key not in records:
+                        records[node_key] = ResultRecord(
+                            node_results[node_key],
+                            tail_length=self.result_tail_length,
+                            keep_frame=self.keep_result_frames
+                        )
+
+                    results[analyzer_name].append({
+                        'result': records[node_key],
+                        'config': analyzer_conf
                     })
-        return results
+
+            market_pair_result[analyzer_type] = results
+        return market_pair_result
 
 
-    def _get_informant_results(self, exchange, market_pair):
-        """Execute the informant analysis on a particular exchange and pair.
+    def _get_analysis_args(self, analyzer_type, analyzer_conf, exchange, market_pair):
+        """Get the arguments to call an indicator or informant with.
 
         Args:
-            exchange (str): The exchange to get the indicator results for.
-            market_pair (str): The pair to get the market pair results for.
+            analyzer_type (str): Either indicators or informants.
+            analyzer_conf (dict): The configuration of the indicator or informant.
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
 
         Returns:
-            list: A list of dictinaries containing the results of the analysis.
+            dict: The keyword arguments of the analyzer.
         """
 
-        informant_dispatcher = self.strategy_analyzer.informant_dispatcher()
-        results = { informant: list() for informant in self.informant_conf.keys() }
-        historical_data_cache = dict()
+        analysis_args = {
+            'historical_data': self._get_dataframe(
+                market_pair,
+                exchange,
+                analyzer_conf['candle_period']
+            )
+        }
+
+        if analyzer_type == 'indicators':
+            analysis_args['signal'] = analyzer_conf['signal']
+            analysis_args['hot_thresh'] = analyzer_conf['hot']
+            analysis_args['cold_thresh'] = analyzer_conf['cold']
+
+        if 'period_count' in analyzer_conf:
+            analysis_args['period_count'] = analyzer_conf['period_count']
+
+        return analysis_args
+
+
+    def _get_batch_results(self, exchange, markets):
+        """Analyze every market pair of an exchange at once for each planned indicator.
+
+        Args:
+            exchange (str): The exchange to analyze.
+            markets (dict): A dictionary containing the market data of the symbols to analyze.
+
+        Returns:
+            dict: The analysis results keyed like the previous results.
+        """
 
-        for informant in self.informant_conf:
-            if informant not in informant_dispatcher:
-                self.logger.warn("No such informant %s, skipping.", informant)
+        batch_results = dict()
+        for node in self.analysis_plan.get_analyzer_nodes():
+            if not self.batch_analyzer.can_batch(node.name):
                 continue
 
-            for informant_conf in self.informant_conf[informant]:
-                if informant_conf['enabled']:
-                    candle_period = informant_conf['candle_period']
-                else:
-                    self.logger.debug("%s is disabled, skipping.", informant)
+            candle_period = node.config['candle_period']
+            pair_args = dict()
+            for market_pair in markets:
+                result_key = (exchange, market_pair, node.node_type, node.name, node.conf_index)
+                if result_key in self.previous_results and self._is_up_to_date(
+                        exchange,
+                        market_pair,
+                        candle_period):
                     continue
 
-                if candle_period not in historical_data_cache:
-                    historical_data_cache[candle_period] = self._get_historical_data(
-                        market_pair,
-                        exchange,
-                        candle_period
-                    )
+                if not self._get_historical_data(market_pair, exchange, candle_period):
+                    continue
 
-                if historical_data_cache[candle_period]:
-                    analysis_args = {
-                        'historical_data': historical_data_cache[candle_period]
-                    }
-
-                    if 'period_count' in informant_conf:
-                        analysis_args['period_count'] = informant_conf['period_count']
-
-                    results[informant].append({
-                        'result': self._get_analysis_result(
-                            informant_dispatcher,
-                            informant,
-                            analysis_args,
-                            market_pair
-                        ),
-                        'config': informant_conf
-                    })
-        return results
+                if self.result_cache and (
+                        self._get_result_cache_key(result_key) in self.result_cache):
+                    continue
+
+                pair_args[market_pair] = self._get_analysis_args(
+                    node.node_type,
+                    node.config,
+                    exchange,
+                    market_pair
+                )
 
+            try:
+                pair_results = self.batch_analyzer.analyze(node.name, pair_args)
+            except (TypeError, ValueError):
+                self.logger.info(
+                    'Batch analysis of %s failed on %s, analyzing each pair instead',
+                    node.name,
+                    exchange
+                )
+                self.logger.debug(traceback.format_exc())
+                continue
+
+            for market_pair, result in pair_results.items():
+                result_key = (exchange, market_pair, node.node_type, node.name, node.conf_index)
+                batch_results[result_key] = result
 
-    def _get_crossover_results(self, new_result):
-        """Execute crossover analysis on the results so far.
+        return batch_results
+
+
+    def _is_due(self, candle_period):
+        """Check whether the analysis of a candle period is due this cycle.
 
         Args:
-            new_result (dict): A dictionary containing the results of the informant and indicator
-                analysis.
+            candle_period (str): The candle period to check.
 
         Returns:
-            list: A list of dictinaries containing the results of the analysis.
+            bool: True when the candle period should be recomputed.
         """
 
-        crossover_dispatcher = self.strategy_analyzer.crossover_dispatcher()
-        results = { crossover: list() for crossover in self.crossover_conf.keys() }
+        return self.due_candle_periods is None or candle_period in self.due_candle_periods
+
+
+    def _is_up_to_date(self, exchange, market_pair, candle_period):
+        """Check whether the previous results of a pair and candle period can be reused.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to check.
+            candle_period (str): The candle period to check.
+
+        Returns:
+            bool: True when no new candle was published since the previous results.
+        """
 
-        for crossover in self.crossover_conf:
-            if crossover not in crossover_dispatcher:
-                self.logger.warn("No such crossover %s, skipping.", crossover)
+        if self.due_candle_periods is None:
+            return False
+
+        if candle_period not in self.due_candle_periods:
+            return True
+
+        historical_data = self._get_historical_data(market_pair, exchange, candle_period)
+        last_candle_time = self.last_candle_times.get((exchange, market_pair, candle_period))
+        return bool(historical_data) and historical_data[-1][0] == last_candle_time
+
+
+    def _save_last_candle_times(self, exchange, market_pair):
+        """Remember the latest candle of each candle period analyzed for a pair.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair that was analyzed.
+        """
+
+        for candle_period in self.candle_periods:
+            cache_key = (exchange, market_pair, candle_period)
+            historical_data = self.historical_data_cache.get(cache_key)
+            if historical_data:
+                with self.cache_lock:
+                    self.last_candle_times[cache_key] = historical_data[-1][0]
+
+
+    def _get_crossover_results(self, node_keys, node_results):
+        """Execute crossover analysis on the results of the indicators and informants they cross.
+
+        The crossovers of a market pair are tested together where the crossover supports it.
+
+        Args:
+            node_keys (list): The keys of the crossover analyses in the plan.
+            node_results (dict): The results of the earlier levels.
+
+        Returns:
+            dict: The result of each crossover whose inputs were computed, keyed by node key.
+        """
+
+        crossover_args = dict()
+        for node_key in node_keys:
+            node = self.analysis_plan.nodes[node_key]
+            key_node, crossed_node = node.dependencies
+            key_indicator = node_results.get(key_node)
+            crossed_indicator = node_results.get(crossed_node)
+            if key_indicator is None or crossed_indicator is None:
                 continue
 
-            for crossover_conf in self.crossover_conf[crossover]:
-                if not crossover_conf['enabled']:
-                    self.logger.debug("%s is disabled, skipping.", crossover)
-                    continue
+            if isinstance(key_indicator, str) or isinstance(crossed_indicator, str):
+                continue
 
-                key_indicator = new_result[crossover_conf['key_indicator_type']][crossover_conf['key_indicator']][crossover_conf['key_indicator_index']]
-                crossed_indicator = new_result[crossover_conf['crossed_indicator_type']][crossover_conf['crossed_indicator']][crossover_conf['crossed_indicator_index']]
-
-                dispatcher_args = {
-                    'key_indicator': key_indicator['result'],
-                    'key_signal': crossover_conf['key_signal'],
-                    'key_indicator_index': crossover_conf['key_indicator_index'],
-                    'crossed_indicator': crossed_indicator['result'],
-                    'crossed_signal': crossover_conf['crossed_signal'],
-                    'crossed_indicator_index': crossover_conf['crossed_indicator_index']
-                }
-
-                results[crossover].append({
-                    'result': crossover_dispatcher[crossover](**dispatcher_args),
-                    'config': crossover_conf
-                })
+            crossover_conf = node.config
+            crossover_args.setdefault(node.name, list()).append((node_key, {
+                'key_indicator': key_indicator,
+                'key_signal': crossover_conf['key_signal'],
+                'key_indicator_index': crossover_conf['key_indicator_index'],
+                'crossed_indicator': crossed_indicator,
+                'crossed_signal': crossover_conf['crossed_signal'],
+                'crossed_indicator_index': crossover_conf['crossed_indicator_index'],
+                'max_bars_since_cross': crossover_conf.get('max_bars_since_cross')
+            }))
+
+        results = dict()
+        for crossover, node_args in crossover_args.items():
+            dispatcher_args = [args for _, args in node_args]
+            if crossover in self.crossover_batch_dispatcher:
+                crossover_results = self.crossover_batch_dispatcher[crossover](dispatcher_args)
+            else:
+                crossover_results = [
+                    self.dispatchers['crossovers'][crossover](**args) for args in dispatcher_args
+                ]
+
+            results.update(zip([node_key for node_key, _ in node_args], crossover_results))
         return results
 
 
+    def _reset_historical_data_cache(self):
+        """Empties the candle cache shared by all analysis passes of a cycle.
+        """
+
+        with self.cache_lock:
+            self.historical_data_cache.clear()
+            self.dataframe_cache.clear()
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+
     def _get_historical_data(self, market_pair, exchange, candle_period):
         """Gets a list of OHLCV data for the given pair and exchange.
 
+        The data is cached for the rest of the cycle so every analysis pass shares one fetch per
+        pair and candle period.
+
+        Args:
+            market_pair (str): The market pair to get the OHLCV data for.
+            exchange (str): The exchange to get the OHLCV data for.
+            candle_period (str): The timeperiod to collect for the given pair and exchange.
+
+        Returns:
+            list: A list of OHLCV data.
+        """
+
+        cache_key = (exchange, market_pair, candle_period)
+        if cache_key in self.historical_data_cache:
+            with self.cache_lock:
+                self.cache_hits += 1
+            return self.historical_data_cache[cache_key]
+
+        with self.cache_lock:
+            self.cache_misses += 1
+
+        historical_data = None
+        if candle_period in self.resample_sources:
+            historical_data = self._resample_historical_data(market_pair, exchange, candle_period)
+
+        if not historical_data:
+            historical_data = self._fetch_historical_data(market_pair, exchange, candle_period)
+
+        with self.cache_lock:
+            self.historical_data_cache[cache_key] = historical_data
+        return historical_data
+
+
+    def _get_dataframe(self, market_pair, exchange, candle_period):
+        """Gets the OHLCV data for the given pair and exchange as a pandas dataframe.
+
+        The dataframe is built once per cycle and shared read only by every analyzer.
+
+        Args:
+            market_pair (str): The market pair to get the OHLCV data for.
+            exchange (str): The exchange to get the OHLCV data for.
+            candle_period (str): The timeperiod to collect for the given pair and exchange.
+
+        Returns:
+            pandas.DataFrame: Contains the historical data in a pandas dataframe.
+        """
+
+        historical_data = self._get_historical_data(market_pair, exchange, candle_period)
+
+        # Pushed or prefetched candles replace the cached list, so the dataframe is rebuilt.
+        cache_key = (exchange, market_pair, candle_period)
+        cached_data, dataframe = self.dataframe_cache.get(cache_key, (None, None))
+        if cached_data is not historical_data:
+            dataframe = self.indicator_utils.convert_to_dataframe(historical_data)
+            with self.cache_lock:
+                self.dataframe_cache[cache_key] = (historical_data, dataframe)
+        return dataframe
+
+
+    def _resample_historical_data(self, market_pair, exchange, candle_period):
+        """Derives a list of OHLCV data from the candles of a finer candle period.
+
+        Args:
+            market_pair (str): The market pair to get the OHLCV data for.
+            exchange (str): The exchange to get the OHLCV data for.
+            candle_period (str): The timeperiod to derive for the given pair and exchange.
+
+        Returns:
+            list: A list of OHLCV data, None when the finer history is not long enough.
+        """
+
+        source_period = self.resample_sources[candle_period]
+        source_data = self._get_historical_data(market_pair, exchange, source_period)
+        historical_data = resample_candles(source_data, source_period, candle_period)
+
+        if len(historical_data) < self.max_periods:
+            self.logger.debug(
+                'Not enough %s candles to resample %s for %s, fetching it instead',
+                source_period,
+                candle_period,
+                market_pair
+            )
+            return None
+        return historical_data
+
+
+    def _fetch_historical_data(self, market_pair, exchange, candle_period):
+        """Fetches a list of OHLCV data for the given pair and exchange from the exchange.
+
         Args:
             market_pair (str): The market pair to get the OHLCV data for.
             exchange (str): The exchange to get the OHLCV data for.
@@ -283,35 +1026,161 @@ class Behaviour():
             historical_data = self.exchange_interface.get_historical_data(
                 market_pair,
                 exchange,
-                candle_period
+                candle_period,
+                max_periods=self.fetch_periods.get(candle_period, self.max_periods)
             )
-        except RetryError:
+        except (RetryError, ExchangeError, ValueError, AttributeError) as error:
+            self._log_historical_data_error(error, market_pair)
+
+        # Asynchronous interfaces are only queried by _prefetch_historical_data.
+        if asyncio.iscoroutine(historical_data):
+            historical_data.close()
+            raise RuntimeError(
+                'Candles of {} {} {} were not prefetched from the asynchronous exchange '
+                'interface'.format(exchange, market_pair, candle_period)
+            )
+        return historical_data
+
+
+    async def _prefetch_historical_data(self, market_pair, exchange, candle_period):
+        """Fetches a list of OHLCV data from an asynchronous exchange interface into the cache.
+
+        Args:
+            market_pair (str): The market pair to get the OHLCV data for.
+            exchange (str): The exchange to get the OHLCV data for.
+            candle_period (str): The timeperiod to collect for the given pair and exchange.
+        """
+
+        historical_data = list()
+        try:
+            historical_data = await self.exchange_interface.get_historical_data(
+                market_pair,
+                exchange,
+                candle_period,
+                max_periods=self.fetch_periods.get(candle_period, self.max_periods)
+            )
+        except (RetryError, ExchangeError, ValueError, AttributeError) as error:
+            self._log_historical_data_error(error, market_pair)
+
+        self.cache_misses += 1
+        self.historical_data_cache[(exchange, market_pair, candle_period)] = historical_data
+
+
+    async def _prefetch_candle_periods(self, pair_periods):
+        """Fetches the OHLCV data of candle periods that are not cached yet into the cache.
+
+        Candle periods that can be resampled are derived from their finer candle period, and only
+        fetched when the finer history was too short.
+
+        Args:
+            pair_periods (dict): The candle periods to fetch keyed by exchange and market pair.
+        """
+
+        fetch_keys = set()
+        for (exchange, market_pair), candle_periods in pair_periods.items():
+            for candle_period in candle_periods:
+                fetch_period = self.resample_sources.get(candle_period, candle_period)
+                fetch_keys.add((exchange, market_pair, fetch_period))
+
+        await asyncio.gather(*[
+            self._prefetch_historical_data(market_pair, exchange, candle_period)
+            for exchange, market_pair, candle_period in fetch_keys
+            if (exchange, market_pair, candle_period) not in self.historical_data_cache
+        ])
+
+        fallback_fetches = list()
+        for (exchange, market_pair), candle_periods in pair_periods.items():
+            for candle_period in candle_periods:
+                cache_key = (exchange, market_pair, candle_period)
+                if candle_period not in self.resample_sources:
+                    continue
+                if cache_key in self.historical_data_cache:
+                    continue
+
+                historical_data = self._resample_historical_data(
+                    market_pair,
+                    exchange,
+                    candle_period
+                )
+
+                if historical_data:
+                    self.historical_data_cache[cache_key] = historical_data
+                else:
+                    fallback_fetches.append(
+                        self._prefetch_historical_data(market_pair, exchange, candle_period)
+                    )
+        await asyncio.gather(*fallback_fetches)
+
+
+    def _get_read_candle_periods(self, exchange, market_pair, whole_pair=False):
+        """Get the candle periods whose candles the analysis of a pair reads this cycle.
+
+        The candles of the due candle periods must already be cached.
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair to analyze.
+            whole_pair (bool, optional): Defaults to False. Whether the pair is analyzed as a whole,
+                as the analysis processes do, instead of reusing the result of each analysis.
+
+        Returns:
+            set: The candle periods read.
+        """
+
+        if whole_pair:
+            if (exchange, market_pair) in self.previous_results and all(
+                    self._is_up_to_date(exchange, market_pair, candle_period)
+                    for candle_period in self.candle_periods):
+                return set()
+            return set(self.candle_periods)
+
+        candle_periods = set()
+        for node in self.analysis_plan.get_analyzer_nodes():
+            candle_period = node.config['candle_period']
+            result_key = (exchange, market_pair, node.node_type, node.name, node.conf_index)
+            if result_key not in self.previous_results or not self._is_up_to_date(
+                    exchange,
+                    market_pair,
+                    candle_period):
+                candle_periods.add(candle_period)
+        return candle_periods
+
+
+    def _log_historical_data_error(self, error, market_pair):
+        """Logs why fetching OHLCV data for a pair failed.
+
+        Args:
+            error (Exception): The error raised while fetching the data.
+            market_pair (str): The market pair the data was fetched for.
+        """
+
+        if isinstance(error, RetryError):
             self.logger.error(
                 'Too many retries fetching information for pair %s, skipping',
                 market_pair
             )
-        except ExchangeError:
+        elif isinstance(error, ExchangeError):
             self.logger.error(
                 'Exchange supplied bad data for pair %s, skipping',
                 market_pair
             )
-        except ValueError as e:
-            self.logger.error(e)
+        elif isinstance(error, ValueError):
+            self.logger.error(error)
             self.logger.error(
                 'Invalid data encountered while processing pair %s, skipping',
                 market_pair
             )
             self.logger.debug(traceback.format_exc())
-        except AttributeError:
+        else:
             self.logger.error(
                 'Something went wrong fetching data for %s, skipping',
                 market_pair
             )
             self.logger.debug(traceback.format_exc())
-        return historical_data
 
 
-    def _get_analysis_result(self, dispatcher, indicator, dispatcher_args, market_pair):
+    def _get_analysis_result(self, dispatcher, indicator, dispatcher_args, market_pair,
+                             result_key=None):
         """Get the results of performing technical analysis
 
         Args:
@@ -319,19 +1188,105 @@ class Behaviour():
             indicator (str): The name of the desired indicator.
             dispatcher_args (dict): A dictionary of arguments to provide the analyser
             market_pair (str): The market pair to analyse
+            result_key (tuple, optional): Defaults to None. Identifies the indicator configuration
+                of the pair, which allows using the batch results or updating a streaming state
+                instead of analyzing the whole candle window.
 
         Returns:
             pandas.DataFrame: Returns a pandas.DataFrame of results or an empty string.
         """
 
-        try:
-            results = dispatcher[indicator](**dispatcher_args)
-        except TypeError:
+        cache_key = None
+        if result_key and self.result_cache:
+            cache_key = self._get_result_cache_key(result_key)
+            results = self.result_cache.get(cache_key)
+            if results is not None:
+                return results
+
+        batch_results = self.batch_results.get(result_key[0], dict()) if result_key else dict()
+        if result_key in batch_results:
+            results = batch_results[result_key]
+        else:
+            try:
+                if (result_key and self.streaming_analyzer
+                        and self.streaming_analyzer.can_stream(indicator)):
+                    results = self.streaming_analyzer.analyze(
+                        result_key,
+                        indicator,
+                        dispatcher_args
+                    )
+                else:
+                    results = dispatcher[indicator](**dispatcher_args)
+            except TypeError:
+                self.logger.info(
+                    'Invalid type encountered while processing pair %s for indicator %s, skipping',
+                    market_pair,
+                    indicator
+                )
+                self.logger.info(traceback.format_exc())
+                results = str()
+
+        if cache_key and not isinstance(results, str):
+            self.result_cache.put(cache_key, results)
+        return results
+
+
+    def _get_result_cache_key(self, result_key):
+        """Get the key results are cached under.
+
+        The last candle returned by an exchange is usually still open, so its values are part of
+        the key along with its timestamp.
+
+        Args:
+            result_key (tuple): The exchange, market pair, analyzer type, analyzer name and
+                configuration index of the result.
+
+        Returns:
+            tuple: The exchange, market pair, candle period, candles and configuration analyzed.
+        """
+
+        exchange, market_pair, analyzer_type, analyzer_name, conf_index = result_key
+        if analyzer_type == 'indicators':
+            analyzer_conf = self.indicator_conf[analyzer_name][conf_index]
+        else:
+            analyzer_conf = self.informant_conf[analyzer_name][conf_index]
+
+        candle_period = analyzer_conf['candle_period']
+        historical_data = self._get_historical_data(market_pair, exchange, candle_period)
+        conf_hash = hashlib.md5(
+            json.dumps(analyzer_conf, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+
+        return (
+            exchange,
+            market_pair,
+            candle_period,
+            historical_data[0][0],
+            len(historical_data),
+            tuple(historical_data[-1]),
+            analyzer_type,
+            analyzer_name,
+            conf_hash
+        )
+
+
+    def _log_cache_stats(self):
+        """Log how many candle and result lookups were served from the caches this cycle.
+        """
+
+        self.logger.info(
+            "Candle cache: %s hits, %s misses",
+            self.cache_hits,
+            self.cache_misses
+        )
+
+        if self.result_cache:
+            result_stats = self.result_cache.get_stats()
             self.logger.info(
-                'Invalid type encountered while processing pair %s for indicator %s, skipping',
-                market_pair,
-                indicator
+                "Result cache: %s hits, %s misses, %.0f%% hit rate, %s results in %.1f MB",
+                result_stats['hits'],
+                result_stats['misses'],
+                result_stats['hit_rate'] * 100,
+                result_stats['results'],
+                result_stats['bytes'] / 1024 / 1024
             )
-            self.logger.info(traceback.format_exc())
-            results = str()
-        return results
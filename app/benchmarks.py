@@ -0,0 +1,219 @@
+"""Time the rolling window kernels against the per candle slicing they replaced
+"""
+
+import argparse
+import timeit
+
+import numpy
+import pandas
+
+from analyzers import backends, kernels
+
+
+def _slice_vwap(dataframe, period_count):
+    """Compute VWAP by slicing every window, as the VWAP analyzer used to.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The VWAP of each candle.
+    """
+
+    vwap = numpy.full(dataframe.shape[0], numpy.nan)
+    for index in range(period_count, dataframe.shape[0]):
+        start_index = index - period_count
+        last_index = index + 1
+
+        total_volume = dataframe['volume'].iloc[start_index:last_index]
+        total_high = dataframe['high'].iloc[start_index:last_index]
+        total_low = dataframe['low'].iloc[start_index:last_index]
+
+        total_average_price = total_volume * (total_high + total_low) / 2
+        vwap[index] = total_average_price.sum() / total_volume.sum()
+    return vwap
+
+
+def _kernel_vwap(dataframe, period_count):
+    """Compute VWAP with the rolling sum kernel.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The VWAP of each candle.
+    """
+
+    volume = dataframe['volume'].values
+    average_price = (dataframe['high'].values + dataframe['low'].values) / 2
+    return (
+        kernels.rolling_sum(volume * average_price, period_count + 1)
+        / kernels.rolling_sum(volume, period_count + 1)
+    )
+
+
+def _slice_midpoint(dataframe, period_count):
+    """Compute the high/low midpoint by slicing every window, as the Ichimoku analyzer used to.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The midpoint of each candle.
+    """
+
+    midpoint = numpy.full(dataframe.shape[0], numpy.nan)
+    for index in range(period_count, dataframe.shape[0]):
+        start_index = index - period_count
+        last_index = index + 1
+        window_min = dataframe['low'][start_index:last_index].min()
+        window_max = dataframe['high'][start_index:last_index].max()
+        midpoint[index] = (window_min + window_max) / 2
+    return midpoint
+
+
+def _kernel_midpoint(dataframe, period_count):
+    """Compute the high/low midpoint with the rolling min and max kernels.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The midpoint of each candle.
+    """
+
+    return (
+        kernels.rolling_min(dataframe['low'].values, period_count + 1)
+        + kernels.rolling_max(dataframe['high'].values, period_count + 1)
+    ) / 2
+
+
+def _rsi_values(dataframe, period_count):
+    """Compute the RSI that the Stochastic RSI analyzer windows over.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        pandas.Series: The RSI of each candle, without the leading candles it is undefined for.
+    """
+
+    rsi = pandas.Series(backends.rsi(dataframe['close'].values, period_count * 2))
+    return rsi.dropna().reset_index(drop=True)
+
+
+def _slice_stoch_rsi(dataframe, period_count):
+    """Compute the Stochastic RSI by slicing every window, as the Stochastic RSI analyzer used to.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The Stochastic RSI of each candle with a defined RSI.
+    """
+
+    rsi = _rsi_values(dataframe, period_count)
+    stoch_rsi = numpy.full(rsi.shape[0], numpy.nan)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        for index in range(period_count, rsi.shape[0]):
+            start_index = index - period_count
+            last_index = index + 1
+            rsi_min = rsi.iloc[start_index:last_index].min()
+            rsi_max = rsi.iloc[start_index:last_index].max()
+            stoch_rsi[index] = 100 * ((rsi[index] - rsi_min) / (rsi_max - rsi_min))
+    return stoch_rsi
+
+
+def _kernel_stoch_rsi(dataframe, period_count):
+    """Compute the Stochastic RSI with the rolling min and max kernels.
+
+    Args:
+        dataframe (pandas.DataFrame): The historical OHCLV data.
+        period_count (int): The number of candles preceding the current one in each window.
+
+    Returns:
+        numpy.ndarray: The Stochastic RSI of each candle with a defined RSI.
+    """
+
+    rsi = _rsi_values(dataframe, period_count).values
+    rsi_min = kernels.rolling_min(rsi, period_count + 1)
+    rsi_max = kernels.rolling_max(rsi, period_count + 1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return 100 * ((rsi - rsi_min) / (rsi_max - rsi_min))
+
+
+def _random_candles(candle_count, seed=0):
+    """Build a random walk of candles.
+
+    Args:
+        candle_count (int): The number of candles to build.
+        seed (int, optional): Defaults to 0. The random seed.
+
+    Returns:
+        pandas.DataFrame: The historical OHCLV data.
+    """
+
+    random_state = numpy.random.RandomState(seed)
+    close = 100 + numpy.cumsum(random_state.normal(0, 1, candle_count))
+    spread = random_state.uniform(0, 1, candle_count)
+    return pandas.DataFrame({
+        'open': close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': random_state.uniform(1, 1000, candle_count)
+    })
+
+
+BENCHMARKS = [
+    ('vwap', 15, _slice_vwap, _kernel_vwap),
+    ('stoch_rsi', 14, _slice_stoch_rsi, _kernel_stoch_rsi),
+    ('ichimoku', 52, _slice_midpoint, _kernel_midpoint)
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time the rolling window kernels against per candle slicing.'
+    )
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+
+    print('{:<10} {:>8} {:>12} {:>12} {:>9}'.format(
+        'window', 'candles', 'slices (s)', 'kernel (s)', 'speedup'
+    ))
+
+    for candle_count in arguments.sizes:
+        dataframe = _random_candles(candle_count)
+
+        for name, period_count, slice_function, kernel_function in BENCHMARKS:
+            expected = slice_function(dataframe, period_count)
+            result = kernel_function(dataframe, period_count)
+            if not numpy.allclose(result, expected, equal_nan=True):
+                raise ValueError('Kernel result of {} differs from slicing'.format(name))
+
+            slice_time = min(timeit.repeat(
+                lambda: slice_function(dataframe, period_count),
+                number=1,
+                repeat=arguments.repeat
+            ))
+            kernel_time = min(timeit.repeat(
+                lambda: kernel_function(dataframe, period_count),
+                number=1,
+                repeat=arguments.repeat
+            ))
+
+            print('{:<10} {:>8} {:>12.4f} {:>12.4f} {:>8.0f}x'.format(
+                name, candle_count, slice_time, kernel_time, slice_time / kernel_time
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Persistent local store for OHLCV candles
+"""
+
+import sqlite3
+import threading
+
+import structlog
+
+class CandleStore():
+    """Stores OHLCV candles on disk keyed by exchange, market pair and timeframe.
+    """
+
+    def __init__(self, path):
+        """Initializes CandleStore class
+
+        Args:
+            path (str): Path of the sqlite database file to store candles in.
+        """
+
+        self.logger = structlog.get_logger()
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.connection:
+            self.connection.execute(
+                """CREATE TABLE IF NOT EXISTS candles (
+                    exchange TEXT NOT NULL,
+                    market_pair TEXT NOT NULL,
+                    timeframe TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (exchange, market_pair, timeframe, timestamp)
+                )"""
+            )
+
+        self.logger.info('Using candle store at %s', path)
+
+
+    def get_timestamp_range(self, exchange, market_pair, timeframe):
+        """Get the first and last stored candle timestamps for a symbol pair.
+
+        Args:
+            exchange (str): The exchange the candles belong to.
+            market_pair (str): The symbol pair the candles belong to i.e. BURST/BTC
+            timeframe (str): The ccxt time unit of the candles i.e. 5m or 1d.
+
+        Returns:
+            tuple: The first and last timestamps in milliseconds, (None, None) if nothing is
+                stored.
+        """
+
+        with self.lock:
+            return self.connection.execute(
+                """SELECT MIN(timestamp), MAX(timestamp) FROM candles
+                WHERE exchange = ? AND market_pair = ? AND timeframe = ?""",
+                (exchange, market_pair, timeframe)
+            ).fetchone()
+
+
+    def get_candles(self, exchange, market_pair, timeframe, since=0):
+        """Get the stored candles for a symbol pair.
+
+        Args:
+            exchange (str): The exchange the candles belong to.
+            market_pair (str): The symbol pair the candles belong to i.e. BURST/BTC
+            timeframe (str): The ccxt time unit of the candles i.e. 5m or 1d.
+            since (int, optional): Defaults to 0. Timestamp in milliseconds of the oldest candle
+                to return.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume
+                sorted by timestamp in ascending order.
+        """
+
+        with self.lock:
+            rows = self.connection.execute(
+                """SELECT timestamp, open, high, low, close, volume FROM candles
+                WHERE exchange = ? AND market_pair = ? AND timeframe = ? AND timestamp >= ?
+                ORDER BY timestamp ASC""",
+                (exchange, market_pair, timeframe, since)
+            ).fetchall()
+
+        return [list(row) for row in rows]
+
+
+    def merge_candles(self, exchange, market_pair, timeframe, candles):
+        """Insert new candles and overwrite existing candles with the same timestamp.
+
+        Args:
+            exchange (str): The exchange the candles belong to.
+            market_pair (str): The symbol pair the candles belong to i.e. BURST/BTC
+            timeframe (str): The ccxt time unit of the candles i.e. 5m or 1d.
+            candles (list): A list of lists which contain timestamp, open, high, low, close,
+                volume.
+        """
+
+        rows = [
+            (exchange, market_pair, timeframe, int(candle[0])) + tuple(candle[1:6])
+            for candle in candles
+        ]
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                """INSERT OR REPLACE INTO candles
+                (exchange, market_pair, timeframe, timestamp, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+
+
+    def prune_candles(self, exchange, market_pair, timeframe, before):
+        """Delete stored candles that are older than a given timestamp.
+
+        Args:
+            exchange (str): The exchange the candles belong to.
+            market_pair (str): The symbol pair the candles belong to i.e. BURST/BTC
+            timeframe (str): The ccxt time unit of the candles i.e. 5m or 1d.
+            before (int): Timestamp in milliseconds, older candles are deleted.
+        """
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                """DELETE FROM candles
+                WHERE exchange = ? AND market_pair = ? AND timeframe = ? AND timestamp < ?""",
+                (exchange, market_pair, timeframe, before)
+            )
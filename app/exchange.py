@@ -3,33 +3,63 @@
 
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import ccxt
 import structlog
 from tenacity import retry, retry_if_exception_type, stop_after_attempt
 
+from rate_limiter import TokenBucket
+from replay import RecordingExchange, ReplayExchange
+
 class ExchangeInterface():
     """Interface for performing queries against exchange API's
     """
 
-    def __init__(self, exchange_config):
+    def __init__(self, exchange_config, candle_store=None, market_cache=None, record_path=None,
+                 replay_path=None, replay_latency=0, replay_rate_limit=None, page_size=500,
+                 page_workers=4):
         """Initializes ExchangeInterface class
 
         Args:
             exchange_config (dict): A dictionary containing configuration for the exchanges.
+            candle_store (CandleStore, optional): Defaults to None. A local candle store used to
+                only fetch candles newer than the ones already stored.
+            market_cache (MarketCache, optional): Defaults to None. A cache of the exchange
+                markets, markets are loaded from the exchange on every call when not set.
+            record_path (str, optional): Defaults to None. A directory to record the exchange
+                responses to.
+            replay_path (str, optional): Defaults to None. A directory of recorded exchange
+                responses to serve instead of querying the exchanges.
+            replay_latency (int, optional): Defaults to 0. Milliseconds added to every replayed
+                response.
+            replay_rate_limit (int, optional): Defaults to None. Minimum milliseconds between
+                replayed requests, uses the recorded exchange rate limit when not set.
+            page_size (int, optional): Defaults to 500. The most candles requested at once, longer
+                histories are split into pages of this size.
+            page_workers (int, optional): Defaults to 4. How many pages of a history are fetched
+                at the same time.
         """
 
         self.logger = structlog.get_logger()
+        self.candle_store = candle_store
+        self.market_cache = market_cache
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.replay_latency = replay_latency
+        self.replay_rate_limit = replay_rate_limit
+        self.page_size = page_size
+        self.page_workers = page_workers
+        self.market_refreshes = set()
         self.exchanges = dict()
 
         # Loads the exchanges using ccxt.
         for exchange in exchange_config:
             if exchange_config[exchange]['required']['enabled']:
-                new_exchange = getattr(ccxt, exchange)({
-                    "enableRateLimit": True
-                })
+                new_exchange = self._load_exchange(exchange)
 
                 # sets up api permissions for user if given
                 if new_exchange:
@@ -37,6 +67,39 @@ class ExchangeInterface():
                 else:
                     self.logger.error("Unable to load exchange %s", new_exchange)
 
+        self.rate_limiters = {
+            exchange: TokenBucket(1000 / self.exchanges[exchange].rateLimit)
+            for exchange in self.exchanges
+        }
+
+
+    def _load_exchange(self, exchange):
+        """Creates the ccxt client for an exchange.
+
+        Args:
+            exchange (str): The ccxt id of the exchange to load.
+
+        Returns:
+            ccxt.Exchange: The client for the exchange.
+        """
+
+        if self.replay_path:
+            return ReplayExchange(
+                exchange,
+                self.replay_path,
+                latency=self.replay_latency,
+                rate_limit=self.replay_rate_limit
+            )
+
+        # Requests are spaced by the rate limiters instead, which are shared by the page workers.
+        new_exchange = getattr(ccxt, exchange)({
+            "enableRateLimit": False
+        })
+
+        if self.record_path:
+            return RecordingExchange(new_exchange, self.record_path)
+        return new_exchange
+
 
     @retry(retry=retry_if_exception_type(ccxt.NetworkError), stop=stop_after_attempt(3))
     def get_historical_data(self, market_pair, exchange, time_unit, start_date=None, max_periods=100):
@@ -57,6 +120,117 @@ class ExchangeInterface():
             list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
         """
 
+        self._validate_timeframe(exchange, time_unit)
+        start_date = self._get_start_date(time_unit, start_date, max_periods)
+        fetch_since = self._get_fetch_since(market_pair, exchange, time_unit, start_date)
+        page_starts = self._get_page_starts(time_unit, fetch_since)
+
+        if len(page_starts) > 1:
+            historical_data = self._fetch_pages(market_pair, exchange, time_unit, page_starts)
+        else:
+            self.rate_limiters[exchange].acquire()
+            historical_data = self.exchanges[exchange].fetch_ohlcv(
+                market_pair,
+                timeframe=time_unit,
+                since=fetch_since
+            )
+
+        return self._merge_historical_data(
+            market_pair,
+            exchange,
+            time_unit,
+            start_date,
+            historical_data
+        )
+
+
+    def _fetch_pages(self, market_pair, exchange, time_unit, page_starts):
+        """Fetch a long history as concurrent pages paced by the exchange rate limit.
+
+        Args:
+            market_pair (str): Contains the symbol pair to operate on i.e. BURST/BTC
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            page_starts (list): Timestamps in milliseconds of the first candle of each page.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        def fetch_page(page_start):
+            self.rate_limiters[exchange].acquire()
+            return self.exchanges[exchange].fetch_ohlcv(
+                market_pair,
+                timeframe=time_unit,
+                since=page_start,
+                limit=self.page_size
+            )
+
+        with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+            pages = list(executor.map(fetch_page, page_starts))
+
+        return self._stitch_pages(pages)
+
+
+    def _get_page_starts(self, time_unit, fetch_since):
+        """Split the range from a timestamp until now into pages the exchange can return at once.
+
+        Args:
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            fetch_since (int): Timestamp in milliseconds of the first candle to fetch.
+
+        Returns:
+            list: Timestamps in milliseconds of the first candle of each page.
+        """
+
+        timeframe_milliseconds = int(self._get_timeframe_delta(time_unit).total_seconds() * 1000)
+        page_milliseconds = self.page_size * timeframe_milliseconds
+        now = int(time.time() * 1000)
+
+        return list(range(fetch_since, now, page_milliseconds)) or [fetch_since]
+
+
+    def _stitch_pages(self, pages):
+        """Join pages of candles, dropping the candles returned by more than one page.
+
+        Args:
+            pages (list): The lists of candles returned for each page.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume
+                sorted by timestamp in ascending order.
+        """
+
+        candles = dict()
+        for page in pages:
+            for candle in page:
+                candles[candle[0]] = candle
+
+        return [candles[timestamp] for timestamp in sorted(candles)]
+
+
+    def get_exchange_timeframes(self):
+        """Get the time units each enabled exchange can return OHLCV data for.
+
+        Returns:
+            dict: The set of ccxt time units keyed by exchange, empty when the exchange does not
+                support timeframe queries.
+        """
+
+        return {
+            exchange: set(getattr(self.exchanges[exchange], 'timeframes', None) or ())
+            for exchange in self.exchanges
+        }
+
+
+    def _validate_timeframe(self, exchange, time_unit):
+        """Check that an exchange supports fetching OHLCV data for a time unit.
+
+        Args:
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+        """
+
         try:
             if time_unit not in self.exchanges[exchange].timeframes:
                 raise ValueError(
@@ -73,45 +247,129 @@ class ExchangeInterface():
             )
             raise AttributeError(sys.exc_info())
 
-        if not start_date:
-            timeframe_regex = re.compile('([0-9]+)([a-zA-Z])')
-            timeframe_matches = timeframe_regex.match(time_unit)
-            time_quantity = timeframe_matches.group(1)
-            time_period = timeframe_matches.group(2)
 
-            timedelta_values = {
-                'm': 'minutes',
-                'h': 'hours',
-                'd': 'days',
-                'w': 'weeks',
-                'M': 'months',
-                'y': 'years'
-            }
+    def _get_start_date(self, time_unit, start_date, max_periods):
+        """Get the timestamp of the oldest candle required.
 
-            timedelta_args = { timedelta_values[time_period]: int(time_quantity) }
+        Args:
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            start_date (int): Timestamp in milliseconds, computed from max_periods if not set.
+            max_periods (int): Maximum number of time periods back to fetch data for.
 
-            start_date_delta = timedelta(**timedelta_args)
+        Returns:
+            int: Timestamp in milliseconds.
+        """
 
-            max_days_date = datetime.now() - (max_periods * start_date_delta)
+        if not start_date:
+            max_days_date = datetime.now() - (max_periods * self._get_timeframe_delta(time_unit))
             start_date = int(max_days_date.replace(tzinfo=timezone.utc).timestamp() * 1000)
 
-        historical_data = self.exchanges[exchange].fetch_ohlcv(
+        return start_date
+
+
+    def _get_fetch_since(self, market_pair, exchange, time_unit, start_date):
+        """Get the timestamp to fetch candles from, skipping the candles already stored.
+
+        Args:
+            market_pair (str): Contains the symbol pair to operate on i.e. BURST/BTC
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            start_date (int): Timestamp in milliseconds of the oldest candle required.
+
+        Returns:
+            int: Timestamp in milliseconds.
+        """
+
+        if not self.candle_store:
+            return start_date
+
+        first_stored, last_stored = self.candle_store.get_timestamp_range(
+            exchange,
             market_pair,
-            timeframe=time_unit,
-            since=start_date
+            time_unit
         )
 
+        timeframe_milliseconds = self._get_timeframe_delta(time_unit).total_seconds() * 1000
+
+        # The last stored candle is fetched again as it may not have been closed when stored.
+        fetch_since = start_date
+        if first_stored is not None and first_stored <= start_date + timeframe_milliseconds:
+            fetch_since = max(start_date, last_stored)
+
+        return fetch_since
+
+
+    def _merge_historical_data(self, market_pair, exchange, time_unit, start_date, new_data):
+        """Merge freshly fetched candles with the stored ones.
+
+        Args:
+            market_pair (str): Contains the symbol pair to operate on i.e. BURST/BTC
+            exchange (str): Contains the exchange to fetch the historical data from.
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+            start_date (int): Timestamp in milliseconds of the oldest candle required.
+            new_data (list): The candles returned by the exchange.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        historical_data = new_data
+        if self.candle_store:
+            self.logger.debug(
+                'Fetched %s new candles for %s %s %s',
+                len(new_data),
+                exchange,
+                market_pair,
+                time_unit
+            )
+
+            self.candle_store.merge_candles(exchange, market_pair, time_unit, new_data)
+            self.candle_store.prune_candles(exchange, market_pair, time_unit, start_date)
+            historical_data = self.candle_store.get_candles(
+                exchange,
+                market_pair,
+                time_unit,
+                start_date
+            )
+
         if not historical_data:
             raise ValueError('No historical data provided returned by exchange.')
 
         # Sort by timestamp in ascending order
         historical_data.sort(key=lambda d: d[0])
 
-        time.sleep(self.exchanges[exchange].rateLimit / 1000)
-
         return historical_data
 
 
+    def _get_timeframe_delta(self, time_unit):
+        """Get the duration of a single candle for a ccxt time unit.
+
+        Args:
+            time_unit (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+
+        Returns:
+            datetime.timedelta: The duration of a single candle.
+        """
+
+        timeframe_regex = re.compile('([0-9]+)([a-zA-Z])')
+        timeframe_matches = timeframe_regex.match(time_unit)
+        time_quantity = timeframe_matches.group(1)
+        time_period = timeframe_matches.group(2)
+
+        timedelta_values = {
+            'm': 'minutes',
+            'h': 'hours',
+            'd': 'days',
+            'w': 'weeks',
+            'M': 'months',
+            'y': 'years'
+        }
+
+        timedelta_args = { timedelta_values[time_period]: int(time_quantity) }
+
+        return timedelta(**timedelta_args)
+
+
     @retry(retry=retry_if_exception_type(ccxt.NetworkError), stop=stop_after_attempt(3))
     def get_exchange_markets(self, exchanges=[], markets=[]):
         """Get market data for all symbol pairs listed on all configured exchanges.
@@ -134,18 +392,103 @@ class ExchangeInterface():
 
         exchange_markets = dict()
         for exchange in exchanges:
-            exchange_markets[exchange] = self.exchanges[exchange].load_markets()
+            exchange_markets[exchange] = self._filter_markets(
+                exchange,
+                self._get_markets(exchange),
+                markets
+            )
+
+        return exchange_markets
+
+
+    def _get_markets(self, exchange):
+        """Get the markets of an exchange, served from the market cache when possible.
 
-            if markets:
-                curr_markets = exchange_markets[exchange]
+        Stale markets are still served while a refreshed copy is loaded in the background.
+
+        Args:
+            exchange (str): The exchange to get the markets of.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
 
-                # Only retrieve markets the users specified
-                exchange_markets[exchange] = { key: curr_markets[key] for key in curr_markets if key in markets }
+        if not self.market_cache:
+            self.rate_limiters[exchange].acquire()
+            return self.exchanges[exchange].load_markets()
 
-                for market in markets:
-                    if market not in exchange_markets[exchange]:
-                        self.logger.info('%s has no market %s, ignoring.', exchange, market)
+        exchange_markets = self.market_cache.get_markets(exchange)
+        if exchange_markets is None:
+            return self._refresh_markets(exchange)
 
-            time.sleep(self.exchanges[exchange].rateLimit / 1000)
+        # The ccxt client needs the markets to map symbols when it did not load them itself.
+        if not self.exchanges[exchange].markets:
+            self.exchanges[exchange].set_markets(exchange_markets)
+
+        if self.market_cache.is_stale(exchange) and exchange not in self.market_refreshes:
+            self.market_refreshes.add(exchange)
+            threading.Thread(
+                target=self._refresh_markets_in_background,
+                args=(exchange,),
+                daemon=True
+            ).start()
+
+        return exchange_markets
+
+
+    def _refresh_markets(self, exchange):
+        """Load the markets of an exchange and store them in the market cache.
+
+        Args:
+            exchange (str): The exchange to load the markets of.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
 
+        self.rate_limiters[exchange].acquire()
+        exchange_markets = self.exchanges[exchange].load_markets(reload=True)
+        self.market_cache.set_markets(exchange, exchange_markets)
         return exchange_markets
+
+
+    def _refresh_markets_in_background(self, exchange):
+        """Refresh the cached markets of an exchange, logging rather than raising failures.
+
+        Args:
+            exchange (str): The exchange to refresh the markets of.
+        """
+
+        try:
+            self._refresh_markets(exchange)
+            self.logger.info('Refreshed cached markets of %s', exchange)
+        except ccxt.BaseError:
+            self.logger.error('Unable to refresh cached markets of %s', exchange)
+        finally:
+            self.market_refreshes.discard(exchange)
+
+
+    def _filter_markets(self, exchange, exchange_markets, markets):
+        """Only retrieve markets the users specified
+
+        Args:
+            exchange (str): The exchange the markets are listed on.
+            exchange_markets (dict): All the markets listed on the exchange.
+            markets (list): A list of markets to keep, keeps all markets when empty.
+
+        Returns:
+            dict: A dictionary containing market data for the kept symbol pairs.
+        """
+
+        if not markets:
+            return exchange_markets
+
+        filtered_markets = {
+            key: exchange_markets[key] for key in exchange_markets if key in markets
+        }
+
+        for market in markets:
+            if market not in filtered_markets:
+                self.logger.info('%s has no market %s, ignoring.', exchange, market)
+
+        return filtered_markets
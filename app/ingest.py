@@ -0,0 +1,249 @@
+"""Accept candles and trades pushed from an upstream market data service
+"""
+
+import argparse
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import requests
+import structlog
+
+from resample import trades_to_candles
+
+
+class PushedCandles():
+    """Candles of a single pair and candle period pushed to the ingestion endpoint.
+    """
+
+    __slots__ = ('exchange', 'market_pair', 'candle_period', 'candles', 'aggregate')
+
+    def __init__(self, exchange, market_pair, candle_period, candles, aggregate=False):
+        """Initializes PushedCandles class
+
+        Args:
+            exchange (str): The exchange the market pair is listed on.
+            market_pair (str): The market pair the candles belong to i.e. BURST/BTC
+            candle_period (str): The ccxt time unit of the candles i.e. 5m or 1d.
+            candles (list): A list of lists which contain timestamp, open, high, low, close,
+                volume.
+            aggregate (bool, optional): Defaults to False. Whether the candles were built from
+                trades and continue the stored candles with the same timestamp.
+        """
+
+        self.exchange = exchange
+        self.market_pair = market_pair
+        self.candle_period = candle_period
+        self.candles = candles
+        self.aggregate = aggregate
+
+
+class IngestRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests made to the ingestion endpoint.
+
+    POST /candles expects a json object with exchange, market_pair, candle_period and candles,
+    a list of [timestamp, open, high, low, close, volume] closed candles.
+
+    POST /trades expects a json object with exchange, market_pair, candle_period and trades,
+    a list of [timestamp, price, amount] trades that are rolled up into candles.
+    """
+
+    def do_POST(self):
+        """Validate a push and queue it for analysis.
+        """
+
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            pushed_candles = self._parse_payload(payload)
+        except (ValueError, KeyError, TypeError) as error:
+            self._respond(400, {'error': str(error)})
+            return
+
+        if pushed_candles is None:
+            self._respond(404, {'error': 'Unknown path {}'.format(self.path)})
+            return
+
+        try:
+            self.server.candle_queue.put_nowait(pushed_candles)
+        except queue.Full:
+            self._respond(503, {'error': 'Ingestion queue is full'})
+            return
+
+        self._respond(202, {'queued': len(pushed_candles.candles)})
+
+
+    def _parse_payload(self, payload):
+        """Build the pushed candles from a request payload.
+
+        Args:
+            payload (dict): The decoded json body of the request.
+
+        Raises:
+            ValueError: The exchange is not enabled or does not support the candle period.
+
+        Returns:
+            PushedCandles: The candles to analyze, None if the path is not handled.
+        """
+
+        if self.path not in ('/candles', '/trades'):
+            return None
+
+        # Pushes are only accepted for candles the exchange could also be asked for.
+        exchange_timeframes = self.server.exchange_timeframes
+        if payload['exchange'] not in exchange_timeframes:
+            raise ValueError('Exchange {} is not enabled'.format(payload['exchange']))
+
+        if payload['candle_period'] not in exchange_timeframes[payload['exchange']]:
+            raise ValueError('{} does not support the {} candle period'.format(
+                payload['exchange'],
+                payload['candle_period']
+            ))
+
+        if self.path == '/candles':
+            candles = sorted(
+                ([int(candle[0])] + [float(value) for value in candle[1:6]]
+                 for candle in payload['candles']),
+                key=lambda d: d[0]
+            )
+            aggregate = False
+        elif self.path == '/trades':
+            trades = sorted(
+                ([int(trade[0]), float(trade[1]), float(trade[2])] for trade in payload['trades']),
+                key=lambda d: d[0]
+            )
+            candles = trades_to_candles(trades, payload['candle_period'])
+            aggregate = True
+
+        if not candles:
+            raise ValueError('No candles or trades pushed')
+
+        return PushedCandles(
+            payload['exchange'],
+            payload['market_pair'],
+            payload['candle_period'],
+            candles,
+            aggregate=aggregate
+        )
+
+
+    def _respond(self, status, body):
+        """Send a json response.
+
+        Args:
+            status (int): The http status code.
+            body (dict): The response body.
+        """
+
+        response = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+
+    def log_message(self, format, *args):
+        self.server.logger.debug(format, *args)
+
+
+class IngestServer(ThreadingMixIn, HTTPServer):
+    """Local http endpoint that queues pushed candles for the analysis loop.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host, port, exchange_timeframes, max_queue_size=1000):
+        """Initializes IngestServer class
+
+        Args:
+            host (str): The address to listen on.
+            port (int): The port to listen on.
+            exchange_timeframes (dict): The candle periods pushes are accepted for, keyed by
+                enabled exchange.
+            max_queue_size (int, optional): Defaults to 1000. The most pushes waiting for analysis,
+                further pushes are rejected until the queue drains.
+        """
+
+        super().__init__((host, port), IngestRequestHandler)
+        self.logger = structlog.get_logger()
+        self.exchange_timeframes = exchange_timeframes
+        self.candle_queue = queue.Queue(maxsize=max_queue_size)
+
+
+    def start(self):
+        """Serve requests in a background thread.
+        """
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        self.logger.info('Accepting pushed candles on %s:%s', *self.server_address)
+
+
+def push_candles(url, exchange, market_pair, candle_period, candles):
+    """Push closed candles to an ingestion endpoint, standing in for a market data service.
+
+    Args:
+        url (str): The base url of the ingestion endpoint i.e. http://127.0.0.1:8085
+        exchange (str): The exchange the market pair is listed on.
+        market_pair (str): The market pair the candles belong to i.e. BURST/BTC
+        candle_period (str): The ccxt time unit of the candles i.e. 5m or 1d.
+        candles (list): A list of lists which contain timestamp, open, high, low, close, volume.
+
+    Returns:
+        requests.Response: The response of the endpoint.
+    """
+
+    return requests.post('{}/candles'.format(url.rstrip('/')), json={
+        'exchange': exchange,
+        'market_pair': market_pair,
+        'candle_period': candle_period,
+        'candles': candles
+    })
+
+
+def push_trades(url, exchange, market_pair, candle_period, trades):
+    """Push trades to an ingestion endpoint, standing in for a market data service.
+
+    Args:
+        url (str): The base url of the ingestion endpoint i.e. http://127.0.0.1:8085
+        exchange (str): The exchange the market pair is listed on.
+        market_pair (str): The market pair the trades belong to i.e. BURST/BTC
+        candle_period (str): The ccxt time unit of the candles to build i.e. 5m or 1d.
+        trades (list): A list of lists which contain timestamp, price, amount.
+
+    Returns:
+        requests.Response: The response of the endpoint.
+    """
+
+    return requests.post('{}/trades'.format(url.rstrip('/')), json={
+        'exchange': exchange,
+        'market_pair': market_pair,
+        'candle_period': candle_period,
+        'trades': trades
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Push candles from a json file to a running crypto-signal instance.'
+    )
+    parser.add_argument('file', help='A json file containing a list of OHLCV candles.')
+    parser.add_argument('--url', default='http://127.0.0.1:8085')
+    parser.add_argument('--exchange', required=True)
+    parser.add_argument('--market-pair', required=True)
+    parser.add_argument('--candle-period', required=True)
+    arguments = parser.parse_args()
+
+    with open(arguments.file, 'r') as candle_file:
+        file_candles = json.load(candle_file)
+
+    ingest_response = push_candles(
+        arguments.url,
+        arguments.exchange,
+        arguments.market_pair,
+        arguments.candle_period,
+        file_candles
+    )
+    print(ingest_response.status_code, ingest_response.text)
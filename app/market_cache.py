@@ -0,0 +1,89 @@
+"""Cache for the market metadata of exchanges
+"""
+
+import json
+import os
+import threading
+import time
+
+import structlog
+
+class MarketCache():
+    """Keeps the markets listed on each exchange for a configurable time to live.
+    """
+
+    def __init__(self, ttl, path=None):
+        """Initializes MarketCache class
+
+        Args:
+            ttl (int): How many seconds cached markets are considered fresh.
+            path (str, optional): Defaults to None. Path of a json file the cache is persisted to
+                so it survives restarts, the cache is only kept in memory when not set.
+        """
+
+        self.logger = structlog.get_logger()
+        self.ttl = ttl
+        self.path = path
+        self.lock = threading.Lock()
+        self.exchange_markets = dict()
+
+        if self.path and os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as cache_file:
+                    self.exchange_markets = json.load(cache_file)
+            except ValueError:
+                self.logger.warn('Unable to read market cache %s, ignoring.', self.path)
+
+
+    def get_markets(self, exchange):
+        """Get the cached markets of an exchange.
+
+        Args:
+            exchange (str): The exchange to get the markets of.
+
+        Returns:
+            dict: The cached markets, None if the exchange has not been cached yet.
+        """
+
+        with self.lock:
+            if exchange in self.exchange_markets:
+                return self.exchange_markets[exchange]['markets']
+        return None
+
+
+    def is_stale(self, exchange):
+        """Check whether the cached markets of an exchange are older than the time to live.
+
+        Args:
+            exchange (str): The exchange to check.
+
+        Returns:
+            bool: True when the markets should be refreshed.
+        """
+
+        with self.lock:
+            if exchange not in self.exchange_markets:
+                return True
+            cached_at = self.exchange_markets[exchange]['timestamp']
+        return time.time() - cached_at > self.ttl
+
+
+    def set_markets(self, exchange, markets):
+        """Cache the markets of an exchange and persist the cache if a path is configured.
+
+        Args:
+            exchange (str): The exchange the markets are listed on.
+            markets (dict): The markets as returned by ccxt load_markets.
+        """
+
+        with self.lock:
+            self.exchange_markets[exchange] = {
+                'timestamp': time.time(),
+                'markets': markets
+            }
+
+            if self.path:
+                temporary_path = '{}.tmp'.format(self.path)
+                with open(temporary_path, 'w') as cache_file:
+                    json.dump(self.exchange_markets, cache_file, default=str)
+                os.replace(temporary_path, self.path)
@@ -5,6 +5,7 @@ import json
 import structlog
 from jinja2 import Template
 
+from alert_store import AlertStore
 from notifiers.twilio_client import TwilioNotifier
 from notifiers.slack_client import SlackNotifier
 from notifiers.discord_client import DiscordNotifier
@@ -12,21 +13,44 @@ from notifiers.gmail_client import GmailNotifier
 from notifiers.telegram_client import TelegramNotifier
 from notifiers.webhook_client import WebhookNotifier
 from notifiers.stdout_client import StdoutNotifier
+from notification_dispatcher import NotificationDispatcher
 
 class Notifier():
     """Handles sending notifications via the configured notifiers
     """
 
-    def __init__(self, notifier_config):
+    def __init__(self, notifier_config, workers=1, queue_size=100, timeout=30,
+                 alert_state_path=None):
         """Initializes Notifier class
 
         Args:
             notifier_config (dict): A dictionary containing configuration for the notifications.
+            workers (int, optional): Defaults to 1. How many messages of each notifier are sent
+                at the same time in the background, 0 sends them before returning. A notifier can
+                override it with the workers key of its optional settings.
+            queue_size (int, optional): Defaults to 100. The most messages of each notifier
+                waiting to be sent.
+            timeout (int, optional): Defaults to 30. Seconds a notifier may take to send a
+                message before it is abandoned.
+            alert_state_path (str, optional): Defaults to None. Path of the sqlite file the last
+                status of every analysis is saved to, so it survives restarts.
         """
 
         self.logger = structlog.get_logger()
         self.notifier_config = notifier_config
-        self.last_analysis = dict()
+        self.alert_store = AlertStore(alert_state_path)
+        # Set once every pair has been analyzed since this process started.
+        self.analyzed_all_pairs = False
+        self.dispatcher = NotificationDispatcher(
+            workers,
+            queue_size,
+            timeout,
+            channel_workers={
+                notifier: notifier_config[notifier]['optional']['workers']
+                for notifier in notifier_config
+                if notifier_config[notifier].get('optional', {}).get('workers') is not None
+            }
+        )
 
         enabled_notifiers = list()
         self.logger = structlog.get_logger()
@@ -61,7 +85,8 @@ class Notifier():
             self.gmail_client = GmailNotifier(
                 username=notifier_config['gmail']['required']['username'],
                 password=notifier_config['gmail']['required']['password'],
-                destination_addresses=notifier_config['gmail']['required']['destination_emails']
+                destination_addresses=notifier_config['gmail']['required']['destination_emails'],
+                timeout=timeout
             )
             enabled_notifiers.append('gmail')
 
@@ -70,7 +95,8 @@ class Notifier():
             self.telegram_client = TelegramNotifier(
                 token=notifier_config['telegram']['required']['token'],
                 chat_id=notifier_config['telegram']['required']['chat_id'],
-                parse_mode=notifier_config['telegram']['optional']['parse_mode']
+                parse_mode=notifier_config['telegram']['optional']['parse_mode'],
+                timeout=timeout
             )
             enabled_notifiers.append('telegram')
 
@@ -79,7 +105,8 @@ class Notifier():
             self.webhook_client = WebhookNotifier(
                 url=notifier_config['webhook']['required']['url'],
                 username=notifier_config['webhook']['optional']['username'],
-                password=notifier_config['webhook']['optional']['password']
+                password=notifier_config['webhook']['optional']['password'],
+                timeout=timeout
             )
             enabled_notifiers.append('webhook')
 
@@ -90,100 +117,110 @@ class Notifier():
 
         self.logger.info('enabled notifers: %s', enabled_notifiers)
 
+        # Each template is compiled once, notifiers with the same template share it.
+        compiled_templates = dict()
+        self.templates = dict()
+        for notifier in enabled_notifiers:
+            template = notifier_config[notifier]['optional'].get('template')
+            if template is None:
+                continue
+            if template not in compiled_templates:
+                compiled_templates[template] = Template(template)
+            self.templates[notifier] = compiled_templates[template]
 
-    def notify_all(self, new_analysis):
+
+    def notify_all(self, new_analysis, full_cycle=True):
         """Trigger a notification for all notification options.
 
+        The messages are queued and sent in the background, so this does not wait on the
+        notifiers.
+
         Args:
             new_analysis (dict): The new_analysis to send.
+            full_cycle (bool, optional): Defaults to True. Whether the analysis covers every pair,
+                rather than only the pair that candles were pushed for.
         """
 
-        self.notify_slack(new_analysis)
-        self.notify_discord(new_analysis)
-        self.notify_twilio(new_analysis)
-        self.notify_gmail(new_analysis)
-        self.notify_telegram(new_analysis)
+        self._log_delivery_stats()
+
+        alert_events = list()
+        if self.templates:
+            alert_events = self._get_alert_events(new_analysis)
+
+        if full_cycle:
+            self.analyzed_all_pairs = True
+
+        self.notify_slack(alert_events)
+        self.notify_discord(alert_events)
+        self.notify_twilio(alert_events)
+        self.notify_gmail(alert_events)
+        self.notify_telegram(alert_events)
         self.notify_webhook(new_analysis)
-        self.notify_stdout(new_analysis)
+        self.notify_stdout(alert_events)
 
-    def notify_discord(self, new_analysis):
+    def notify_discord(self, alert_events):
         """Send a notification via the discord notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.discord_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['discord']['optional']['template']
-            )
+            message = self._render_message('discord', alert_events)
             if message.strip():
-                self.discord_client.notify(message)
+                self.dispatcher.submit('discord', self.discord_client.notify, message)
 
 
-    def notify_slack(self, new_analysis):
+    def notify_slack(self, alert_events):
         """Send a notification via the slack notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.slack_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['slack']['optional']['template']
-            )
+            message = self._render_message('slack', alert_events)
             if message.strip():
-                self.slack_client.notify(message)
+                self.dispatcher.submit('slack', self.slack_client.notify, message)
 
 
-    def notify_twilio(self, new_analysis):
+    def notify_twilio(self, alert_events):
         """Send a notification via the twilio notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.twilio_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['twilio']['optional']['template']
-            )
+            message = self._render_message('twilio', alert_events)
             if message.strip():
-                self.twilio_client.notify(message)
+                self.dispatcher.submit('twilio', self.twilio_client.notify, message)
 
 
-    def notify_gmail(self, new_analysis):
+    def notify_gmail(self, alert_events):
         """Send a notification via the gmail notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.gmail_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['gmail']['optional']['template']
-            )
+            message = self._render_message('gmail', alert_events)
             if message.strip():
-                self.gmail_client.notify(message)
+                self.dispatcher.submit('gmail', self.gmail_client.notify, message)
 
 
-    def notify_telegram(self, new_analysis):
+    def notify_telegram(self, alert_events):
         """Send a notification via the telegram notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.telegram_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['telegram']['optional']['template']
-            )
+            message = self._render_message('telegram', alert_events)
             if message.strip():
-                self.telegram_client.notify(message)
+                self.dispatcher.submit('telegram', self.telegram_client.notify, message)
 
 
     def notify_webhook(self, new_analysis):
@@ -194,33 +231,53 @@ class Notifier():
         """
 
         if self.webhook_configured:
+            # The payload is a copy as the other notifiers still need the result records.
+            payload = dict()
             for exchange in new_analysis:
+                payload[exchange] = dict()
                 for market in new_analysis[exchange]:
+                    payload[exchange][market] = dict()
                     for indicator_type in new_analysis[exchange][market]:
+                        payload[exchange][market][indicator_type] = dict()
                         for indicator in new_analysis[exchange][market][indicator_type]:
-                            for index, analysis in enumerate(new_analysis[exchange][market][indicator_type][indicator]):
-                                analysis_dict = analysis['result'].to_dict(orient='records')
-                                if analysis_dict:
-                                    new_analysis[exchange][market][indicator_type][indicator][index] = analysis_dict[-1]
-                                else:
-                                    new_analysis[exchange][market][indicator_type][indicator][index] = ''
+                            payload[exchange][market][indicator_type][indicator] = [
+                                analysis['result'].latest or ''
+                                for analysis in new_analysis[exchange][market][indicator_type][indicator]
+                            ]
 
-            self.webhook_client.notify(new_analysis)
+            self.dispatcher.submit('webhook', self.webhook_client.notify, payload)
 
-    def notify_stdout(self, new_analysis):
+    def notify_stdout(self, alert_events):
         """Send a notification via the stdout notifier
 
         Args:
-            new_analysis (dict): The new_analysis to send.
+            alert_events (list): The alert events to send.
         """
 
         if self.stdout_configured:
-            message = self._indicator_message_templater(
-                new_analysis,
-                self.notifier_config['stdout']['optional']['template']
-            )
+            message = self._render_message('stdout', alert_events)
             if message.strip():
-                self.stdout_client.notify(message)
+                self.dispatcher.submit('stdout', self.stdout_client.notify, message)
+
+    def _log_delivery_stats(self):
+        """Log the queue depth and delivery latency of each notifier.
+        """
+
+        for channel, stats in sorted(self.dispatcher.get_stats().items()):
+            self.logger.info(
+                "%s notifications: %s queued, %s delivered, %s failed, %s timed out, %s hung, "
+                "%s dropped, %.2fs mean and %.2fs max latency",
+                channel,
+                stats['queued'],
+                stats['delivered'],
+                stats['failed'],
+                stats['timed_out'],
+                stats['hung'],
+                stats['dropped'],
+                stats['mean_latency'],
+                stats['max_latency']
+            )
+
 
     def _validate_required_config(self, notifier, notifier_config):
         """Validate the required configuration items are present for a notifier.
@@ -240,22 +297,20 @@ class Notifier():
         return notifier_configured
 
 
-    def _indicator_message_templater(self, new_analysis, template):
-        """Creates a message from a user defined template
+    def _get_alert_events(self, new_analysis):
+        """Find the analyses to alert about and update the last status of every analysis.
 
         Args:
-            new_analysis (dict): A dictionary of data related to the analysis to send a message about.
-            template (str): A Jinja formatted message template.
+            new_analysis (dict): The new analysis results.
 
         Returns:
-            str: The templated messages for the notifier.
+            list: The template variables of each alert, shared by every notifier.
         """
 
-        if not self.last_analysis:
-            self.last_analysis = new_analysis
+        changed_statuses = dict()
+        removed_keys = list()
 
-        message_template = Template(template)
-        new_message = str()
+        alert_events = list()
         for exchange in new_analysis:
             for market in new_analysis[exchange]:
                 for indicator_type in new_analysis[exchange][market]:
@@ -263,77 +318,97 @@ class Notifier():
                         continue
                     for indicator in new_analysis[exchange][market][indicator_type]:
                         for index, analysis in enumerate(new_analysis[exchange][market][indicator_type][indicator]):
-                            if analysis['result'].shape[0] == 0:
+                            status_key = (exchange, market, indicator_type, indicator, index)
+                            if not analysis['result'].latest:
+                                if self.alert_store.get(status_key) is not None:
+                                    removed_keys.append(status_key)
                                 continue
 
-                            values = dict()
-
-                            if indicator_type == 'indicators':
-                                for signal in analysis['config']['signal']:
-                                    latest_result = analysis['result'].iloc[-1]
-
-                                    values[signal] = analysis['result'].iloc[-1][signal]
-                                    if isinstance(values[signal], float):
-                                        values[signal] = format(values[signal], '.8f')
-                            elif indicator_type == 'crossovers':
-                                latest_result = analysis['result'].iloc[-1]
-
-                                key_signal = '{}_{}'.format(
-                                    analysis['config']['key_signal'],
-                                    analysis['config']['key_indicator_index']
-                                )
-
-                                crossed_signal = '{}_{}'.format(
-                                    analysis['config']['crossed_signal'],
-                                    analysis['config']['crossed_indicator_index']
-                                )
-
-                                values[key_signal] = analysis['result'].iloc[-1][key_signal]
-                                if isinstance(values[key_signal], float):
-                                        values[key_signal] = format(values[key_signal], '.8f')
-
-                                values[crossed_signal] = analysis['result'].iloc[-1][crossed_signal]
-                                if isinstance(values[crossed_signal], float):
-                                        values[crossed_signal] = format(values[crossed_signal], '.8f')
-
-                            status = 'neutral'
-                            if latest_result['is_hot']:
-                                status = 'hot'
-                            elif latest_result['is_cold']:
-                                status = 'cold'
-
-                            # Save status of indicator's new analysis
-                            new_analysis[exchange][market][indicator_type][indicator][index]['status'] = status
-
-                            if latest_result['is_hot'] or latest_result['is_cold']:
-                                try:
-                                    last_status = self.last_analysis[exchange][market][indicator_type][indicator][index]['status']
-                                except:
-                                    last_status = str()
-
-                                should_alert = True
-                                if analysis['config']['alert_frequency'] == 'once':
-                                    if last_status == status:
-                                        should_alert = False
-
-                                if not analysis['config']['alert_enabled']:
-                                    should_alert = False
-
-                                if should_alert:
-                                    base_currency, quote_currency = market.split('/')
-                                    new_message += message_template.render(
-                                        values=values,
-                                        exchange=exchange,
-                                        market=market,
-                                        base_currency=base_currency,
-                                        quote_currency=quote_currency,
-                                        indicator=indicator,
-                                        indicator_number=index,
-                                        analysis=analysis,
-                                        status=status,
-                                        last_status=last_status
-                                    )
-
-        # Merge changes from new analysis into last analysis
-        self.last_analysis = {**self.last_analysis, **new_analysis}
-        return new_message
+                            status = analysis['result'].status
+                            stored_status = self.alert_store.get(status_key)
+                            if stored_status != status:
+                                changed_statuses[status_key] = status
+
+                            # Alerts sent only once per status change are not sent for the very
+                            # first analysis of a pair, unless its status is known from before.
+                            if stored_status is not None:
+                                last_status = stored_status
+                            elif not self.analyzed_all_pairs:
+                                last_status = status
+                            else:
+                                last_status = str()
+
+                            # Templates written for earlier versions read it from the analysis.
+                            analysis['status'] = status
+
+                            if status == 'neutral' or not analysis['config']['alert_enabled']:
+                                continue
+
+                            if analysis['config']['alert_frequency'] == 'once':
+                                if last_status == status:
+                                    continue
+
+                            base_currency, quote_currency = market.split('/')
+                            alert_events.append({
+                                'values': self._get_alert_values(indicator_type, analysis),
+                                'exchange': exchange,
+                                'market': market,
+                                'base_currency': base_currency,
+                                'quote_currency': quote_currency,
+                                'indicator': indicator,
+                                'indicator_number': index,
+                                'analysis': analysis,
+                                'status': status,
+                                'last_status': last_status
+                            })
+
+        self.alert_store.update(changed_statuses, removed_keys)
+        return alert_events
+
+
+    def _get_alert_values(self, indicator_type, analysis):
+        """Get the latest values of the signal lines of an analysis, formatted for the templates.
+
+        Args:
+            indicator_type (str): Either indicators or crossovers.
+            analysis (dict): The result record and configuration of the analysis.
+
+        Returns:
+            dict: The formatted values keyed by signal line.
+        """
+
+        if indicator_type == 'indicators':
+            signals = analysis['config']['signal']
+        else:
+            signals = [
+                '{}_{}'.format(
+                    analysis['config']['key_signal'],
+                    analysis['config']['key_indicator_index']
+                ),
+                '{}_{}'.format(
+                    analysis['config']['crossed_signal'],
+                    analysis['config']['crossed_indicator_index']
+                )
+            ]
+
+        values = dict()
+        for signal in signals:
+            values[signal] = analysis['result'].latest[signal]
+            if isinstance(values[signal], float):
+                values[signal] = format(values[signal], '.8f')
+        return values
+
+
+    def _render_message(self, notifier, alert_events):
+        """Render the template of a notifier for every alert.
+
+        Args:
+            notifier (str): The name of the notifier key in default-config.json
+            alert_events (list): The template variables of each alert.
+
+        Returns:
+            str: The templated messages for the notifier.
+        """
+
+        message_template = self.templates[notifier]
+        return ''.join(message_template.render(**alert_event) for alert_event in alert_events)
@@ -0,0 +1,191 @@
+"""Delivers notifications in the background so the analysis never waits on a notifier
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import structlog
+
+class NotificationDispatcher():
+    """Queues the messages of each notifier and sends them from worker threads of that notifier.
+
+    Each notifier has its own bounded queue and workers, so a slow or unreachable notifier only
+    delays and drops its own messages. A delivery that does not finish within the timeout is
+    abandoned so it no longer holds up the worker.
+    """
+
+    def __init__(self, workers, queue_size, timeout, channel_workers=None):
+        """Initializes NotificationDispatcher class
+
+        Args:
+            workers (int): How many messages of a notifier are sent at the same time. Messages are
+                sent right away on the calling thread when 0.
+            queue_size (int): The most messages of a notifier waiting to be sent, further messages
+                are dropped until it catches up.
+            timeout (float): Seconds after which a delivery is abandoned.
+            channel_workers (dict, optional): Defaults to None. The number of workers of the
+                notifiers that do not use the default.
+        """
+
+        self.logger = structlog.get_logger()
+        self.workers = workers
+        self.channel_workers = channel_workers or dict()
+        self.queue_size = max(queue_size, 1)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.executors = dict()
+        self.stats = dict()
+
+
+    def submit(self, channel, deliver, message):
+        """Queue a message to be sent by a notifier.
+
+        Args:
+            channel (str): The name of the notifier.
+            deliver (callable): Sends a message via the notifier.
+            message (object): The message to send.
+
+        Returns:
+            bool: False when the queue of the notifier is full and the message was dropped.
+        """
+
+        submitted_at = time.time()
+        workers = self.channel_workers.get(channel, self.workers)
+        if not workers:
+            with self.lock:
+                self._get_stats(channel)['queued'] += 1
+            self._deliver(channel, deliver, message, submitted_at)
+            return True
+
+        with self.lock:
+            channel_stats = self._get_stats(channel)
+
+            # Abandoned deliveries still hold a thread, so they count against the queue as well.
+            if channel_stats['queued'] + channel_stats['hung'] >= self.queue_size:
+                channel_stats['dropped'] += 1
+                self.logger.warn(
+                    "%s notification queue is full with %s messages, dropping message",
+                    channel,
+                    channel_stats['queued'] + channel_stats['hung']
+                )
+                return False
+
+            channel_stats['queued'] += 1
+            if channel not in self.executors:
+                self.executors[channel] = ThreadPoolExecutor(max_workers=workers)
+            executor = self.executors[channel]
+
+        executor.submit(self._deliver, channel, deliver, message, submitted_at)
+        return True
+
+
+    def get_stats(self):
+        """Get the queue depth and delivery latency of each notifier.
+
+        Returns:
+            dict: The number of queued, delivered, failed, timed out, still hung and dropped
+                messages and the mean and max seconds from queueing to delivery, keyed by notifier.
+        """
+
+        with self.lock:
+            stats = dict()
+            for channel, channel_stats in self.stats.items():
+                stats[channel] = dict(channel_stats)
+                completed = (
+                    channel_stats['delivered'] + channel_stats['failed']
+                    + channel_stats['timed_out']
+                )
+                stats[channel]['mean_latency'] = (
+                    channel_stats['total_latency'] / completed if completed else 0
+                )
+            return stats
+
+
+    def close(self, wait=True):
+        """Stop the worker threads.
+
+        Args:
+            wait (bool, optional): Defaults to True. Wait for the queued messages to be sent.
+        """
+
+        with self.lock:
+            executors = list(self.executors.values())
+            self.executors = dict()
+
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+
+    def _deliver(self, channel, deliver, message, submitted_at):
+        """Send a message and record how long it took.
+
+        The message is sent from its own thread, which is abandoned when it does not finish within
+        the timeout as not every notifier client can be given a timeout.
+
+        Args:
+            channel (str): The name of the notifier.
+            deliver (callable): Sends a message via the notifier.
+            message (object): The message to send.
+            submitted_at (float): When the message was queued.
+        """
+
+        delivery = {'outcome': 'failed', 'abandoned': False}
+
+        def send():
+            try:
+                deliver(message)
+                delivery['outcome'] = 'delivered'
+            except Exception:
+                self.logger.exception("Failed to send %s notification", channel)
+
+            with self.lock:
+                if delivery['abandoned']:
+                    self._get_stats(channel)['hung'] -= 1
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        sender.join(self.timeout)
+
+        latency = time.time() - submitted_at
+        with self.lock:
+            channel_stats = self._get_stats(channel)
+            outcome = delivery['outcome']
+            if sender.is_alive():
+                delivery['abandoned'] = True
+                outcome = 'timed_out'
+                channel_stats['hung'] += 1
+                self.logger.warn(
+                    "%s notification did not finish within the %s second timeout, abandoning it",
+                    channel,
+                    self.timeout
+                )
+
+            channel_stats['queued'] -= 1
+            channel_stats[outcome] += 1
+            channel_stats['total_latency'] += latency
+            channel_stats['max_latency'] = max(channel_stats['max_latency'], latency)
+
+
+    def _get_stats(self, channel):
+        """Get the counters of a notifier, creating them on first use.
+
+        Args:
+            channel (str): The name of the notifier.
+
+        Returns:
+            dict: The counters of the notifier.
+        """
+
+        if channel not in self.stats:
+            self.stats[channel] = {
+                'queued': 0,
+                'delivered': 0,
+                'failed': 0,
+                'timed_out': 0,
+                'hung': 0,
+                'dropped': 0,
+                'total_latency': 0,
+                'max_latency': 0
+            }
+        return self.stats[channel]
@@ -12,13 +12,14 @@ class GmailNotifier(NotifierUtils):
     """Class for handling gmail notifications
     """
 
-    def __init__(self, username, password, destination_addresses):
+    def __init__(self, username, password, destination_addresses, timeout=None):
         """Initialize GmailNotifier class
 
         Args:
             username (str): Username of the gmail account to use for sending message.
             password (str): Password of the gmail account to use for sending message.
             destination_addresses (list): A list of email addresses to notify.
+            timeout (float, optional): Defaults to None. Seconds to wait for the mail server.
         """
 
         self.logger = structlog.get_logger()
@@ -26,6 +27,7 @@ class GmailNotifier(NotifierUtils):
         self.username = username
         self.password = password
         self.destination_addresses = ','.join(destination_addresses)
+        self.timeout = timeout
 
 
     @retry(stop=stop_after_attempt(3))
@@ -45,7 +47,10 @@ class GmailNotifier(NotifierUtils):
         header += 'Subject: Crypto-signal alert!\n\n'
         message = header + message
 
-        smtp_handler = smtplib.SMTP(self.smtp_server)
+        if self.timeout:
+            smtp_handler = smtplib.SMTP(self.smtp_server, timeout=self.timeout)
+        else:
+            smtp_handler = smtplib.SMTP(self.smtp_server)
         smtp_handler.starttls()
         smtp_handler.login(self.username, self.password)
         result = smtp_handler.sendmail(self.username, self.destination_addresses, message)
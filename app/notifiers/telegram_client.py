@@ -14,18 +14,20 @@ class TelegramNotifier(NotifierUtils):
     """Used to notify user of events via telegram.
     """
 
-    def __init__(self, token, chat_id, parse_mode):
+    def __init__(self, token, chat_id, parse_mode, timeout=None):
         """Initialize TelegramNotifier class
 
         Args:
             token (str): The telegram API token.
             chat_id (str): The chat ID you want the bot to send messages to.
+            timeout (float, optional): Defaults to None. Seconds to wait for telegram to answer.
         """
 
         self.logger = structlog.get_logger()
         self.bot = telegram.Bot(token=token)
         self.chat_id = chat_id
         self.parse_mode = parse_mode
+        self.timeout = timeout
 
 
     @retry(
@@ -45,4 +47,9 @@ class TelegramNotifier(NotifierUtils):
         #print(message_chunks)
         #exit()
         for message_chunk in message_chunks:
-            self.bot.send_message(chat_id=self.chat_id, text=message_chunk, parse_mode=self.parse_mode)
+            self.bot.send_message(
+                chat_id=self.chat_id,
+                text=message_chunk,
+                parse_mode=self.parse_mode,
+                timeout=self.timeout
+            )
@@ -10,11 +10,12 @@ class WebhookNotifier(NotifierUtils):
     """Class for handling webhook notifications
     """
 
-    def __init__(self, url, username, password):
+    def __init__(self, url, username, password, timeout=None):
         self.logger = structlog.get_logger()
         self.url = url
         self.username = username
         self.password = password
+        self.timeout = timeout
 
 
     def notify(self, message):
@@ -25,9 +26,14 @@ class WebhookNotifier(NotifierUtils):
         """
 
         if self.username and self.password:
-            request = requests.post(self.url, json=message, auth=(self.username, self.password))
+            request = requests.post(
+                self.url,
+                json=message,
+                auth=(self.username, self.password),
+                timeout=self.timeout
+            )
         else:
-            request = requests.post(self.url, json=message)
+            request = requests.post(self.url, json=message, timeout=self.timeout)
 
         if not request.status_code == requests.codes.ok:
             self.logger.error("Request failed: %s - %s", request.status_code, request.content)
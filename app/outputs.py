@@ -42,19 +42,17 @@ class Output():
             output += '\n{}:\t'.format(indicator_type)
             for indicator in results[indicator_type]:
                 for i, analysis in enumerate(results[indicator_type][indicator]):
-                    if analysis['result'].shape[0] == 0:
+                    if not analysis['result'].latest:
                         self.logger.info('No results for %s #%s', indicator, i)
                         continue
 
                     colour_code = normal_colour
 
-                    if 'is_hot' in analysis['result'].iloc[-1]:
-                        if analysis['result'].iloc[-1]['is_hot']:
-                            colour_code = hot_colour
+                    if analysis['result'].status == 'hot':
+                        colour_code = hot_colour
 
-                    if 'is_cold' in analysis['result'].iloc[-1]:
-                        if analysis['result'].iloc[-1]['is_cold']:
-                            colour_code = cold_colour
+                    if analysis['result'].status == 'cold':
+                        colour_code = cold_colour
 
                     if indicator_type == 'crossovers':
                         key_signal = '{}_{}'.format(
@@ -62,14 +60,14 @@ class Output():
                             analysis['config']['key_indicator_index']
                         )
 
-                        key_value = analysis['result'].iloc[-1][key_signal]
+                        key_value = analysis['result'].latest[key_signal]
 
                         crossed_signal = '{}_{}'.format(
                             analysis['config']['crossed_signal'],
                             analysis['config']['crossed_indicator_index']
                         )
 
-                        crossed_value = analysis['result'].iloc[-1][crossed_signal]
+                        crossed_value = analysis['result'].latest[crossed_signal]
 
                         if isinstance(key_value, float):
                             key_value = format(key_value, '.8f')
@@ -87,7 +85,7 @@ class Output():
                     else:
                         formatted_values = list()
                         for signal in analysis['config']['signal']:
-                            value = analysis['result'].iloc[-1][signal]
+                            value = analysis['result'].latest[signal]
                             if isinstance(value, float):
                                 formatted_values.append(format(value, '.8f'))
                             else:
@@ -130,14 +128,14 @@ class Output():
                             analysis['config']['key_indicator_index']
                         )
 
-                        key_value = analysis['result'].iloc[-1][key_signal]
+                        key_value = analysis['result'].latest[key_signal]
 
                         crossed_signal = '{}_{}'.format(
                             analysis['config']['crossed_signal'],
                             analysis['config']['crossed_indicator_index']
                         )
 
-                        crossed_value = analysis['result'].iloc[-1][crossed_signal]
+                        crossed_value = analysis['result'].latest[crossed_signal]
 
                         if isinstance(key_value, float):
                             key_value = format(key_value, '.8f')
@@ -148,17 +146,17 @@ class Output():
                         value = '/'.join([key_value, crossed_value])
                     else:
                         for signal in analysis['config']['signal']:
-                            value = analysis['result'].iloc[-1][signal]
+                            value = analysis['result'].latest[signal]
                             if isinstance(value, float):
                                 value = format(value, '.8f')
 
                     is_hot = str()
-                    if 'is_hot' in analysis['result'].iloc[-1]:
-                        is_hot = str(analysis['result'].iloc[-1]['is_hot'])
+                    if 'is_hot' in analysis['result'].latest:
+                        is_hot = str(analysis['result'].latest['is_hot'])
 
                     is_cold = str()
-                    if 'is_cold' in analysis['result'].iloc[-1]:
-                        is_cold = str(analysis['result'].iloc[-1]['is_cold'])
+                    if 'is_cold' in analysis['result'].latest:
+                        is_cold = str(analysis['result'].latest['is_cold'])
 
                     new_output = ','.join([
                         market_pair,
@@ -191,9 +189,7 @@ class Output():
         for indicator_type in results:
             for indicator in results[indicator_type]:
                 for index, analysis in enumerate(results[indicator_type][indicator]):
-                    results[indicator_type][indicator][index]['result'] = analysis['result'].to_dict(
-                        orient='records'
-                    )[-1]
+                    results[indicator_type][indicator][index]['result'] = analysis['result'].latest
 
         formatted_results = { 'pair': market_pair, 'results': results }
         output = json.dumps(formatted_results)
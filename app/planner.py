@@ -0,0 +1,247 @@
+"""Compiles the indicator, informant and crossover configuration into a graph of analyses
+"""
+
+import json
+
+import structlog
+
+# The configuration keys each analyzer type is called with, other keys only affect the output.
+ANALYSIS_KEYS = {
+    'indicators': ('signal', 'hot', 'cold', 'period_count'),
+    'informants': ('period_count',)
+}
+
+
+class AnalysisNode():
+    """One distinct analysis, shared by every configuration that asks for the same computation.
+    """
+
+    __slots__ = ('node_type', 'name', 'conf_index', 'config', 'dependencies')
+
+    def __init__(self, node_type, name, conf_index, config, dependencies=()):
+        """Initializes AnalysisNode class
+
+        Args:
+            node_type (str): Either indicators, informants or crossovers.
+            name (str): The name of the analyzer.
+            conf_index (int): The index of the first configuration that asks for this analysis.
+            config (dict): The configuration at that index.
+            dependencies (tuple, optional): Defaults to (). The keys of the nodes whose results
+                this analysis is computed from.
+        """
+
+        self.node_type = node_type
+        self.name = name
+        self.conf_index = conf_index
+        self.config = config
+        self.dependencies = dependencies
+
+
+class AnalysisPlan():
+    """The analyses to run for each market pair, compiled once from the configuration.
+
+    Configurations that compute the same thing share one node and analyses that are neither
+    output nor used by a crossover are pruned. The nodes are grouped into levels that only depend
+    on earlier levels, so the nodes of a level can be computed in parallel.
+    """
+
+    def __init__(self, indicator_conf, informant_conf, crossover_conf, dispatchers):
+        """Initializes AnalysisPlan class
+
+        Args:
+            indicator_conf (dict): The configuration of the indicators.
+            informant_conf (dict): The configuration of the informants.
+            crossover_conf (dict): The configuration of the crossovers.
+            dispatchers (dict): The analyzer dispatchers keyed by indicators, informants and
+                crossovers, configured analyzers missing from them are skipped.
+        """
+
+        self.logger = structlog.get_logger()
+        self.nodes = dict()
+        self.outputs = dict()
+        self.levels = list()
+
+        slots = self._add_analyzer_nodes(
+            (('indicators', indicator_conf), ('informants', informant_conf)),
+            dispatchers
+        )
+        self._add_crossover_nodes(crossover_conf, dispatchers['crossovers'], slots)
+
+        compiled_count = len(self.nodes)
+        self._prune()
+        self._sort()
+
+        self.logger.info(
+            "Analysis plan: %s enabled configurations run as %s analyses in %s levels, "
+            "%s unused analyses pruned",
+            len(self.outputs),
+            len(self.nodes),
+            len(self.levels),
+            compiled_count - len(self.nodes)
+        )
+
+
+    def get_analyzer_nodes(self):
+        """Get the nodes that analyze candles, in execution order.
+
+        Returns:
+            list: The indicator and informant nodes.
+        """
+
+        return [
+            self.nodes[node_key] for level in self.levels for node_key in level
+            if self.nodes[node_key].node_type != 'crossovers'
+        ]
+
+
+    def get_candle_periods(self):
+        """Get the candle periods the planned analyses need.
+
+        Returns:
+            set: The candle periods.
+        """
+
+        return { node.config['candle_period'] for node in self.get_analyzer_nodes() }
+
+
+    def _add_analyzer_nodes(self, analyzer_confs, dispatchers):
+        """Add a node for each distinct indicator and informant configuration.
+
+        Args:
+            analyzer_confs (tuple): Pairs of analyzer type and its configuration.
+            dispatchers (dict): The analyzer dispatchers keyed by analyzer type.
+
+        Returns:
+            dict: The node key of every configuration, enabled or not, keyed by analyzer type,
+                analyzer name and configuration index.
+        """
+
+        slots = dict()
+        for analyzer_type, analyzer_conf in analyzer_confs:
+            for analyzer_name in analyzer_conf:
+                if analyzer_name not in dispatchers[analyzer_type]:
+                    self.logger.warn("No such %s %s, skipping.", analyzer_type[:-1], analyzer_name)
+                    continue
+
+                for conf_index, conf in enumerate(analyzer_conf[analyzer_name]):
+                    args_key = json.dumps(
+                        { key: conf[key] for key in ANALYSIS_KEYS[analyzer_type] if key in conf },
+                        sort_keys=True,
+                        default=str
+                    )
+                    node_key = (analyzer_type, analyzer_name, conf['candle_period'], args_key)
+                    if node_key not in self.nodes:
+                        self.nodes[node_key] = AnalysisNode(
+                            analyzer_type,
+                            analyzer_name,
+                            conf_index,
+                            conf
+                        )
+
+                    slot = (analyzer_type, analyzer_name, conf_index)
+                    slots[slot] = node_key
+                    if conf['enabled']:
+                        self.outputs[slot] = node_key
+        return slots
+
+
+    def _add_crossover_nodes(self, crossover_conf, dispatcher, slots):
+        """Add a node for each distinct enabled crossover configuration.
+
+        Args:
+            crossover_conf (dict): The configuration of the crossovers.
+            dispatcher (dict): The crossover dispatcher.
+            slots (dict): The node key of every indicator and informant configuration.
+        """
+
+        for crossover in crossover_conf:
+            if crossover not in dispatcher:
+                self.logger.warn("No such crossover %s, skipping.", crossover)
+                continue
+
+            for conf_index, conf in enumerate(crossover_conf[crossover]):
+                if not conf['enabled']:
+                    self.logger.debug("%s is disabled, skipping.", crossover)
+                    continue
+
+                key_slot = (
+                    conf['key_indicator_type'],
+                    conf['key_indicator'],
+                    conf['key_indicator_index']
+                )
+                crossed_slot = (
+                    conf['crossed_indicator_type'],
+                    conf['crossed_indicator'],
+                    conf['crossed_indicator_index']
+                )
+
+                missing_slots = [slot for slot in (key_slot, crossed_slot) if slot not in slots]
+                if missing_slots:
+                    self.logger.warn(
+                        "%s %s uses %s which is not configured, skipping.",
+                        crossover,
+                        conf_index,
+                        ', '.join('{} {} {}'.format(*slot) for slot in missing_slots)
+                    )
+                    continue
+
+                # The signal names and indexes end up in the column names of the result.
+                node_key = (
+                    'crossovers',
+                    crossover,
+                    slots[key_slot],
+                    conf['key_signal'],
+                    conf['key_indicator_index'],
+                    slots[crossed_slot],
+                    conf['crossed_signal'],
+                    conf['crossed_indicator_index'],
+                    conf.get('max_bars_since_cross')
+                )
+                if node_key not in self.nodes:
+                    self.nodes[node_key] = AnalysisNode(
+                        'crossovers',
+                        crossover,
+                        conf_index,
+                        conf,
+                        dependencies=(slots[key_slot], slots[crossed_slot])
+                    )
+                self.outputs[('crossovers', crossover, conf_index)] = node_key
+
+
+    def _prune(self):
+        """Remove the nodes that no output depends on.
+        """
+
+        reachable = set()
+        pending = list(self.outputs.values())
+        while pending:
+            node_key = pending.pop()
+            if node_key not in reachable:
+                reachable.add(node_key)
+                pending.extend(self.nodes[node_key].dependencies)
+
+        self.nodes = {
+            node_key: node for node_key, node in self.nodes.items() if node_key in reachable
+        }
+
+
+    def _sort(self):
+        """Group the nodes into levels in topological order.
+
+        Raises:
+            ValueError: The nodes depend on each other in a cycle.
+        """
+
+        remaining = {
+            node_key: set(node.dependencies) for node_key, node in self.nodes.items()
+        }
+        while remaining:
+            level = [node_key for node_key in remaining if not remaining[node_key]]
+            if not level:
+                raise ValueError('Analysis configuration contains a dependency cycle')
+
+            for node_key in level:
+                del remaining[node_key]
+            for dependencies in remaining.values():
+                dependencies.difference_update(level)
+            self.levels.append(level)
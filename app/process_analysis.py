@@ -0,0 +1,142 @@
+"""Analyzes market pairs in worker processes from candles in shared memory
+"""
+
+import copy
+import os
+import tempfile
+from multiprocessing import Pool
+
+import numpy
+import structlog
+
+# The analysis state of a worker process, set up once when the worker starts.
+_worker_behaviour = None
+
+
+def _init_worker(config):
+    """Set up the analysis state of a worker process.
+
+    Args:
+        config (Configuration): The application configuration.
+    """
+
+    global _worker_behaviour
+
+    # Imported here as behaviour imports this module.
+    from behaviour import Behaviour
+
+    # Workers analyze the candles they are given from scratch, the state lives in the main process.
+    # They are given every candle period, so they have no exchange to fetch or resample from.
+    worker_config = copy.copy(config)
+    worker_config.settings = dict(
+        config.settings,
+        analysis_processes=0,
+        analysis_workers=1,
+        streaming_indicators=False,
+        batch_analysis=False,
+        result_cache_size=0,
+        resample_candles=False
+    )
+    _worker_behaviour = Behaviour(worker_config, None, None)
+
+
+def _analyze_pairs(candle_path, candle_shape, pair_slices):
+    """Analyze a group of market pairs in a worker process.
+
+    Args:
+        candle_path (str): The file the candles of every market pair are mapped from.
+        candle_shape (tuple): The shape of the candle array in the file.
+        pair_slices (list): The exchange, market pair and the rows of each candle period of
+            every market pair to analyze.
+
+    Returns:
+        list: The result records of each market pair.
+    """
+
+    candles = numpy.memmap(candle_path, dtype=float, mode='r', shape=candle_shape)
+
+    results = list()
+    for exchange, market_pair, period_slices in pair_slices:
+        period_candles = {
+            candle_period: numpy.array(candles[start:stop])
+            for candle_period, (start, stop) in period_slices.items()
+        }
+        results.append(_worker_behaviour.analyze_candles(exchange, market_pair, period_candles))
+
+    del candles
+    return results
+
+
+class ProcessAnalyzer():
+    """Runs the analysis of market pairs on a pool of worker processes.
+
+    The candles of an exchange are written once to a memory mapped file, which the workers map
+    instead of receiving pickled candles or dataframes. Only the compact result records are sent
+    back.
+    """
+
+    def __init__(self, config, processes, group_size):
+        """Initializes ProcessAnalyzer class
+
+        Args:
+            config (Configuration): The application configuration.
+            processes (int): How many worker processes to start.
+            group_size (int): How many market pairs each worker analyzes per task.
+        """
+
+        self.logger = structlog.get_logger()
+        self.group_size = max(group_size, 1)
+
+        # /dev/shm is memory backed, elsewhere the page cache keeps the file in memory.
+        self.candle_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        self.pool = Pool(processes=processes, initializer=_init_worker, initargs=(config,))
+
+
+    def analyze(self, exchange, pair_candles):
+        """Analyze the market pairs of an exchange on the worker processes.
+
+        Args:
+            exchange (str): The exchange the market pairs are listed on.
+            pair_candles (dict): The OHLCV data of each candle period keyed by market pair.
+
+        Returns:
+            dict: The indicator, informant and crossover results keyed by market pair.
+        """
+
+        pair_slices = list()
+        row_count = 0
+        for market_pair, period_candles in pair_candles.items():
+            period_slices = dict()
+            for candle_period, candles in period_candles.items():
+                period_slices[candle_period] = (row_count, row_count + len(candles))
+                row_count += len(candles)
+            pair_slices.append((exchange, market_pair, period_slices))
+
+        if not pair_slices:
+            return dict()
+
+        groups = [
+            pair_slices[start:start + self.group_size]
+            for start in range(0, len(pair_slices), self.group_size)
+        ]
+
+        with tempfile.NamedTemporaryFile(dir=self.candle_dir, suffix='.candles') as candle_file:
+            candle_shape = (max(row_count, 1), 6)
+            candles = numpy.memmap(candle_file.name, dtype=float, mode='w+', shape=candle_shape)
+            for _, market_pair, period_slices in pair_slices:
+                for candle_period, (start, stop) in period_slices.items():
+                    if stop > start:
+                        candles[start:stop] = pair_candles[market_pair][candle_period]
+            candles.flush()
+            del candles
+
+            group_results = self.pool.starmap(
+                _analyze_pairs,
+                [(candle_file.name, candle_shape, group) for group in groups]
+            )
+
+        results = dict()
+        for group, group_result in zip(groups, group_results):
+            for (_, market_pair, _), market_pair_result in zip(group, group_result):
+                results[market_pair] = market_pair_result
+        return results
@@ -0,0 +1,67 @@
+"""Token bucket used to pace requests against an exchange API
+"""
+
+import asyncio
+import threading
+import time
+
+class TokenBucket():
+    """Hands out request tokens at a fixed rate with an optional burst capacity.
+
+    Every caller reserves a token straight away and then waits until that token has been
+    refilled, so concurrent callers are served in the order they asked.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """Initializes TokenBucket class
+
+        Args:
+            rate (float): How many tokens are refilled per second.
+            capacity (int, optional): Defaults to 1. The maximum number of tokens that can be
+                saved up for a burst of requests.
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def _reserve(self):
+        """Reserve a token.
+
+        Returns:
+            float: How many seconds to wait until the reserved token is available.
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+
+    def acquire(self):
+        """Block the current thread until a token is available.
+        """
+
+        wait_time = self._reserve()
+        if wait_time:
+            time.sleep(wait_time)
+
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a token is available.
+        """
+
+        wait_time = self._reserve()
+        if wait_time:
+            await asyncio.sleep(wait_time)
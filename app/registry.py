@@ -0,0 +1,229 @@
+"""Finds the indicators, informants and crossovers and builds each of them once
+"""
+
+import importlib
+import threading
+from collections.abc import Mapping
+
+import structlog
+
+# The module and class of each analyzer that ships with crypto-signal.
+BUILTIN_ANALYZERS = {
+    'indicators': {
+        'ichimoku': 'analyzers.indicators.ichimoku:Ichimoku',
+        'macd': 'analyzers.indicators.macd:MACD',
+        'rsi': 'analyzers.indicators.rsi:RSI',
+        'momentum': 'analyzers.indicators.momentum:Momentum',
+        'mfi': 'analyzers.indicators.mfi:MFI',
+        'stoch_rsi': 'analyzers.indicators.stoch_rsi:StochasticRSI',
+        'obv': 'analyzers.indicators.obv:OBV'
+    },
+    'informants': {
+        'sma': 'analyzers.informants.sma:SMA',
+        'ema': 'analyzers.informants.ema:EMA',
+        'vwap': 'analyzers.informants.vwap:VWAP',
+        'bollinger_bands': 'analyzers.informants.bollinger_bands:Bollinger',
+        'ohlcv': 'analyzers.informants.ohlcv:OHLCV'
+    },
+    'crossovers': {
+        'std_crossover': 'analyzers.crossover:CrossOver'
+    }
+}
+
+# Third party packages register their analyzer classes under these entry point groups.
+ENTRY_POINT_GROUPS = {
+    'indicators': 'crypto_signal.indicators',
+    'informants': 'crypto_signal.informants',
+    'crossovers': 'crypto_signal.crossovers'
+}
+
+
+class AnalyzerRegistry():
+    """Imports each analyzer the first time it is used and keeps a single instance of it.
+
+    The installed plugins are only looked up when an analyzer that is not built in is asked for.
+    """
+
+    def __init__(self):
+        """Initializes AnalyzerRegistry class
+        """
+
+        self.logger = structlog.get_logger()
+        self.lock = threading.Lock()
+        self.instances = dict()
+        self.entry_points = None
+
+
+    def has(self, analyzer_type, analyzer_name):
+        """Check whether an analyzer exists without importing it.
+
+        Args:
+            analyzer_type (str): Either indicators, informants or crossovers.
+            analyzer_name (str): The name of the analyzer.
+
+        Returns:
+            bool: True when the analyzer is built in or provided by a plugin.
+        """
+
+        return (
+            analyzer_name in BUILTIN_ANALYZERS[analyzer_type]
+            or analyzer_name in self._get_entry_points()[analyzer_type]
+        )
+
+
+    def get_names(self, analyzer_type):
+        """Get the names of every analyzer of a type.
+
+        Args:
+            analyzer_type (str): Either indicators, informants or crossovers.
+
+        Returns:
+            list: The sorted names of the built in and plugin analyzers.
+        """
+
+        return sorted(
+            set(BUILTIN_ANALYZERS[analyzer_type]) | set(self._get_entry_points()[analyzer_type])
+        )
+
+
+    def get(self, analyzer_type, analyzer_name):
+        """Get the instance of an analyzer, importing and building it on first use.
+
+        Args:
+            analyzer_type (str): Either indicators, informants or crossovers.
+            analyzer_name (str): The name of the analyzer.
+
+        Raises:
+            KeyError: There is no such analyzer.
+
+        Returns:
+            IndicatorUtils: The analyzer instance.
+        """
+
+        instance_key = (analyzer_type, analyzer_name)
+        with self.lock:
+            if instance_key not in self.instances:
+                self.instances[instance_key] = self._load(analyzer_type, analyzer_name)()
+            return self.instances[instance_key]
+
+
+    def find(self, analyzer_name):
+        """Get the instance of an indicator or informant by name alone.
+
+        Args:
+            analyzer_name (str): The name of the indicator or informant.
+
+        Returns:
+            IndicatorUtils: The analyzer instance, None when there is no such analyzer.
+        """
+
+        for analyzer_type in ('indicators', 'informants'):
+            if self.has(analyzer_type, analyzer_name):
+                return self.get(analyzer_type, analyzer_name)
+        return None
+
+
+    def _load(self, analyzer_type, analyzer_name):
+        """Import the class of an analyzer.
+
+        Args:
+            analyzer_type (str): Either indicators, informants or crossovers.
+            analyzer_name (str): The name of the analyzer.
+
+        Raises:
+            KeyError: There is no such analyzer.
+
+        Returns:
+            type: The analyzer class.
+        """
+
+        if analyzer_name in BUILTIN_ANALYZERS[analyzer_type]:
+            module_name, class_name = BUILTIN_ANALYZERS[analyzer_type][analyzer_name].split(':')
+            return getattr(importlib.import_module(module_name), class_name)
+
+        entry_point = self._get_entry_points()[analyzer_type][analyzer_name]
+        self.logger.info("Loading %s %s from %s", analyzer_type[:-1], analyzer_name, entry_point)
+        return entry_point.load()
+
+
+    def _get_entry_points(self):
+        """Get the analyzers registered by the installed plugins, looked up once.
+
+        Returns:
+            dict: The entry points of each analyzer type keyed by analyzer name.
+        """
+
+        if self.entry_points is not None:
+            return self.entry_points
+
+        entry_points = { analyzer_type: dict() for analyzer_type in ENTRY_POINT_GROUPS }
+        try:
+            import pkg_resources
+        except ImportError:
+            self.logger.debug("pkg_resources is not available, no analyzer plugins loaded")
+            self.entry_points = entry_points
+            return self.entry_points
+
+        for analyzer_type, group in ENTRY_POINT_GROUPS.items():
+            for entry_point in pkg_resources.iter_entry_points(group):
+                if entry_point.name in BUILTIN_ANALYZERS[analyzer_type]:
+                    self.logger.warn(
+                        "Plugin %s %s has the name of a built in one, skipping.",
+                        analyzer_type[:-1],
+                        entry_point.name
+                    )
+                    continue
+                entry_points[analyzer_type][entry_point.name] = entry_point
+
+        self.entry_points = entry_points
+        return self.entry_points
+
+
+class AnalyzerDispatcher(Mapping):
+    """Maps analyzer names to a method of their instance, importing analyzers on first lookup.
+    """
+
+    def __init__(self, registry, analyzer_type, method='analyze'):
+        """Initializes AnalyzerDispatcher class
+
+        Args:
+            registry (AnalyzerRegistry): The registry to get the analyzers from.
+            analyzer_type (str): Either indicators, informants or crossovers.
+            method (str, optional): Defaults to analyze. The method of the analyzers to dispatch
+                to.
+        """
+
+        self.registry = registry
+        self.analyzer_type = analyzer_type
+        self.method = method
+
+
+    def __getitem__(self, analyzer_name):
+        if analyzer_name not in self:
+            raise KeyError(analyzer_name)
+        return getattr(self.registry.get(self.analyzer_type, analyzer_name), self.method)
+
+
+    def __contains__(self, analyzer_name):
+        if not self.registry.has(self.analyzer_type, analyzer_name):
+            return False
+
+        # Every analyzer has analyze, other methods are optional so the analyzer is imported.
+        return self.method == 'analyze' or hasattr(
+            self.registry.get(self.analyzer_type, analyzer_name),
+            self.method
+        )
+
+
+    def __iter__(self):
+        return (
+            analyzer_name for analyzer_name in self.registry.get_names(self.analyzer_type)
+            if analyzer_name in self
+        )
+
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+analyzer_registry = AnalyzerRegistry()
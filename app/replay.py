@@ -0,0 +1,366 @@
+"""Record exchange responses to local files and replay them without a network connection
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import ccxt
+import structlog
+
+from timeframes import timeframe_to_milliseconds
+
+
+def _get_ohlcv_path(path, exchange_id, symbol, timeframe):
+    """Get the file path the candles of a symbol pair are recorded to.
+
+    Args:
+        path (str): The directory recordings are kept in.
+        exchange_id (str): The ccxt id of the exchange.
+        symbol (str): The symbol pair i.e. BURST/BTC
+        timeframe (str): The ccxt time unit i.e. 5m or 1d.
+
+    Returns:
+        str: The file path.
+    """
+
+    file_name = '{}_{}.json'.format(symbol.replace('/', '_'), timeframe)
+    return os.path.join(path, exchange_id, 'ohlcv', file_name)
+
+
+def _read_json(file_path, default=None):
+    """Read a recording file.
+
+    Args:
+        file_path (str): The file to read.
+        default (object, optional): Defaults to None. Returned when the file does not exist.
+
+    Returns:
+        object: The recorded data.
+    """
+
+    if not os.path.isfile(file_path):
+        return default
+
+    with open(file_path, 'r') as recording_file:
+        return json.load(recording_file)
+
+
+def _write_json(file_path, data):
+    """Write a recording file, creating its directory when needed.
+
+    Args:
+        file_path (str): The file to write.
+        data (object): The data to record.
+    """
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as recording_file:
+        json.dump(data, recording_file, default=str)
+
+
+class RecordingExchange():
+    """Wraps a ccxt exchange client and records the markets and candles it returns.
+
+    The client settings needed to replay are recorded straight away and the time of the recording
+    is updated with every fetch, so a recording can be replayed even when the markets were served
+    from the market cache.
+    """
+
+    def __init__(self, exchange, path):
+        """Initializes RecordingExchange class
+
+        Args:
+            exchange (ccxt.Exchange): The exchange client to record the responses of.
+            path (str): The directory recordings are kept in.
+        """
+
+        self.logger = structlog.get_logger()
+        self.exchange = exchange
+        self.path = path
+        self.lock = threading.Lock()
+
+        with self.lock:
+            self._record_exchange()
+
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+
+    def load_markets(self, *args, **kwargs):
+        """Load the markets of the exchange and record them.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        markets = self.exchange.load_markets(*args, **kwargs)
+        self._record_markets(markets)
+        return markets
+
+
+    def fetch_ohlcv(self, symbol, *args, **kwargs):
+        """Fetch the candles of a symbol pair and record them.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        candles = self.exchange.fetch_ohlcv(symbol, *args, **kwargs)
+        self._record_ohlcv(symbol, kwargs.get('timeframe', args[0] if args else '1m'), candles)
+        return candles
+
+
+    def set_markets(self, markets, currencies=None):
+        """Set markets served from the market cache and record them.
+
+        Args:
+            markets (dict): The markets as returned by ccxt load_markets.
+            currencies (dict, optional): Defaults to None. The currencies of the exchange.
+        """
+
+        self.exchange.set_markets(markets, currencies)
+        self._record_markets(markets)
+
+
+    def _record_exchange(self):
+        """Record the client settings needed to replay and the time of the recording.
+
+        The caller must hold the lock.
+        """
+
+        _write_json(os.path.join(self.path, self.exchange.id, 'exchange.json'), {
+            'timeframes': self.exchange.timeframes,
+            'rateLimit': self.exchange.rateLimit,
+            'recorded_at': int(time.time() * 1000)
+        })
+
+
+    def _record_markets(self, markets):
+        """Record the markets of the exchange along with the client settings needed to replay.
+
+        Args:
+            markets (dict): The markets as returned by ccxt load_markets.
+        """
+
+        with self.lock:
+            self._record_exchange()
+            _write_json(os.path.join(self.path, self.exchange.id, 'markets.json'), markets)
+
+
+    def _record_ohlcv(self, symbol, timeframe, candles):
+        """Merge candles into the recording of a symbol pair.
+
+        Args:
+            symbol (str): The symbol pair i.e. BURST/BTC
+            timeframe (str): The ccxt time unit i.e. 5m or 1d.
+            candles (list): The candles returned by the exchange.
+        """
+
+        file_path = _get_ohlcv_path(self.path, self.exchange.id, symbol, timeframe)
+        with self.lock:
+            recorded_candles = {
+                candle[0]: candle for candle in _read_json(file_path, default=list())
+            }
+            recorded_candles.update({ candle[0]: candle for candle in candles })
+            _write_json(file_path, sorted(recorded_candles.values(), key=lambda d: d[0]))
+            self._record_exchange()
+
+
+class AsyncRecordingExchange(RecordingExchange):
+    """Wraps an asynchronous ccxt exchange client and records the markets and candles it returns.
+    """
+
+    async def load_markets(self, *args, **kwargs):
+        """Load the markets of the exchange and record them.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        markets = await self.exchange.load_markets(*args, **kwargs)
+        self._record_markets(markets)
+        return markets
+
+
+    async def fetch_ohlcv(self, symbol, *args, **kwargs):
+        """Fetch the candles of a symbol pair and record them.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        candles = await self.exchange.fetch_ohlcv(symbol, *args, **kwargs)
+        self._record_ohlcv(symbol, kwargs.get('timeframe', args[0] if args else '1m'), candles)
+        return candles
+
+
+class ReplayExchange():
+    """Stands in for a ccxt exchange client by serving recorded markets and candles.
+
+    The recorded candles are moved forward to the current time by a whole number of candles, so
+    relative queries such as the last 100 candles return the same data on every run and the
+    candles line up with the current clock, as the candle store expects. Candles of calendar
+    timeframes such as months keep their recorded timestamps.
+    """
+
+    def __init__(self, exchange_id, path, latency=0, rate_limit=None):
+        """Initializes ReplayExchange class
+
+        Args:
+            exchange_id (str): The ccxt id of the recorded exchange.
+            path (str): The directory recordings are kept in.
+            latency (int, optional): Defaults to 0. Milliseconds added to every response.
+            rate_limit (int, optional): Defaults to None. Minimum milliseconds between requests,
+                requests made faster are counted and logged but still served so replays stay
+                deterministic. Uses the recorded rate limit when not set.
+        """
+
+        self.logger = structlog.get_logger()
+        self.id = exchange_id
+        self.path = path
+        self.latency = latency
+
+        exchange_info = _read_json(os.path.join(path, exchange_id, 'exchange.json'))
+        if not exchange_info:
+            raise ValueError('No recording of {} found in {}'.format(exchange_id, path))
+
+        self.timeframes = exchange_info['timeframes']
+        self.rateLimit = rate_limit or exchange_info['rateLimit']
+        self.clock_offset = int(time.time() * 1000) - exchange_info['recorded_at']
+        self.markets = None
+        self.last_request = None
+        self.rate_limit_violations = 0
+        self.lock = threading.Lock()
+
+
+    def _throttle(self):
+        """Record requests made faster than the rate limit allows.
+
+        A real exchange would reject them, but failing on timing jitter would make replays
+        differ between runs, so they are only counted.
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            if self.last_request and (now - self.last_request) * 1000 < self.rateLimit:
+                self.rate_limit_violations += 1
+                self.logger.warn(
+                    '%s rate limit exceeded, %s requests made too fast so far',
+                    self.id,
+                    self.rate_limit_violations
+                )
+            self.last_request = now
+
+
+    def _load_markets(self):
+        """Read the recorded markets.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        self._throttle()
+        self.markets = _read_json(os.path.join(self.path, self.id, 'markets.json'), default=dict())
+        return self.markets
+
+
+    def _fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        """Read the recorded candles of a symbol pair.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        self._throttle()
+        candles = _read_json(_get_ohlcv_path(self.path, self.id, symbol, timeframe))
+        if candles is None:
+            raise ccxt.ExchangeError('No recording of {} {} candles'.format(symbol, timeframe))
+
+        # Calendar timeframes are not shifted, so only their start is compared on the recorded clock.
+        since_offset = self.clock_offset
+        timeframe_milliseconds = timeframe_to_milliseconds(timeframe)
+        if timeframe_milliseconds:
+            shift = self.clock_offset // timeframe_milliseconds * timeframe_milliseconds
+            candles = [[candle[0] + shift] + candle[1:] for candle in candles]
+            since_offset = 0
+
+        if since is not None:
+            candles = [candle for candle in candles if candle[0] + since_offset >= since]
+
+        if limit:
+            candles = candles[:limit]
+        return candles
+
+
+    def load_markets(self, reload=False, params={}):
+        """Serve the recorded markets after the configured latency.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        if self.markets and not reload:
+            return self.markets
+
+        time.sleep(self.latency / 1000)
+        return self._load_markets()
+
+
+    def set_markets(self, markets, currencies=None):
+        """Set the markets without reading the recording.
+
+        Args:
+            markets (dict): The markets as returned by ccxt load_markets.
+            currencies (dict, optional): Defaults to None. Ignored.
+        """
+
+        self.markets = markets
+
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        """Serve the recorded candles of a symbol pair after the configured latency.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        time.sleep(self.latency / 1000)
+        return self._fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+class AsyncReplayExchange(ReplayExchange):
+    """Stands in for an asynchronous ccxt exchange client by serving recorded data.
+    """
+
+    async def load_markets(self, reload=False, params={}):
+        """Serve the recorded markets after the configured latency.
+
+        Returns:
+            dict: A dictionary containing market data for all symbol pairs of the exchange.
+        """
+
+        if self.markets and not reload:
+            return self.markets
+
+        await asyncio.sleep(self.latency / 1000)
+        return self._load_markets()
+
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params={}):
+        """Serve the recorded candles of a symbol pair after the configured latency.
+
+        Returns:
+            list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+        """
+
+        await asyncio.sleep(self.latency / 1000)
+        return self._fetch_ohlcv(symbol, timeframe, since, limit, params)
+
+
+    async def close(self):
+        """Nothing to close, kept for parity with the ccxt clients.
+        """
@@ -0,0 +1,120 @@
+"""Derive candles of a coarser timeframe from candles of a finer timeframe
+"""
+
+from timeframes import get_candle_open_time, timeframe_to_milliseconds
+
+
+def can_resample(source_timeframe, target_timeframe):
+    """Check whether candles of one timeframe can be rolled up into another.
+
+    Args:
+        source_timeframe (str): The ccxt time unit of the available candles i.e. 1h.
+        target_timeframe (str): The ccxt time unit of the wanted candles i.e. 1d.
+
+    Returns:
+        bool: True when the target is a whole multiple of the source timeframe.
+    """
+
+    source_milliseconds = timeframe_to_milliseconds(source_timeframe)
+    target_milliseconds = timeframe_to_milliseconds(target_timeframe)
+
+    if not source_milliseconds or not target_milliseconds:
+        return False
+
+    return (
+        target_milliseconds > source_milliseconds
+        and target_milliseconds % source_milliseconds == 0
+    )
+
+
+def resample_candles(candles, source_timeframe, target_timeframe):
+    """Roll up OHLCV candles into a coarser timeframe.
+
+    The leading candle is dropped when the source candles do not cover its whole period. The
+    trailing candle is kept even if incomplete, just like the exchanges return the candle that is
+    still open.
+
+    Args:
+        candles (list): A list of lists which contain timestamp, open, high, low, close, volume
+            sorted by timestamp in ascending order.
+        source_timeframe (str): The ccxt time unit of the candles i.e. 1h.
+        target_timeframe (str): The ccxt time unit of the wanted candles i.e. 1d.
+
+    Returns:
+        list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+    """
+
+    resampled_candles = list()
+    for candle in candles:
+        open_time = get_candle_open_time(candle[0], target_timeframe)
+
+        if resampled_candles and resampled_candles[-1][0] == open_time:
+            resampled_candle = resampled_candles[-1]
+            resampled_candle[2] = max(resampled_candle[2], candle[2])
+            resampled_candle[3] = min(resampled_candle[3], candle[3])
+            resampled_candle[4] = candle[4]
+            resampled_candle[5] += candle[5]
+        else:
+            resampled_candles.append([open_time] + list(candle[1:6]))
+
+    if candles and get_candle_open_time(candles[0][0], target_timeframe) != candles[0][0]:
+        resampled_candles = resampled_candles[1:]
+
+    return resampled_candles
+
+
+def trades_to_candles(trades, timeframe):
+    """Roll up trades into OHLCV candles.
+
+    Args:
+        trades (list): A list of lists which contain timestamp, price, amount sorted by timestamp
+            in ascending order.
+        timeframe (str): The ccxt time unit of the wanted candles i.e. 1m or 1h.
+
+    Returns:
+        list: Contains a list of lists which contain timestamp, open, high, low, close, volume.
+    """
+
+    candles = list()
+    for timestamp, price, amount in trades:
+        open_time = get_candle_open_time(timestamp, timeframe)
+
+        if candles and candles[-1][0] == open_time:
+            candle = candles[-1]
+            candle[2] = max(candle[2], price)
+            candle[3] = min(candle[3], price)
+            candle[4] = price
+            candle[5] += amount
+        else:
+            candles.append([open_time, price, price, price, price, amount])
+
+    return candles
+
+
+def merge_candles(candles, new_candles, aggregate=False):
+    """Merge new candles into a list of candles.
+
+    Args:
+        candles (list): A list of lists which contain timestamp, open, high, low, close, volume.
+        new_candles (list): The candles to merge in.
+        aggregate (bool, optional): Defaults to False. Whether a new candle with the timestamp of
+            an existing one is a continuation of it, such as candles built from a batch of trades,
+            rather than a replacement.
+
+    Returns:
+        list: The merged candles sorted by timestamp in ascending order.
+    """
+
+    merged_candles = { candle[0]: list(candle) for candle in candles }
+    for new_candle in new_candles:
+        candle = merged_candles.get(new_candle[0])
+
+        if aggregate and candle:
+            candle[2] = max(candle[2], new_candle[2])
+            candle[3] = min(candle[3], new_candle[3])
+            candle[4] = new_candle[4]
+            candle[5] += new_candle[5]
+        else:
+            merged_candles[new_candle[0]] = list(new_candle)
+
+    return [merged_candles[timestamp] for timestamp in sorted(merged_candles)]
@@ -0,0 +1,113 @@
+"""Cache for analysis results that were computed from the same candles before
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas
+import structlog
+
+class ResultCache():
+    """Keeps the most recently used analysis results within a memory cap.
+    """
+
+    def __init__(self, max_bytes):
+        """Initializes ResultCache class
+
+        Args:
+            max_bytes (int): The most memory the cached results may take up, the least recently
+                used results are evicted to stay below it.
+        """
+
+        self.logger = structlog.get_logger()
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.results = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.results
+
+
+    def get(self, key):
+        """Get a cached result and mark it as recently used.
+
+        Args:
+            key (tuple): Identifies the candles and configuration the result was computed from.
+
+        Returns:
+            pandas.DataFrame: The cached result, None if it is not cached.
+        """
+
+        with self.lock:
+            if key not in self.results:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key][0]
+
+
+    def put(self, key, result):
+        """Cache a result, evicting the least recently used results when over the memory cap.
+
+        Args:
+            key (tuple): Identifies the candles and configuration the result was computed from.
+            result (pandas.DataFrame): The result to cache.
+        """
+
+        result_size = self._get_size(result)
+        if result_size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.results:
+                self.size -= self.results.pop(key)[1]
+
+            self.results[key] = (result, result_size)
+            self.size += result_size
+
+            while self.size > self.max_bytes:
+                self.size -= self.results.popitem(last=False)[1][1]
+                self.evictions += 1
+
+
+    def get_stats(self):
+        """Get how well the cache is doing.
+
+        Returns:
+            dict: The hits, misses, hit rate, evictions, number of results and bytes used.
+        """
+
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0,
+                'evictions': self.evictions,
+                'results': len(self.results),
+                'bytes': self.size
+            }
+
+
+    def _get_size(self, result):
+        """Estimate the memory taken up by a result.
+
+        Args:
+            result (pandas.DataFrame): The result to measure.
+
+        Returns:
+            int: The size in bytes.
+        """
+
+        if isinstance(result, pandas.DataFrame):
+            return int(result.memory_usage(index=True, deep=True).sum())
+        return sys.getsizeof(result)
@@ -0,0 +1,66 @@
+"""Compact record of an analysis result for the outputs and notifiers
+"""
+
+import numpy
+import pandas
+
+
+class ResultRecord():
+    """The latest values of an analysis result, kept instead of the whole result dataframe.
+
+    The outputs and notifiers only report on the latest candle, so only its values and status are
+    kept unless the last rows or the whole dataframe are asked for.
+    """
+
+    __slots__ = ('latest', 'status', 'tail', 'frame')
+
+    def __init__(self, result, tail_length=0, keep_frame=False):
+        """Initializes ResultRecord class
+
+        Args:
+            result (pandas.DataFrame): The result of the analysis, an empty string when the
+                analysis failed.
+            tail_length (int, optional): Defaults to 0. How many of the latest rows to keep as a
+                numpy record array.
+            keep_frame (bool, optional): Defaults to False. Whether to keep the whole dataframe.
+        """
+
+        self.latest = dict()
+        self.status = 'neutral'
+        self.tail = None
+        self.frame = None
+
+        if not isinstance(result, pandas.DataFrame):
+            return
+
+        if keep_frame:
+            self.frame = result
+
+        if result.shape[0] == 0:
+            return
+
+        self.latest = {
+            column: value.item() if isinstance(value, numpy.generic) else value
+            for column, value in result.iloc[-1].items()
+        }
+
+        if self.latest.get('is_hot'):
+            self.status = 'hot'
+        elif self.latest.get('is_cold'):
+            self.status = 'cold'
+
+        if tail_length:
+            self.tail = result.iloc[-tail_length:].to_records()
+
+
+    def __getattr__(self, name):
+        """Get a latest value as an attribute, so templates can use analysis.result.<signal>.
+        """
+
+        if name.startswith('__') or name == 'latest':
+            raise AttributeError(name)
+
+        try:
+            return self.latest[name]
+        except KeyError:
+            raise AttributeError(name)
@@ -0,0 +1,124 @@
+"""Schedules the analysis right after the candles of the configured candle periods close
+"""
+
+import time
+
+import structlog
+
+from timeframes import get_candle_open_time, timeframe_to_milliseconds
+
+class CandleScheduler():
+    """Works out when the next candle of each configured candle period closes.
+
+    The scheduler is created right before the first full run, candles that close after that are
+    reported as due even when a run was still working when they closed.
+    """
+
+    def __init__(self, candle_periods, close_delay=10, fallback_interval=300):
+        """Initializes CandleScheduler class
+
+        Args:
+            candle_periods (set): The candle periods used by the analysis.
+            close_delay (int, optional): Defaults to 10. Seconds to wait after a candle closes so
+                the exchanges have published it.
+            fallback_interval (int, optional): Defaults to 300. Seconds between runs when none of
+                the candle periods has a fixed duration, such as monthly candles.
+        """
+
+        self.logger = structlog.get_logger()
+        self.close_delay = close_delay
+        self.fallback_interval = fallback_interval
+        self.fixed_periods = set()
+        self.calendar_periods = set()
+        self.last_run = int(time.time() * 1000)
+
+        for candle_period in candle_periods:
+            if timeframe_to_milliseconds(candle_period):
+                self.fixed_periods.add(candle_period)
+            else:
+                self.calendar_periods.add(candle_period)
+
+
+    def get_next_run(self, now=None):
+        """Get when the next candle closes and which candle periods close at that time.
+
+        Candle periods without a fixed duration are analyzed on every run.
+
+        Args:
+            now (int, optional): Defaults to the current time. Timestamp in milliseconds.
+
+        Returns:
+            tuple: The timestamp in milliseconds to run at and the set of candle periods due.
+        """
+
+        if now is None:
+            now = int(time.time() * 1000)
+
+        if not self.fixed_periods:
+            return now + self.fallback_interval * 1000, set(self.calendar_periods)
+
+        # Candles that closed while the previous run was still working are analyzed right away.
+        missed_periods = self._get_closed_periods(self.last_run, now)
+        if missed_periods:
+            return now, missed_periods | self.calendar_periods
+
+        # Looking back by the delay keeps a candle due until its delayed run time has passed.
+        delay = self.close_delay * 1000
+        close_times = {
+            candle_period: (
+                get_candle_open_time(now - delay, candle_period)
+                + timeframe_to_milliseconds(candle_period)
+            )
+            for candle_period in self.fixed_periods
+        }
+
+        next_close = min(close_times.values())
+        due_periods = {
+            candle_period for candle_period in close_times
+            if close_times[candle_period] == next_close
+        }
+
+        return next_close + delay, due_periods | self.calendar_periods
+
+
+    def _get_closed_periods(self, since, until):
+        """Get the candle periods with a candle that closed between two runs.
+
+        Args:
+            since (int): Timestamp in milliseconds of the previous run.
+            until (int): Timestamp in milliseconds of the next run.
+
+        Returns:
+            set: The candle periods whose delayed close falls after since and up to until.
+        """
+
+        delay = self.close_delay * 1000
+        return {
+            candle_period for candle_period in self.fixed_periods
+            if get_candle_open_time(until - delay, candle_period)
+            > get_candle_open_time(since - delay, candle_period)
+        }
+
+
+    def wait_for_next_run(self, sleep=time.sleep):
+        """Sleep until the next candle close.
+
+        Args:
+            sleep (function, optional): Defaults to time.sleep. Called with the number of seconds
+                to wait.
+
+        Returns:
+            set: The candle periods that have a new closed candle.
+        """
+
+        run_at, due_periods = self.get_next_run()
+        wait_time = max(0, run_at / 1000 - time.time())
+
+        self.logger.info(
+            "Sleeping for %s seconds until the next %s candle closes",
+            int(wait_time),
+            ', '.join(sorted(due_periods))
+        )
+        sleep(wait_time)
+        self.last_run = max(run_at, int(time.time() * 1000))
+        return due_periods
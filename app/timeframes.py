@@ -0,0 +1,59 @@
+"""Helpers for working with ccxt candle timeframes
+"""
+
+import re
+
+TIMEFRAME_REGEX = re.compile('^([0-9]+)([mhdwMy])$')
+
+TIMEFRAME_MILLISECONDS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+    'w': 7 * 24 * 60 * 60 * 1000
+}
+
+# The unix epoch is a thursday while exchanges start their weekly candles on monday.
+WEEK_OFFSET_MILLISECONDS = 4 * TIMEFRAME_MILLISECONDS['d']
+
+
+def timeframe_to_milliseconds(timeframe):
+    """Get the duration of a candle.
+
+    Args:
+        timeframe (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+
+    Returns:
+        int: The duration of a candle in milliseconds, None for calendar based timeframes like
+            months and years which do not have a fixed duration.
+    """
+
+    timeframe_matches = TIMEFRAME_REGEX.match(timeframe)
+    if not timeframe_matches:
+        raise ValueError('Invalid timeframe {}'.format(timeframe))
+
+    time_quantity = int(timeframe_matches.group(1))
+    time_period = timeframe_matches.group(2)
+
+    if time_period not in TIMEFRAME_MILLISECONDS:
+        return None
+    return time_quantity * TIMEFRAME_MILLISECONDS[time_period]
+
+
+def get_candle_open_time(timestamp, timeframe):
+    """Get the open time of the candle a timestamp belongs to, aligned like the exchanges do.
+
+    Args:
+        timestamp (int): Timestamp in milliseconds.
+        timeframe (str): A string specifying the ccxt time unit i.e. 5m or 1d.
+
+    Returns:
+        int: Timestamp in milliseconds of the candle open time.
+    """
+
+    timeframe_milliseconds = timeframe_to_milliseconds(timeframe)
+
+    offset = 0
+    if timeframe.endswith('w'):
+        offset = WEEK_OFFSET_MILLISECONDS
+
+    return (timestamp - offset) // timeframe_milliseconds * timeframe_milliseconds + offset